@@ -0,0 +1,365 @@
+"""
+离线 fixture 服务
+用 fixtures/ 下按线上结构保存的页面模板，生成确定性的 (固定随机种子) 搜狗/抖音/微博页面和接口数据，
+供浏览器采集脚本在没有网络、不触发风控的情况下运行
+
+路由 (均以站点前缀区分):
+    /sogou/weixin?query=            .news-list 搜索结果页
+    /sogou/article/<n>              带 #js_content 的公众号文章
+    /douyin/                        首页
+    /douyin/search/<kw>?type=user   用户搜索页，滚动到底时请求下一页接口 (无限滚动)
+    /douyin/aweme/v1/web/discover/search/?offset=   用户搜索接口 JSON
+    /douyin/user/<sec_uid>          用户主页
+    /weibo/user?q=&page=            card-user-b 用户搜索结果，超出页数时重复最后一页 (与线上一致)
+    /weibo/m                        移动版首页
+    /weibo/m/api/container/getIndex getIndex JSON (userInfo 或微博时间线)
+
+单独运行: python benchmarks/fixture_server.py --port 8900
+"""
+import argparse
+import json
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# ===== 配置区域 =====
+SEED = 20240501
+SOGOU_RESULTS = 10         # 搜索结果页的文章数
+SOGOU_ARTICLE_SECTIONS = 6  # 每篇文章的单位/联系方式段落数
+DOUYIN_USERS = 120         # 每个关键词的用户总数
+DOUYIN_PAGE_SIZE = 10      # 搜索接口每页条数
+WEIBO_PAGES = 5            # 搜索结果页数
+WEIBO_CARDS_PER_PAGE = 20
+WEIBO_POSTS_PER_PAGE = 10
+# ===================
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰涛明超秀霞平刚桂英华"
+CITIES = ["北京", "上海", "济南", "青岛", "哈尔滨", "成都", "武汉", "西安", "广州", "深圳"]
+INDUSTRIES = ["电气", "航空", "机械", "物流", "建设", "科技", "医药", "能源", "环保", "食品"]
+SUFFIXES = ["有限公司", "集团有限公司", "股份有限公司", "研究院", "服务中心"]
+FILLER = ("为进一步做好相关工作，现将有关事项通知如下。请各单位高度重视，认真组织，按时报送材料。"
+          "本次活动面向社会公开，欢迎符合条件的单位和个人积极参与，具体安排以最终通知为准。")
+
+
+def _load(name: str) -> Template:
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def _rng(*parts) -> random.Random:
+    """同一个 (种子, 路径参数) 总是生成同样的数据"""
+    return random.Random(f"{SEED}:{':'.join(map(str, parts))}")
+
+
+def _person(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN) for _ in range(rng.randint(1, 2)))
+
+
+def _company(rng: random.Random) -> str:
+    return rng.choice(CITIES) + rng.choice(INDUSTRIES) + rng.choice(SUFFIXES)
+
+
+def _mobile(rng: random.Random) -> str:
+    return f"1{rng.choice('3456789')}{rng.randint(0, 999999999):09d}"
+
+
+def _landline(rng: random.Random) -> str:
+    return f"0{rng.randint(10, 999):d}-{rng.randint(10000000, 99999999)}"
+
+
+def _count_text(n: int) -> str:
+    return f"{n / 10000:.1f}万" if n >= 10000 else str(n)
+
+
+class FixtureData:
+    """按请求参数确定性地生成各站点数据"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.t_sogou_results = _load("sogou_results.html")
+        self.t_sogou_item = _load("sogou_result_item.html")
+        self.t_sogou_article = _load("sogou_article.html")
+        self.t_douyin_search = _load("douyin_search.html")
+        self.t_douyin_profile = _load("douyin_profile.html")
+        self.t_weibo_search = _load("weibo_search.html")
+        self.t_weibo_card = _load("weibo_user_card.html")
+
+    # ---------- 搜狗 ----------
+
+    def sogou_results(self, query: str) -> str:
+        items = []
+        for i in range(SOGOU_RESULTS):
+            rng = _rng("sogou", query, i)
+            company = _company(rng)
+            items.append(self.t_sogou_item.substitute(
+                index=i, href=f"{self.base_url}/sogou/article/{i}?q={query}",
+                title=f"{company}{rng.choice(['招聘公告', '采购公告', '联系方式汇总', '活动通知'])}",
+                summary=FILLER[:60], account=f"{rng.choice(CITIES)}发布",
+                date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            ))
+        return self.t_sogou_results.substitute(query=query, items="\n".join(items))
+
+    def sogou_article(self, index: int, query: str) -> str:
+        rng = _rng("sogou", query, index)
+        title_company = _company(rng)
+        sections = []
+        for s in range(SOGOU_ARTICLE_SECTIONS):
+            company = title_company if s == 0 else _company(rng)
+            person = _person(rng)
+            lines = [
+                f"<p>{company}</p>",
+                f"<p>{FILLER}</p>",
+                f"<p>联系人：{person}</p>",
+                f"<p>联系电话：{_landline(rng)}</p>",
+                f"<p>手机：{_mobile(rng)}</p>",
+                f"<p>邮箱：hr{rng.randint(100, 999)}@example{rng.randint(1, 99)}.com</p>",
+            ]
+            if rng.random() < 0.5:
+                lines.append(f"<p>微信：wx_{rng.randint(100000, 999999)}</p>")
+            lines.append(f"<p>地址：{rng.choice(CITIES)}市高新区{rng.randint(1, 999)}号，邮编：{rng.randint(100000, 999999)}</p>")
+            sections.append("\n".join(lines))
+        return self.t_sogou_article.substitute(
+            title=f"{title_company}联系方式汇总", account=f"{rng.choice(CITIES)}发布",
+            date="2024-05-01", body="\n<p><br></p>\n".join(sections), timestamp=1714521600,
+        )
+
+    # ---------- 抖音 ----------
+
+    def douyin_user(self, keyword: str, index: int) -> Dict[str, Any]:
+        rng = _rng("douyin", keyword, index)
+        followers = rng.randint(10, 500000)
+        likes = rng.randint(0, 2000000)
+        signature = f"{keyword}{rng.choice(['官方账号', '分享日常', '专注行业资讯'])}"
+        if rng.random() < 0.6:
+            signature += f" 合作V:{rng.choice('abcdefgh')}{rng.randint(10000, 99999)}"
+        if rng.random() < 0.4:
+            signature += f" 电话:{_mobile(rng)}"
+        return {
+            "sec_uid": f"MS4wLjABAAAA{keyword.encode('utf-8').hex()[:8]}{index:06d}",
+            "uid": str(10 ** 10 + index),
+            "unique_id": f"dy{rng.randint(1000000, 9999999)}",
+            "nickname": f"{keyword}{_person(rng)}",
+            "signature": signature,
+            "follower_count": followers,
+            "total_favorited": likes,
+            "follower_count_text": _count_text(followers),
+            "total_favorited_text": _count_text(likes),
+        }
+
+    def douyin_search_page(self, keyword: str) -> str:
+        return self.t_douyin_search.substitute(
+            keyword=keyword, keyword_json=json.dumps(keyword, ensure_ascii=False),
+            base=f"{self.base_url}/douyin", page_size=DOUYIN_PAGE_SIZE,
+        )
+
+    def douyin_search_api(self, keyword: str, offset: int, count: int) -> Dict[str, Any]:
+        end = min(offset + count, DOUYIN_USERS)
+        return {
+            "status_code": 0,
+            "user_list": [{"user_info": self.douyin_user(keyword, i)} for i in range(offset, end)],
+            "has_more": 1 if end < DOUYIN_USERS else 0,
+            "cursor": end,
+        }
+
+    def douyin_profile(self, sec_uid: str) -> str:
+        # sec_uid 里不含关键词，主页数据只保证同一 sec_uid 每次相同
+        rng = _rng("douyin-profile", sec_uid)
+        user = self.douyin_user(sec_uid, 0)
+        user["nickname"] = user["nickname"][len(sec_uid):]
+        posts = "".join(f"<li>作品 {i}</li>" for i in range(rng.randint(5, 20)))
+        return self.t_douyin_profile.substitute(posts=posts, **user)
+
+    # ---------- 微博 ----------
+
+    def weibo_user(self, query: str, index: int) -> Dict[str, Any]:
+        rng = _rng("weibo", query, index)
+        description = f"{query}{rng.choice(['官方微博', '客服账号', '新闻发布'])}"
+        if rng.random() < 0.5:
+            description += f" 客服电话：{_landline(rng)}"
+        if rng.random() < 0.3:
+            description += f" 商务合作：{_mobile(rng)}"
+        followers = rng.randint(100, 3000000)
+        return {
+            "uid": str(5000000000 + index),
+            "nickname": f"{query}{rng.choice(['官方', '服务', '资讯', ''])}{index}",
+            "location": rng.choice(CITIES),
+            "description": description,
+            "friends": rng.randint(10, 2000),
+            "followers": followers,
+            "followers_text": _count_text(followers),
+            "statuses": rng.randint(0, 50000),
+            "verified_reason": f"{_company(rng)}官方微博" if rng.random() < 0.6 else "",
+        }
+
+    def weibo_search_page(self, query: str, page: int) -> str:
+        page = max(1, min(page, WEIBO_PAGES))
+        start = (page - 1) * WEIBO_CARDS_PER_PAGE
+        cards = [
+            self.t_weibo_card.substitute(**self.weibo_user(query, i))
+            for i in range(start, start + WEIBO_CARDS_PER_PAGE)
+        ]
+        return self.t_weibo_search.substitute(query=query, cards="\n".join(cards), page=page)
+
+    def weibo_get_index(self, params: Dict[str, str]) -> Dict[str, Any]:
+        uid = params.get("value", "")
+        index = int(uid) - 5000000000 if uid.isdigit() else 0
+        # getIndex 只带 UID，不带搜索词；fixture 用固定的查询词生成同一批用户
+        user = self.weibo_user(WEIBO_QUERY_KEY, index)
+        if "containerid" in params:
+            rng = _rng("weibo-posts", uid, params.get("page", "1"))
+            cards = []
+            for i in range(WEIBO_POSTS_PER_PAGE):
+                text = f"{FILLER[:40]}<a href='#'>#话题#</a>"
+                if rng.random() < 0.2:
+                    text += f" 报名咨询：{_mobile(rng)}"
+                cards.append({"card_type": 9, "mblog": {"id": f"{uid}{i:03d}", "text": text}})
+            return {"ok": 1, "data": {"cards": cards}}
+        return {"ok": 1, "data": {"userInfo": {
+            "id": int(uid or 0), "screen_name": user["nickname"], "description": user["description"],
+            "followers_count": user["followers"], "statuses_count": user["statuses"],
+            "verified_reason": user["verified_reason"],
+        }}}
+
+
+# 微博 getIndex 请求里没有搜索词，搜索页与接口共用这个键生成数据
+WEIBO_QUERY_KEY = "fixture"
+
+
+class FixtureServer:
+    """
+    在后台线程运行的 fixture 服务，按站点统计页面/接口请求数
+
+    用法:
+        with FixtureServer() as server:
+            print(server.base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.data = FixtureData(self.base_url)
+        self._lock = threading.Lock()
+        self.hits: Dict[Tuple[str, str], int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, site: str, kind: str):
+        with self._lock:
+            self.hits[(site, kind)] = self.hits.get((site, kind), 0) + 1
+
+    def stats(self, site: Optional[str] = None) -> Dict[str, int]:
+        """kind -> 请求数 (page / api)"""
+        with self._lock:
+            result: Dict[str, int] = {}
+            for (s, kind), n in self.hits.items():
+                if site is None or s == site:
+                    result[kind] = result.get(kind, 0) + n
+            return result
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits.clear()
+
+    def route(self, path: str, query: Dict[str, str]) -> Tuple[int, str, Any]:
+        """返回 (状态码, 类型 html/json, 内容)"""
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        site, rest = parts[0], parts[1:]
+        data = self.data
+
+        if site == "sogou":
+            if rest == ["weixin"]:
+                self.count("sogou", "page")
+                return 200, "html", data.sogou_results(query.get("query", ""))
+            if len(rest) == 2 and rest[0] == "article" and rest[1].isdigit():
+                self.count("sogou", "page")
+                return 200, "html", data.sogou_article(int(rest[1]), query.get("q", ""))
+
+        elif site == "douyin":
+            if not rest or rest == [""]:
+                return 200, "html", "<html><body>抖音</body></html>"
+            if len(rest) == 2 and rest[0] == "search":
+                self.count("douyin", "page")
+                return 200, "html", data.douyin_search_page(rest[1])
+            if rest[:4] == ["aweme", "v1", "web", "discover"]:
+                self.count("douyin", "api")
+                return 200, "json", data.douyin_search_api(
+                    query.get("keyword", ""), int(query.get("offset", 0)), int(query.get("count", DOUYIN_PAGE_SIZE)))
+            if len(rest) == 2 and rest[0] == "user":
+                self.count("douyin", "page")
+                return 200, "html", data.douyin_profile(rest[1])
+
+        elif site == "weibo":
+            if rest == ["user"]:
+                self.count("weibo", "page")
+                return 200, "html", data.weibo_search_page(WEIBO_QUERY_KEY, int(query.get("page", 1)))
+            if rest == ["m"]:
+                return 200, "html", "<html><body>微博</body></html>"
+            if rest == ["m", "api", "container", "getIndex"]:
+                self.count("weibo", "api")
+                return 200, "json", data.weibo_get_index(query)
+
+        return 404, "html", "<html><body>404</body></html>"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                status, kind, content = server.route(parts.path, query)
+                if kind == "json":
+                    body = json.dumps(content, ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                else:
+                    body = content.encode("utf-8")
+                    content_type = "text/html; charset=utf-8"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线 fixture 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+    server = FixtureServer(args.host, args.port)
+    print(f"[fixture] {server.base_url}/sogou/weixin?query=测试")
+    print(f"[fixture] {server.base_url}/douyin/search/测试?type=user")
+    print(f"[fixture] {server.base_url}/weibo/user?q=测试&page=1")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
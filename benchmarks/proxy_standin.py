@@ -0,0 +1,224 @@
+"""
+本地代理替身
+可配置延迟、封禁率 (返回 429)、故障率 (断开连接) 的 HTTP 转发代理，支持普通请求和 CONNECT 隧道，
+Playwright 和 requests 都能把它当真代理用；配合 fixture_server 在本机验证代理池的打分、剔除和加权选择
+
+用法:
+    with ProxyStandIn(latency=0.2, block_rate=0.3) as proxy:
+        requests.get(url, proxies={"http": proxy.url, "https": proxy.url})
+
+    python benchmarks/proxy_standin.py          # 演示：快/慢/不稳定三个代理，观察请求分布和剔除
+"""
+import argparse
+import http.client
+import os
+import random
+import select
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+# 不经过限速；演示时不需要 getIndex 等真实主机的预算
+os.environ.setdefault("OSINT_RATE_LIMIT", "0")
+
+# ===== 配置区域 =====
+HOP_HEADERS = {"proxy-connection", "proxy-authorization", "connection", "keep-alive", "transfer-encoding"}
+TUNNEL_BUFFER = 65536
+# ===================
+
+
+class ProxyStandIn:
+    """
+    Args:
+        latency: 每个请求额外的延迟 (秒)
+        block_rate: 以该概率直接返回 429 (模拟出口被目标站限流)
+        fail_rate: 以该概率直接断开连接 (模拟代理故障)
+    """
+
+    def __init__(self, latency: float = 0.0, block_rate: float = 0.0, fail_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.block_rate = block_rate
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "blocked": 0, "failed": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _fate(self) -> str:
+        """本次请求的结局: ok / blocked / failed"""
+        self._count("requests")
+        with self._lock:
+            roll = self.rng.random()
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.fail_rate:
+            self._count("failed")
+            return "failed"
+        if roll < self.fail_rate + self.block_rate:
+            self._count("blocked")
+            return "blocked"
+        return "ok"
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # 响应头和响应体分两次写出，关掉 Nagle 避免每个请求多等一个延迟 ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _reject(self, fate: str) -> bool:
+                if fate == "failed":
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return True
+                if fate == "blocked":
+                    body = b"Too Many Requests"
+                    self.send_response(429)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return True
+                return False
+
+            def _forward(self):
+                if self._reject(standin._fate()):
+                    return
+                target = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_HEADERS}
+                conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                try:
+                    path = target.path + (f"?{target.query}" if target.query else "")
+                    conn.request(self.command, path or "/", body=body, headers=headers)
+                    upstream = conn.getresponse()
+                    payload = upstream.read()
+                finally:
+                    conn.close()
+                self.send_response(upstream.status, upstream.reason)
+                for key, value in upstream.getheaders():
+                    if key.lower() not in HOP_HEADERS and key.lower() != "content-length":
+                        self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_HEAD = _forward
+
+            def do_CONNECT(self):
+                if self._reject(standin._fate()):
+                    return
+                host, _, port = self.path.partition(":")
+                try:
+                    upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+                except OSError:
+                    self.send_error(502)
+                    return
+                self.send_response(200, "Connection Established")
+                self.end_headers()
+                self.close_connection = True
+                sockets = [self.connection, upstream]
+                try:
+                    while True:
+                        readable, _, broken = select.select(sockets, [], sockets, 30)
+                        if broken or not readable:
+                            return
+                        for sock in readable:
+                            data = sock.recv(TUNNEL_BUFFER)
+                            if not data:
+                                return
+                            (upstream if sock is self.connection else self.connection).sendall(data)
+                finally:
+                    upstream.close()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "ProxyStandIn":
+        threading.Thread(target=self.httpd.serve_forever, name="proxy-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def demo(sessions: int, requests_per_session: int):
+    """多个会话经代理池访问 fixture 服务，打印各代理承担的请求数和最终得分"""
+    import requests
+
+    import fixture_server
+    from osint_common import proxypool
+
+    standins = {
+        "fast": ProxyStandIn(latency=0.01, seed=1),
+        "slow": ProxyStandIn(latency=0.15, seed=2),
+        "flaky": ProxyStandIn(latency=0.01, block_rate=0.6, seed=3),
+    }
+    with fixture_server.FixtureServer() as server:
+        for standin in standins.values():
+            standin.start()
+        pool = proxypool.ProxyPool(s.url for s in standins.values())
+        url = f"{server.base_url}/weibo/m"
+        started = time.perf_counter()
+        ok = 0
+        for i in range(sessions):
+            http = proxypool.session(f"demo_{i}", pool=pool)
+            for _ in range(requests_per_session):
+                try:
+                    ok += http.get(url, timeout=10).status_code == 200
+                except requests.exceptions.RequestException:
+                    pass
+            http.close()
+        elapsed = time.perf_counter() - started
+        for standin in standins.values():
+            standin.stop()
+
+    total = sessions * requests_per_session
+    print(f"\n{total} 个请求，成功 {ok} 个，耗时 {elapsed:.2f}s")
+    print(f"{'代理':<8}{'请求':>6}{'429':>6}{'故障':>6}")
+    for name, standin in standins.items():
+        s = standin.stats
+        print(f"{name:<8}{s['requests']:>6}{s['blocked']:>6}{s['failed']:>6}")
+    print("\n代理池状态:")
+    for row, name in zip(pool.snapshot(), standins):
+        print(f"    {name:<8}{row}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地代理替身")
+    parser.add_argument("--sessions", type=int, default=30, help="演示的会话数 (每个会话粘性分配一个代理)")
+    parser.add_argument("--requests", type=int, default=10, help="每个会话的请求数")
+    args = parser.parse_args()
+    demo(args.sessions, args.requests)
+
+
+if __name__ == "__main__":
+    main()
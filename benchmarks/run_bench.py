@@ -0,0 +1,283 @@
+"""
+浏览器采集脚本离线基准测试
+启动 fixture_server，把 sougou.py / test-douyin.py / weibo-userlist.py 的站点地址指向它，
+每个采集脚本在独立子进程里跑一遍，统计:
+    items/s     写出的记录数 / 墙钟时间
+    pages/s     fixture 服务收到的页面 + 接口请求数 / 墙钟时间
+    peak RSS    Python 进程与浏览器子进程中的最大常驻内存
+    CPU time    Python 进程 / 浏览器 (Playwright driver + Chromium) 各自的 CPU 时间
+
+用法:
+    python benchmarks/run_bench.py                         # 全部采集脚本
+    python benchmarks/run_bench.py sogou weibo --repeat 3  # 指定脚本，取最好的一次
+    python benchmarks/run_bench.py --save bench.json
+    python benchmarks/run_bench.py --baseline bench.json   # 与基线比较，退化超过阈值时退出码为 1
+
+默认去掉脚本里的随机等待 (--pacing zero)，测的是采集逻辑本身的开销；
+--pacing real 保留线上的请求节奏
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import fixture_server  # noqa: E402
+
+# ===== 配置区域 =====
+KEYWORD = "基准测试"
+DOUYIN_TARGET = 100
+TOLERANCE = 0.2     # 与基线相比 items/s 下降或 CPU/内存上升超过 20% 视为退化
+RUN_TIMEOUT = 900   # 单次运行的最长时间 (秒)，超时视为失败
+# ===================
+
+
+class _ZeroDelayRandom:
+    """替换脚本模块里的 random：uniform() 返回 0，其余方法照常"""
+
+    def uniform(self, a, b):
+        return 0.0
+
+    def __getattr__(self, name):
+        return getattr(random, name)
+
+
+# ================= 各采集脚本的运行方式 =================
+
+def run_sogou(base_url: str, work_dir: str, zero_delay: bool) -> str:
+    from osint_common.scripts import load_script
+    module = load_script("搜狗浏览器/sougou.py", "sougou")
+    module.SEARCH_URL = f"{base_url}/sogou/weixin"
+    module.HEADLESS = True
+    if zero_delay:
+        module.random = _ZeroDelayRandom()
+    output = os.path.join(work_dir, "sogou.jsonl")
+    asyncio.run(module.run(keyword=KEYWORD, target_count=fixture_server.SOGOU_RESULTS, filename=output))
+    return output
+
+
+def run_douyin(base_url: str, work_dir: str, zero_delay: bool) -> str:
+    from osint_common.scripts import load_script
+    module = load_script("test-douyin.py", "test_douyin")
+    module.CONFIG.update({
+        "base_url": f"{base_url}/douyin",
+        "browser_channel": None,
+        "headless_mode": True,
+        "shards": 1,
+        "target_count": DOUYIN_TARGET,
+        "enrich_profiles": False,
+    })
+    if zero_delay:
+        module.CONFIG["min_scroll_delay"] = (0.0, 0.0)
+        module.CONFIG["settle_delay"] = 0.0
+        module.random = _ZeroDelayRandom()
+    # 持久化浏览器目录建在当前目录下
+    os.chdir(work_dir)
+    output = os.path.join(work_dir, "douyin.jsonl")
+    asyncio.run(module.run(keywords=[KEYWORD], save_file_name=output))
+    return output
+
+
+def run_weibo(base_url: str, work_dir: str, zero_delay: bool) -> str:
+    from osint_common.scripts import load_script
+    module = load_script("weibo-userlist.py", "weibo_userlist")
+    state_file = os.path.join(work_dir, "state.json")
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump({"cookies": [], "origins": []}, f)
+    module.STATE_FILE = state_file
+    module.SEARCH_URL = f"{base_url}/weibo/user"
+    module.MOBILE_HOME = f"{base_url}/weibo/m"
+    module.GET_INDEX_URL = f"{module.MOBILE_HOME}/api/container/getIndex"
+    module.HEADLESS = True
+    module.SEARCH_MAX_PAGES = fixture_server.WEIBO_PAGES + 1
+    # 冷启动：不读写 userInfo 缓存
+    module.PROFILE_CACHE_TTL = 0
+    module.MINE_POSTS = False
+    if zero_delay:
+        module.random = _ZeroDelayRandom()
+    output = os.path.join(work_dir, "weibo.jsonl")
+    module.main(keyword=KEYWORD, output_file=output)
+    return output
+
+
+RUNNERS: Dict[str, Callable[[str, str, bool], str]] = {
+    "sogou": run_sogou,
+    "douyin": run_douyin,
+    "weibo": run_weibo,
+}
+
+
+# ================= 测量 =================
+
+def _maxrss_mb(usage) -> float:
+    # Linux 上 ru_maxrss 单位为 KB，macOS 为字节
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _child(name: str, base_url: str, work_dir: str, zero_delay: bool, results):
+    import resource
+
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    error = None
+    output = None
+    try:
+        output = RUNNERS[name](base_url, work_dir, zero_delay)
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    # Playwright driver 和浏览器都是本进程的后代，退出后计入 RUSAGE_CHILDREN
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    items = 0
+    if output and os.path.exists(output):
+        with open(output, "r", encoding="utf-8") as f:
+            items = sum(1 for line in f if line.strip())
+
+    results.put({
+        "collector": name,
+        "error": error,
+        "wall": wall,
+        "items": items,
+        "cpu_python": (after.ru_utime + after.ru_stime) - (before.ru_utime + before.ru_stime),
+        "cpu_browser": children.ru_utime + children.ru_stime,
+        "peak_rss_mb": max(_maxrss_mb(after), _maxrss_mb(children)),
+    })
+
+
+def _wait_result(proc, results, name: str) -> Dict[str, Any]:
+    """等子进程交回结果；子进程崩溃 (没来得及 put) 或超时都记为失败，而不是一直阻塞"""
+    deadline = time.monotonic() + RUN_TIMEOUT
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            if proc.exitcode is not None:
+                # 退出前刚 put 的结果可能还在管道里
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    break
+            elif time.monotonic() > deadline:
+                break
+    if result is None:
+        timed_out = proc.exitcode is None
+        if timed_out:
+            proc.terminate()
+        proc.join()
+        error = f"超过 {RUN_TIMEOUT} 秒未完成" if timed_out else f"子进程异常退出 (exitcode {proc.exitcode})"
+        return {"collector": name, "error": error, "wall": 0.0, "items": 0,
+                "cpu_python": 0.0, "cpu_browser": 0.0, "peak_rss_mb": 0.0}
+    proc.join()
+    return result
+
+
+def bench_one(server: "fixture_server.FixtureServer", name: str, zero_delay: bool) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    server.reset_stats()
+    proc = ctx.Process(target=_child, args=(name, server.base_url, work_dir, zero_delay, results))
+    proc.start()
+    result = _wait_result(proc, results, name)
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    hits = server.stats(name)
+    wall = max(result["wall"], 1e-9)
+    result.update({
+        "pages": hits.get("page", 0),
+        "api_calls": hits.get("api", 0),
+        "items_per_sec": result["items"] / wall,
+        "pages_per_sec": (hits.get("page", 0) + hits.get("api", 0)) / wall,
+    })
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """返回退化项说明"""
+    problems = []
+    for r in results:
+        base = baseline.get(r["collector"])
+        if not base or r["error"]:
+            continue
+        if base["items_per_sec"] and r["items_per_sec"] < base["items_per_sec"] * (1 - tolerance):
+            problems.append(f"{r['collector']}: items/s {base['items_per_sec']:.2f} -> {r['items_per_sec']:.2f}")
+        for key in ("cpu_python", "cpu_browser", "peak_rss_mb"):
+            if base[key] and r[key] > base[key] * (1 + tolerance):
+                problems.append(f"{r['collector']}: {key} {base[key]:.2f} -> {r[key]:.2f}")
+    return problems
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"\n{'采集脚本':<10}{'记录':>6}{'耗时(s)':>10}{'items/s':>10}{'pages/s':>10}"
+          f"{'CPU py(s)':>11}{'CPU 浏览器(s)':>14}{'峰值RSS(MB)':>13}")
+    for r in results:
+        if r["error"]:
+            print(f"{r['collector']:<10} 失败: {r['error']}")
+            continue
+        print(f"{r['collector']:<10}{r['items']:>6}{r['wall']:>10.2f}{r['items_per_sec']:>10.2f}"
+              f"{r['pages_per_sec']:>10.2f}{r['cpu_python']:>11.2f}{r['cpu_browser']:>14.2f}{r['peak_rss_mb']:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器采集脚本离线基准测试")
+    parser.add_argument("collectors", nargs="*", help=f"要测的采集脚本 ({'/'.join(RUNNERS)})，默认全部")
+    parser.add_argument("--repeat", type=int, default=1, help="每个脚本跑几次，取 items/s 最高的一次")
+    parser.add_argument("--pacing", choices=("zero", "real"), default="zero")
+    parser.add_argument("--save", help="结果写入 JSON 文件，可作为之后的基线")
+    parser.add_argument("--baseline", help="与之前保存的结果比较")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    names = args.collectors or list(RUNNERS)
+    unknown = [n for n in names if n not in RUNNERS]
+    if unknown:
+        parser.error(f"未知的采集脚本: {', '.join(unknown)}")
+    results = []
+    with fixture_server.FixtureServer() as server:
+        print(f"[bench] fixture 服务: {server.base_url}")
+        for name in names:
+            runs = []
+            for i in range(args.repeat):
+                print(f"[bench] {name} 第 {i + 1}/{args.repeat} 次...")
+                runs.append(bench_one(server, name, args.pacing == "zero"))
+            ok = [r for r in runs if not r["error"]]
+            results.append(max(ok, key=lambda r: r["items_per_sec"]) if ok else runs[-1])
+
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({r["collector"]: r for r in results}, f, ensure_ascii=False, indent=2)
+        print(f"\n[bench] 结果已保存: {args.save}")
+
+    exit_code = 1 if any(r["error"] for r in results) else 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare(results, json.load(f), args.tolerance)
+        if problems:
+            print(f"\n[bench] 与基线相比退化超过 {args.tolerance:.0%}:")
+            for problem in problems:
+                print(f"    {problem}")
+            exit_code = 1
+        else:
+            print("\n[bench] 未发现退化")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+osint 命令行启动耗时基准
+每个用例在全新的解释器里执行 (与调度器拉起短任务的方式相同)，测量 import + 参数解析的耗时，
+并检查不该出现的重型模块 (如纯接口任务加载了 Playwright)；超出预算时列出 -X importtime 里最慢的模块
+
+用法:
+    python benchmarks/startup_bench.py                  # 全部用例，超预算时退出码为 1
+    python benchmarks/startup_bench.py help tianyancha --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ===== 配置区域 =====
+REPEAT = 5
+BROWSER_MODULES = ["playwright"]
+NETWORK_MODULES = ["requests", "urllib3"]
+# argv: 以该参数调用 cli.main；load: 加载该子命令的采集脚本
+# budget_ms 为解释器启动之后的耗时 (中位数)
+CASES: Dict[str, Dict[str, Any]] = {
+    "help": {"argv": ["--help"], "budget_ms": 30, "forbidden": BROWSER_MODULES + NETWORK_MODULES},
+    "sub_help": {"argv": ["weibo", "--help"], "budget_ms": 30, "forbidden": BROWSER_MODULES + NETWORK_MODULES},
+    "tianyancha": {"load": "tianyancha", "budget_ms": 250, "forbidden": BROWSER_MODULES},
+    "qianlima": {"load": "qianlima", "budget_ms": 250, "forbidden": BROWSER_MODULES},
+    "sogou": {"load": "sogou", "budget_ms": 600, "forbidden": []},
+    "douyin": {"load": "douyin", "budget_ms": 600, "forbidden": []},
+    "weibo": {"load": "weibo", "budget_ms": 600, "forbidden": []},
+}
+TOP_IMPORTS = 8
+# ===================
+
+_CHILD = """
+import contextlib, io, json, sys, time
+started = time.perf_counter()
+error = None
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        from osint_common import cli
+        {body}
+    except SystemExit:
+        pass
+    except Exception as e:
+        error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "error": error,
+                  "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def _child_code(case: Dict[str, Any]) -> str:
+    body = f"cli.main({case['argv']!r})" if "argv" in case else f"cli.load_collector({case['load']!r})"
+    return _CHILD.format(body=body, forbidden=case["forbidden"])
+
+
+def _slowest_imports(stderr: str) -> List[str]:
+    """解析 -X importtime 输出，返回累计耗时最长的顶层 import"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):   # 只看顶层，缩进的是被它带进来的子模块
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return [f"{name} {us / 1000:.1f}ms" for us, name in rows[:TOP_IMPORTS]]
+
+
+def run_case(name: str, case: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    code = _child_code(case)
+    samples = []
+    last = {}
+    stderr = ""
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              cwd=REPO_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0 or not proc.stdout.strip():
+            return {"case": name, "error": proc.stderr.strip().splitlines()[-1:] or ["子进程异常退出"]}
+        last = json.loads(proc.stdout.strip().splitlines()[-1])
+        stderr = proc.stderr
+        if last["error"]:
+            break
+        samples.append(last["seconds"])
+
+    result = {"case": name, "budget_ms": case["budget_ms"], "error": last.get("error"),
+              "forbidden_loaded": last.get("loaded", [])}
+    if samples:
+        result["median_ms"] = statistics.median(samples) * 1000
+        result["over_budget"] = result["median_ms"] > case["budget_ms"]
+        if result["over_budget"] or result["forbidden_loaded"]:
+            result["slowest"] = _slowest_imports(stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="osint 命令行启动耗时基准")
+    parser.add_argument("cases", nargs="*", help=f"要测的用例 ({'/'.join(CASES)})，默认全部")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    names = args.cases or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"未知的用例: {', '.join(unknown)}")
+
+    results = [run_case(name, CASES[name], args.repeat) for name in names]
+
+    failed = False
+    print(f"{'用例':<12}{'中位数(ms)':>12}{'预算(ms)':>10}  结果")
+    for r in results:
+        if r["error"]:
+            failed = True
+            print(f"{r['case']:<12}{'-':>12}{r.get('budget_ms', '-'):>10}  失败: {r['error']}")
+            continue
+        problems = []
+        if r["over_budget"]:
+            problems.append("超出预算")
+        if r["forbidden_loaded"]:
+            problems.append(f"加载了 {', '.join(r['forbidden_loaded'])}")
+        failed = failed or bool(problems)
+        print(f"{r['case']:<12}{r['median_ms']:>12.1f}{r['budget_ms']:>10}  {'; '.join(problems) or 'OK'}")
+        for line in r.get("slowest", []):
+            print(f"{'':<14}{line}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
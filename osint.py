@@ -0,0 +1,10 @@
+"""
+OSINT 采集工具统一入口，子命令见 osint_common/cli.py
+    python osint.py --help
+"""
+import sys
+
+from osint_common.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+各采集脚本共用的基础组件
+"""
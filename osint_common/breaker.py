@@ -0,0 +1,280 @@
+"""
+按来源熔断 (circuit breaker)
+触发验证码/滑块/反爬后，继续请求只会浪费页面加载和接口额度；熔断器在检测到挑战时打开，
+冷却期内不再放行任何请求，冷却结束后只放行一个探测请求 (半开)，探测成功才恢复
+
+状态:
+    closed     正常放行；连续失败达到阈值 (挑战检测直接 trip) 后打开
+    open       冷却中，allow() 返回 False
+    half_open  冷却结束，只有第一个 allow() 的调用方拿到探测资格；
+               探测成功 -> closed，失败 -> open 且冷却时间翻倍 (不超过 MAX_COOLDOWN)
+               只有拿到探测资格的线程报告的成功才能关闭熔断；打开前已发出的请求随后成功不算数
+
+状态保存在 SQLite 文件里，同一台机器上的所有进程共享；熔断器按 "来源@会话" 区分，
+会话由环境变量 OSINT_SESSION_<来源> / OSINT_SESSION 指定 (不同账号、Token、出口 IP)，
+任务队列的工作进程只领取自己会话未熔断的来源，熔断的任务交还队列由其他会话接手
+
+用法:
+    circuit = breaker.get("sogou")
+    circuit.check()                 # 熔断中抛 CircuitOpen
+    if not circuit.allow(): ...     # 或自行处理
+    circuit.trip("antispider")      # 检测到挑战
+    circuit.record_success()
+
+环境变量:
+    OSINT_BREAKER_DB     状态文件，默认系统临时目录下的 osint_breaker.db
+    OSINT_BREAKER=0      关闭熔断 (调试用)
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from osint_common import cassette, metrics
+
+# ===== 配置区域 =====
+# 来源 -> 首次熔断的冷却秒数
+COOLDOWNS: Dict[str, float] = {
+    "sogou": 1800,
+    "weibo": 1800,          # 浏览器详情阶段 (最后的兜底通道)
+    "weibo_api": 600,       # getIndex 直连接口，被拦后转浏览器
+    "qianlima": 300,
+}
+DEFAULT_COOLDOWN = 600
+MAX_COOLDOWN = 4 * 3600
+FAILURE_THRESHOLD = 3       # 非挑战类失败 (record_failure) 连续多少次后打开
+PROBE_TIMEOUT = 120         # 探测请求超过该时间没有结果 (进程崩溃)，允许重新探测
+DB_FILE = os.environ.get("OSINT_BREAKER_DB") or os.path.join(tempfile.gettempdir(), "osint_breaker.db")
+# ===================
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS breakers (
+    name         TEXT PRIMARY KEY,
+    state        TEXT NOT NULL,
+    failures     INTEGER NOT NULL DEFAULT 0,
+    cooldown     REAL NOT NULL,
+    open_until   REAL NOT NULL DEFAULT 0,
+    probe_until  REAL NOT NULL DEFAULT 0,
+    reason       TEXT,
+    updated_at   REAL NOT NULL
+);
+"""
+
+
+class CircuitOpen(Exception):
+    """来源处于熔断状态，本次不发请求"""
+
+    def __init__(self, name: str, retry_after: float = 0.0, reason: Optional[str] = None):
+        self.name = name
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"{name} 熔断中 ({reason or '未知原因'})，{retry_after:.0f} 秒后再试")
+
+
+def session_for(source: str) -> str:
+    return os.environ.get(f"OSINT_SESSION_{source.upper()}") or os.environ.get("OSINT_SESSION") or "default"
+
+
+def _enabled() -> bool:
+    # 回放的是录好的流量，录制时的挑战页不应让本机的真实来源熔断
+    return os.environ.get("OSINT_BREAKER", "1") != "0" and not cassette.replaying()
+
+
+class BreakerStore:
+    """SQLite 状态表；状态转换在 BEGIN IMMEDIATE 事务里完成，多进程之间只有一个探测者"""
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def read(self, name: str) -> Optional[tuple]:
+        return self._conn().execute(
+            "SELECT state, failures, cooldown, open_until, probe_until, reason FROM breakers WHERE name = ?", (name,)
+        ).fetchone()
+
+    def transaction(self):
+        return _Transaction(self._conn())
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, store: BreakerStore, cooldown: float = DEFAULT_COOLDOWN,
+                 threshold: int = FAILURE_THRESHOLD):
+        self.name = name
+        self.store = store
+        self.base_cooldown = cooldown
+        self.threshold = threshold
+        # 本线程拿到的探测资格 (写入的 probe_until 值)，record_success 凭它关闭熔断
+        self._held = threading.local()
+
+    # ---------- 查询 ----------
+
+    def state(self) -> str:
+        row = self.store.read(self.name)
+        if row is None:
+            return CLOSED
+        state, _, _, open_until, probe_until, _ = row
+        now = time.time()
+        if state == OPEN and now >= open_until:
+            return HALF_OPEN
+        return state
+
+    def retry_after(self) -> float:
+        row = self.store.read(self.name)
+        return max(0.0, row[3] - time.time()) if row else 0.0
+
+    def available(self) -> bool:
+        """不占用探测资格的检查：closed，或冷却已结束且没有探测在进行"""
+        if not _enabled():
+            return True
+        row = self.store.read(self.name)
+        if row is None or row[0] == CLOSED:
+            return True
+        now = time.time()
+        return now >= row[3] and now >= row[4]
+
+    # ---------- 放行 ----------
+
+    def allow(self) -> bool:
+        """是否可以发请求；半开状态下只有一个调用方拿到 True (探测)"""
+        if not _enabled():
+            return True
+        row = self.store.read(self.name)
+        if row is None or row[0] == CLOSED:
+            return True
+        now = time.time()
+        if now < row[3] or now < row[4]:
+            return False
+        # 冷却结束，抢探测资格
+        with self.store.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE breakers SET state = ?, probe_until = ?, updated_at = ? "
+                "WHERE name = ? AND state != ? AND open_until <= ? AND probe_until <= ?",
+                (HALF_OPEN, now + PROBE_TIMEOUT, now, self.name, CLOSED, now, now),
+            )
+        if cur.rowcount == 1:
+            self._held.probe = now + PROBE_TIMEOUT
+            print(f"[熔断] {self.name} 冷却结束，放行一个探测请求")
+            metrics.inc("breaker_probes_total", breaker=self.name)
+            return True
+        return False
+
+    def check(self):
+        """allow() 的抛异常版本"""
+        if not self.allow():
+            raise self.open_error()
+
+    def open_error(self) -> CircuitOpen:
+        row = self.store.read(self.name)
+        return CircuitOpen(self.name, self.retry_after(), row[5] if row else None)
+
+    # ---------- 结果反馈 ----------
+
+    def record_success(self):
+        """closed 状态下清零失败计数；open/half_open 状态下只有持有探测资格的线程能关闭熔断"""
+        if not _enabled():
+            return
+        row = self.store.read(self.name)
+        if row is None or (row[0] == CLOSED and row[1] == 0):
+            return
+        probe = getattr(self._held, "probe", None)
+        if row[0] != CLOSED and (probe is None or row[4] != probe):
+            # 打开前已在途的请求成功了，不能据此结束冷却
+            return
+        self._held.probe = None
+        with self.store.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE breakers SET state = ?, failures = 0, cooldown = ?, open_until = 0, probe_until = 0, "
+                "reason = NULL, updated_at = ? WHERE name = ? AND (state = ? OR probe_until = ?)",
+                (CLOSED, self.base_cooldown, time.time(), self.name, CLOSED, probe),
+            )
+        if row[0] != CLOSED and cur.rowcount == 1:
+            print(f"[熔断] {self.name} 探测成功，恢复正常")
+
+    def record_failure(self, reason: str):
+        """普通失败 (超时、5xx)：连续 threshold 次才打开；半开状态下探测失败直接打开"""
+        self._fail(reason, immediate=False)
+
+    def trip(self, reason: str):
+        """检测到验证码/滑块/反爬：立即打开"""
+        self._fail(reason, immediate=True)
+
+    def _fail(self, reason: str, immediate: bool):
+        if not _enabled():
+            return
+        self._held.probe = None
+        now = time.time()
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT state, failures, cooldown, open_until, probe_until FROM breakers WHERE name = ?", (self.name,)
+            ).fetchone()
+            state, failures, cooldown = row[:3] if row else (CLOSED, 0, self.base_cooldown)
+            failures += 1
+            if state == OPEN and now < row[3]:
+                # 已经在冷却 (并发中的其他请求也撞上了挑战)，不重复延长
+                return
+            if state == CLOSED and not immediate and failures < self.threshold:
+                conn.execute(
+                    "INSERT INTO breakers (name, state, failures, cooldown, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET failures = excluded.failures, updated_at = excluded.updated_at",
+                    (self.name, CLOSED, failures, cooldown, now),
+                )
+                return
+            # 探测失败说明冷却不够，下一轮加倍
+            if state != CLOSED:
+                cooldown = min(cooldown * 2, MAX_COOLDOWN)
+            conn.execute(
+                "INSERT INTO breakers (name, state, failures, cooldown, open_until, probe_until, reason, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET state = excluded.state, failures = excluded.failures, "
+                "cooldown = excluded.cooldown, open_until = excluded.open_until, probe_until = 0, "
+                "reason = excluded.reason, updated_at = excluded.updated_at",
+                (self.name, OPEN, failures, cooldown, now + cooldown, reason, now),
+            )
+        print(f"[熔断] {self.name} 打开 ({reason})，冷却 {cooldown:.0f} 秒")
+        metrics.inc("breaker_trips_total", breaker=self.name)
+
+    def reset(self):
+        self.store._conn().execute("DELETE FROM breakers WHERE name = ?", (self.name,))
+
+
+_store: Optional[BreakerStore] = None
+_breakers: Dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get(source: str, session: Optional[str] = None) -> CircuitBreaker:
+    """取来源在当前会话下的熔断器 (同一进程内复用)"""
+    global _store
+    name = f"{source}@{session or session_for(source)}"
+    with _lock:
+        if _store is None:
+            _store = BreakerStore()
+        circuit = _breakers.get(name)
+        if circuit is None:
+            circuit = _breakers[name] = CircuitBreaker(name, _store, COOLDOWNS.get(source, DEFAULT_COOLDOWN))
+    return circuit
@@ -0,0 +1,224 @@
+"""
+录制 / 回放 (cassette)
+录制模式下把一次真实采集的网络流量存进一个目录:
+    http.jsonl.gz       requests 发出的请求 (天眼查 / 千里马 / 微博 getIndex)，每行一个响应
+    <名称>.har.zip      Playwright 浏览器上下文的 HAR (响应体以附件形式压缩存放)
+回放模式下所有请求都从目录里取，不访问网络；脚本里的等待 (cassette.sleep) 直接跳过，
+可以在真实数据上重复对比不同版本的性能，或修改提取逻辑后重跑而不消耗接口额度
+
+开启方式 (环境变量):
+    OSINT_CASSETTE_MODE=record|replay
+    OSINT_CASSETTE=cassettes/山东航空      录制/回放目录
+
+脚本接入:
+    cassette.install_from_env()                    # 模块加载时调用，接管 requests
+    await cassette.attach_har(context, "sogou")    # 创建浏览器上下文后调用
+    cassette.sleep(1.5) / await cassette.async_sleep(1.5)
+"""
+import atexit
+import base64
+import datetime
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from osint_common.sink import JsonlSink, read_jsonl
+
+# ===== 配置区域 =====
+# 每次请求都会变化的查询参数 (时间戳防缓存)，不参与匹配
+VOLATILE_PARAMS = {"_", "t", "ts", "timestamp"}
+# 回放时不需要、或会暴露账号信息的响应头
+DROPPED_HEADERS = {"set-cookie", "content-encoding", "transfer-encoding", "content-length"}
+HTTP_FILE = "http.jsonl.gz"
+# ===================
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """回放时找不到对应的录制响应；沿用各脚本对网络异常的处理"""
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """方法 + 规范化 URL (查询参数排序、去掉易变参数) + 请求体摘要"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    normalized = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+    key = f"{method.upper()} {normalized}"
+    if body:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        key += " " + hashlib.sha1(body).hexdigest()[:16]
+    return key
+
+
+class Cassette:
+    def __init__(self, directory: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"未知的 cassette 模式: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._har_names: Dict[str, int] = {}
+        self._original_send = None
+        self._sink: Optional[JsonlSink] = None
+        self._responses: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        http_path = os.path.join(directory, HTTP_FILE)
+        if mode == "record":
+            self._sink = JsonlSink(http_path[:-len(".gz")], batch_size=20, compression="gzip")
+        elif os.path.exists(http_path):
+            for entry in read_jsonl(http_path):
+                self._responses.setdefault(entry["key"], []).append(entry)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # ---------- requests ----------
+
+    def install(self):
+        """接管 HTTPAdapter.send，覆盖 requests.get 和所有 Session"""
+        if self._original_send is not None:
+            return
+        self._original_send = HTTPAdapter.send
+        cassette = self
+
+        def send(adapter, request, *args, **kwargs):
+            if cassette.replaying:
+                return cassette._replay(request)
+            response = cassette._original_send(adapter, request, *args, **kwargs)
+            cassette._record(request, response)
+            return response
+
+        HTTPAdapter.send = send
+
+    def uninstall(self):
+        if self._original_send is not None:
+            HTTPAdapter.send = self._original_send
+            self._original_send = None
+
+    def _record(self, request, response):
+        content = response.content
+        try:
+            body, encoding = content.decode("utf-8"), "text"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        self._sink.write({
+            "key": request_key(request.method, request.url, request.body),
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS},
+            "body": body,
+            "encoding": encoding,
+        })
+
+    def _replay(self, request) -> requests.Response:
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            entries = self._responses.get(key)
+            if not entries:
+                raise CassetteMiss(f"cassette 中没有该请求: {key}", request=request)
+            # 同一请求按录制顺序依次返回，用完后重复最后一条
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            entry = entries[min(index, len(entries) - 1)]
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry.get("reason")
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = entry["url"]
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.elapsed = datetime.timedelta(0)
+        body = entry["body"]
+        response._content = base64.b64decode(body) if entry["encoding"] == "base64" else body.encode("utf-8")
+        return response
+
+    # ---------- Playwright ----------
+
+    def har_path(self, name: str) -> str:
+        """同名上下文多次创建时依次编号 (name、name.1 ...)，回放时按相同顺序对应"""
+        with self._lock:
+            index = self._har_names.get(name, 0)
+            self._har_names[name] = index + 1
+        suffix = f".{index}" if index else ""
+        return os.path.join(self.directory, f"{name}{suffix}.har.zip")
+
+    def _har_options(self, name: str) -> Dict[str, Any]:
+        path = self.har_path(name)
+        if self.replaying:
+            # 回放时未录制的请求直接中止，保证完全离线
+            return {"har": path, "not_found": "abort"}
+        # 录制：HAR 在上下文关闭时写出
+        return {"har": path, "update": True, "update_content": "attach"}
+
+    async def attach(self, context, name: str):
+        await context.route_from_har(**self._har_options(name))
+
+    def attach_sync(self, context, name: str):
+        context.route_from_har(**self._har_options(name))
+
+    def close(self):
+        self.uninstall()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+_active: Optional[Cassette] = None
+
+
+def install_from_env() -> Optional[Cassette]:
+    """按环境变量开启录制/回放；未设置时什么都不做。同一进程只创建一次"""
+    global _active
+    if _active is not None:
+        return _active
+    mode = os.environ.get("OSINT_CASSETTE_MODE")
+    if not mode:
+        return None
+    _active = Cassette(os.environ.get("OSINT_CASSETTE", "cassettes/default"), mode)
+    _active.install()
+    atexit.register(_active.close)
+    print(f"[cassette] {mode}: {_active.directory}")
+    return _active
+
+
+def active() -> Optional[Cassette]:
+    return _active
+
+
+def replaying() -> bool:
+    return _active is not None and _active.replaying
+
+
+async def attach_har(context, name: str):
+    if _active is not None:
+        await _active.attach(context, name)
+
+
+def attach_har_sync(context, name: str):
+    if _active is not None:
+        _active.attach_sync(context, name)
+
+
+def sleep(seconds: float):
+    """限速等待；回放时跳过"""
+    if not replaying():
+        time.sleep(seconds)
+
+
+async def async_sleep(seconds: float):
+    if not replaying():
+        # asyncio 只在浏览器脚本里用到，纯接口脚本不为它付 import 开销
+        import asyncio
+        await asyncio.sleep(seconds)
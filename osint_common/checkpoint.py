@@ -0,0 +1,212 @@
+"""
+长任务断点续采
+采集过程中定期把进度 (已处理的 UID、已收集的用户、文章序号、已翻的页和已解密的哈希等) 写入 JSON 文件，
+进程崩溃或被中断后加 --resume 重跑，从断点继续，不再重复翻页、滚动和消耗解密额度
+
+    * 断点按 "来源 + 任务键 (关键词)" 区分，放在 CHECKPOINT_DIR 下
+    * 每 SAVE_EVERY 次改动或每 SAVE_INTERVAL 秒落盘一次；先写临时文件再 os.replace，崩溃时不会写坏
+    * 正常结束时删除断点；异常退出 (含 Ctrl+C、熔断)，或有关键词/用户失败 (incomplete()) 时保存
+    * 不加 --resume 时丢弃旧断点，从头开始
+
+断点只记录 "已完成" 的工作，结果文件里的数据须先于断点落盘 (before_save 里 flush 输出)，
+否则崩溃后断点说已完成、结果文件里却没有
+
+用法:
+    with checkpoint.start("weibo", keyword, resume=True, before_save=sink.flush) as ckpt:
+        for user in users:
+            if ckpt.is_marked("done", user["uid"]):
+                continue
+            ...
+            ckpt.mark("done", user["uid"])
+
+环境变量:
+    OSINT_CHECKPOINT_DIR   断点目录，默认当前目录下的 checkpoints
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+# ===== 配置区域 =====
+CHECKPOINT_DIR = os.environ.get("OSINT_CHECKPOINT_DIR") or "checkpoints"
+SAVE_EVERY = 20         # 累计多少次改动后落盘
+SAVE_INTERVAL = 15.0    # 距上次落盘超过多少秒后，下一次改动即落盘
+FORMAT_VERSION = 1
+# ===================
+
+
+def checkpoint_path(collector: str, key: str, directory: Optional[str] = None) -> str:
+    """断点文件路径: <目录>/<来源>_<关键词>_<哈希>.json (关键词里的非法字符去掉，哈希避免截断后重名)"""
+    safe_key = "".join(ch for ch in key if ch not in '\\/:*?"<>| \'')[:40]
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(directory or CHECKPOINT_DIR, f"{collector}_{safe_key}_{digest}.json")
+
+
+class Checkpoint:
+    """
+    一次采集任务的断点，线程安全
+
+    state 里只放 JSON 可序列化的值；集合类进度用 mark()/is_marked()，内部按列表保存
+    """
+
+    def __init__(self, collector: str, key: str, resume: bool = False,
+                 before_save: Optional[Callable[[], None]] = None,
+                 directory: Optional[str] = None,
+                 save_every: int = SAVE_EVERY,
+                 save_interval: float = SAVE_INTERVAL):
+        """
+        Args:
+            collector: 来源名
+            key: 任务键，通常是关键词；同一来源的不同任务互不影响
+            resume: True=读取已有断点接着采，False=丢弃旧断点
+            before_save: 每次落盘前调用 (一般是结果文件的 flush)
+        """
+        self.collector = collector
+        self.key = key
+        self.path = checkpoint_path(collector, key, directory)
+        self.before_save = before_save
+        self.save_every = max(1, save_every)
+        self.save_interval = save_interval
+
+        self.state: Dict[str, Any] = {}
+        self.resumed = False
+        self._sets: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._saved_at = time.monotonic()
+        self._incomplete: List[str] = []
+
+        if resume:
+            self.state = self._load()
+            self.resumed = bool(self.state)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[!] 断点文件损坏，从头开始: {self.path} ({e})")
+            return {}
+        if payload.get("version") != FORMAT_VERSION or payload.get("key") != self.key:
+            print(f"[!] 断点文件与当前任务不匹配，从头开始: {self.path}")
+            return {}
+        return payload.get("state") or {}
+
+    # ---------- 读写进度 ----------
+
+    def get(self, field: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.state.get(field, default)
+
+    def set(self, field: str, value: Any):
+        """覆盖一个字段 (value 需可 JSON 序列化)"""
+        with self._lock:
+            self.state[field] = value
+            self.changed()
+
+    def extend(self, field: str, items: Iterable[Any]):
+        """往列表字段末尾追加 (如已收集的搜索结果)"""
+        with self._lock:
+            self.state.setdefault(field, []).extend(items)
+            self.changed()
+
+    def _set_of(self, field: str) -> Set[Hashable]:
+        if field not in self._sets:
+            self._sets[field] = set(self.state.setdefault(field, []))
+        return self._sets[field]
+
+    def mark(self, field: str, item: Hashable):
+        """把 item 记入集合字段 (如已处理的 UID)，重复标记不算改动"""
+        with self._lock:
+            marked = self._set_of(field)
+            if item in marked:
+                return
+            marked.add(item)
+            self.state[field].append(item)
+            self.changed()
+
+    def is_marked(self, field: str, item: Hashable) -> bool:
+        with self._lock:
+            return item in self._set_of(field)
+
+    def marked(self, field: str) -> Set[Hashable]:
+        with self._lock:
+            return set(self._set_of(field))
+
+    # ---------- 落盘 ----------
+
+    def changed(self):
+        """调用方直接修改了 state 里的可变对象后调用；累计到阈值时落盘"""
+        with self._lock:
+            self._pending += 1
+            if self._pending >= self.save_every or time.monotonic() - self._saved_at >= self.save_interval:
+                self.save()
+
+    def save(self):
+        with self._lock:
+            if self.before_save:
+                self.before_save()
+            payload = {
+                "version": FORMAT_VERSION,
+                "collector": self.collector,
+                "key": self.key,
+                "saved_at": time.time(),
+                "state": self.state,
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._pending = 0
+            self._saved_at = time.monotonic()
+
+    def incomplete(self, reason: str):
+        """有工作失败 (未记为已完成)：任务正常结束时也保留断点，--resume 可重试这部分"""
+        with self._lock:
+            self._incomplete.append(reason)
+
+    def finish(self):
+        """任务完整结束，删除断点；之后的 --resume 从头开始"""
+        with self._lock:
+            self._pending = 0
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and not self._incomplete:
+            self.finish()
+        elif exc_type is None:
+            self.save()
+            print(f"[*] 有 {len(self._incomplete)} 项未完成，进度已保存，加 --resume 重跑可重试: {self.path}")
+        else:
+            self.save()
+            print(f"[*] 进度已保存，加 --resume 重跑可从断点继续: {self.path}")
+
+
+def enabled(resume: bool = False) -> bool:
+    """
+    被编排器/云函数调用的入口是否需要写断点：要求了续采，或显式配置了 OSINT_CHECKPOINT_DIR；
+    否则每次调用都在当前目录留下断点文件，却没有人会续采
+    """
+    return resume or bool(os.environ.get("OSINT_CHECKPOINT_DIR"))
+
+
+def start(collector: str, key: str, resume: bool = False, **kwargs) -> Checkpoint:
+    """开始一次采集任务；resume=True 时接着上次的断点"""
+    ckpt = Checkpoint(collector, key, resume=resume, **kwargs)
+    if ckpt.resumed:
+        print(f"[*] 从断点继续: {ckpt.path}")
+    return ckpt
@@ -0,0 +1,244 @@
+"""
+统一命令行入口 (osint)
+各采集脚本位于不同目录、在模块顶层 import Playwright / requests；这里按子命令延迟加载，
+--help、参数错误、天眼查/千里马这类纯接口任务都不会加载浏览器库。
+调度器会启动大量短任务，启动耗时由 benchmarks/startup_bench.py 按预算检查
+
+用法:
+    python osint.py tianyancha 腾讯科技 --token <Token>
+    python osint.py qianlima 山东航空
+    python osint.py sogou "山东航空 联系方式" --count 10 -o sogou.jsonl
+    python osint.py douyin 山东航空 山航 -o douyin.jsonl
+    python osint.py weibo 山东航空 -o weibo.jsonl
+    python osint.py weibo 山东航空 -o weibo.jsonl --resume   # 上次中断后从断点继续
+    python osint.py run 山东航空 --sources qianlima weibo -o dossier.json
+    python osint.py queue stats              # 其余参数原样交给 osint_common.jobqueue
+
+注意: 本模块顶层只允许 import 标准库的轻量模块，采集相关的 import 一律放进子命令函数
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+# 子命令 -> (脚本路径, 模块名)；模块名与编排器保持一致，同一进程内共用缓存
+SCRIPTS = {
+    "qianlima": ("千里马/qianlima.py", "qianlima"),
+    "tianyancha": ("天眼查/tianyancha.py", "tianyancha"),
+    "sogou": ("搜狗浏览器/sougou.py", "sougou"),
+    "douyin": ("test-douyin.py", "test_douyin"),
+    "weibo": ("weibo-userlist.py", "weibo_userlist"),
+}
+
+
+def load_collector(name: str):
+    """加载子命令对应的采集脚本 (启动基准测试也用它测各脚本的 import 耗时)"""
+    from osint_common.scripts import load_script
+    path, module_name = SCRIPTS[name]
+    return load_script(path, module_name)
+
+
+def _execute(fn: Callable[[], object]) -> int:
+    """与各脚本 __main__ 相同的外壳：指标导出、性能剖析、熔断提示"""
+    from osint_common import breaker, metrics, profiling
+
+    metrics.start_from_env()
+    try:
+        profiling.run(fn)
+    except breaker.CircuitOpen as e:
+        print(f"[!] {e}")
+        return 2
+    return 0
+
+
+def _default_output(keyword: str) -> str:
+    safe_name = "".join(ch for ch in keyword if ch not in '\\/:*?"<>| \'')
+    return os.path.join("data", f"{safe_name}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+
+# ================= 子命令 =================
+
+def cmd_tianyancha(args) -> int:
+    from types import SimpleNamespace
+    from osint_common.sink import JsonlSink
+
+    module = load_collector("tianyancha")
+    token = args.token or os.environ.get("TIANYANCHA_TOKEN")
+    if not token:
+        print("[!] 缺少天眼查 Token (--token 或环境变量 TIANYANCHA_TOKEN)")
+        return 1
+    handler_args = SimpleNamespace(input=SimpleNamespace(token=token, keyword=args.keyword), is_test=False)
+    result = {}
+
+    def run():
+        result.update(module.handler(handler_args))
+
+    code = _execute(run)
+    if code or "error" in result:
+        if result.get("error"):
+            print(f"[ERROR] {result['error']}")
+        return code or 1
+    output = args.output or _default_output(args.keyword)
+    with JsonlSink(output, fsync=True, collector="tianyancha") as sink:
+        sink.write(result)
+    print(f"[SUCCESS] 已保存至: {os.path.abspath(output)}")
+    return 0
+
+
+def cmd_qianlima(args) -> int:
+    from osint_common.sink import JsonlSink
+
+    module = load_collector("qianlima")
+    module.Config.RESUME = args.resume
+    result = {}
+
+    def run():
+        result.update(module.handler({"keyword": args.keyword}))
+
+    code = _execute(run)
+    if code or "error" in result:
+        if result.get("error"):
+            print(f"[ERROR] {result['error']}")
+        return code or 1
+    output = args.output or module.Config.OUTPUT_FILE
+    # 与脚本一致：追加写入，多次查询累积在同一个文件里
+    with JsonlSink(output, batch_size=1, append=True, collector="qianlima") as sink:
+        sink.write(result)
+    print(f"企业: {result['nickname']}  手机: {result['contact_mobile'] or '无'}  已保存至: {output}")
+    return 0
+
+
+def cmd_sogou(args) -> int:
+    import asyncio
+
+    module = load_collector("sogou")
+    module.HEADLESS = not args.headful
+    module.RESUME = args.resume
+    return _execute(lambda: asyncio.run(module.run(
+        keyword=args.keyword,
+        target_count=args.count or module.TARGET_COUNT,
+        filename=args.output or module.FILENAME,
+    )))
+
+
+def cmd_douyin(args) -> int:
+    import asyncio
+
+    module = load_collector("douyin")
+    if args.shards:
+        module.CONFIG["shards"] = args.shards
+    module.CONFIG["resume"] = args.resume
+    headless = True if args.headless else None
+    return _execute(lambda: asyncio.run(module.run(keywords=args.keywords, save_file_name=args.output,
+                                                   headless=headless)))
+
+
+def cmd_weibo(args) -> int:
+    module = load_collector("weibo")
+    module.HEADLESS = not args.headful
+    module.RESUME = args.resume
+    if args.no_posts:
+        module.MINE_POSTS = False
+    return _execute(lambda: module.main(keyword=args.keyword, output_file=args.output or module.OUTPUT_FILE))
+
+
+def cmd_run(args) -> int:
+    import asyncio
+    import json
+    from osint_common.orchestrator import Orchestrator
+
+    config = {"tianyancha": {"token": args.token or os.environ.get("TIANYANCHA_TOKEN", "")}}
+    orchestrator = Orchestrator(config, args.sources)
+    results = []
+
+    def run():
+        results.extend(asyncio.run(orchestrator.run_targets(args.targets)))
+
+    code = _execute(run)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[*] 档案已保存: {args.output}")
+    else:
+        for result in results:
+            print(json.dumps({k: result[k] for k in ("target", "elapsed", "sources", "dossiers")},
+                             ensure_ascii=False, indent=2))
+    return code
+
+
+def cmd_queue(queue_args: List[str]) -> int:
+    from osint_common import jobqueue
+
+    sys.argv = ["osint queue"] + queue_args
+    jobqueue.main()
+    return 0
+
+
+# ================= 参数解析 =================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="osint", description="OSINT 采集工具统一入口")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="<子命令>")
+
+    p = sub.add_parser("tianyancha", help="天眼查企业接口 (无浏览器)")
+    p.add_argument("keyword", help="公司名称")
+    p.add_argument("--token", help="天眼查 Token，默认读环境变量 TIANYANCHA_TOKEN")
+    p.add_argument("-o", "--output", help="输出 JSONL，默认 data/<公司名>_<时间>.jsonl")
+    p.set_defaults(func=cmd_tianyancha)
+
+    p = sub.add_parser("qianlima", help="千里马联系人与手机号解密 (无浏览器)")
+    p.add_argument("keyword", help="公司名称")
+    p.add_argument("-o", "--output", help="输出 JSONL (追加)，默认使用脚本配置")
+    p.add_argument("--resume", action="store_true", help="从断点继续，已翻的页和已解密的号码不再请求")
+    p.set_defaults(func=cmd_qianlima)
+
+    p = sub.add_parser("sogou", help="搜狗微信文章溯源")
+    p.add_argument("keyword", help="搜索关键词")
+    p.add_argument("--count", type=int, help="解析的文章数")
+    p.add_argument("--headful", action="store_true", help="显示浏览器窗口")
+    p.add_argument("-o", "--output", help="输出 JSONL")
+    p.add_argument("--resume", action="store_true", help="从断点继续，跳过已解析的文章")
+    p.set_defaults(func=cmd_sogou)
+
+    p = sub.add_parser("douyin", help="抖音用户搜索")
+    p.add_argument("keywords", nargs="+", help="一个或多个关键词")
+    p.add_argument("--shards", type=int, help="并行浏览器分片数")
+    p.add_argument("--headless", action="store_true", help="后台运行 (需已登录的浏览器目录)")
+    p.add_argument("-o", "--output", help="输出 JSONL")
+    p.add_argument("--resume", action="store_true", help="从断点继续，跳过已完成的关键词")
+    p.set_defaults(func=cmd_douyin)
+
+    p = sub.add_parser("weibo", help="微博用户搜索与详情")
+    p.add_argument("keyword", help="搜索关键词")
+    p.add_argument("--headful", action="store_true", help="显示浏览器窗口")
+    p.add_argument("--no-posts", action="store_true", help="不挖掘最近微博")
+    p.add_argument("-o", "--output", help="输出 JSONL")
+    p.add_argument("--resume", action="store_true", help="从断点继续，跳过已翻的搜索页和已写出的用户")
+    p.set_defaults(func=cmd_weibo)
+
+    p = sub.add_parser("run", help="多来源并发采集并合并成档案")
+    p.add_argument("targets", nargs="+", help="一个或多个目标")
+    p.add_argument("--sources", nargs="*", choices=sorted(SCRIPTS), help="启用的来源，默认全部")
+    p.add_argument("--token", help="天眼查 Token，默认读环境变量 TIANYANCHA_TOKEN")
+    p.add_argument("-o", "--output", help="档案输出 JSON")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("queue", help="任务队列 (参数同 python -m osint_common.jobqueue)", add_help=False)
+    p.add_argument("queue_args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=lambda args: cmd_queue(args.queue_args))
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    # queue 的参数 (含 --url/--db 等选项) 整体转交，不经过本解析器
+    if argv[:1] == ["queue"]:
+        return cmd_queue(argv[1:])
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+本地 SQLite 联系方式库
+五个采集脚本的输出格式各不相同 (contact_mobile 用 "; " 拼接、contacts.mobile 列表、
+extracted_data 数组、persons 列表)，这里统一拆成 主体 / 联系方式 / 来源 三张表，
+并在归一化后的号码、邮箱、微信和主体名称上建索引，百万级数据也能毫秒级反查
+"""
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from osint_common.normalize import normalize_contact, normalize_name, normalize_phone
+from osint_common.sink import read_jsonl
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    collector TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    collected_at REAL NOT NULL,
+    UNIQUE (collector, ref)
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    collector TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    name TEXT,
+    name_norm TEXT,
+    kind TEXT,
+    UNIQUE (collector, external_id)
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    entity_id INTEGER NOT NULL REFERENCES entities(id),
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    value_norm TEXT NOT NULL,
+    person TEXT,
+    context TEXT,
+    UNIQUE (entity_id, source_id, type, value_norm)
+);
+CREATE INDEX IF NOT EXISTS idx_contacts_value ON contacts(value_norm, type);
+CREATE INDEX IF NOT EXISTS idx_contacts_entity ON contacts(entity_id);
+CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(name_norm);
+"""
+
+# 采集脚本在识别不出主体时填的占位名称，不能当作同一个主体
+PLACEHOLDER_NAMES = {"未识别主体", "未知", "未知企业", "未命名"}
+
+# 一个主体: (external_id, name, kind)
+Entity = Tuple[str, str, str]
+# 一条联系方式: (type, value, person, context)
+Contact = Tuple[str, str, Optional[str], Optional[str]]
+# 一条记录拆出来的结果: (来源标识, [(主体, [联系方式])])
+Parsed = Tuple[str, List[Tuple[Entity, List[Contact]]]]
+
+
+def classify_phone(value: str) -> str:
+    """11 位 1 开头的是手机，其余算座机/热线"""
+    digits = normalize_phone(value)
+    return "mobile" if len(digits) == 11 and digits.startswith("1") else "landline"
+
+
+def _split_joined(text: str) -> List[Tuple[str, Optional[str]]]:
+    """拆开 "号码 (备注); 号码 (备注)" 这种拼接字符串"""
+    items = []
+    for part in str(text or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        value, _, note = part.partition(" (")
+        items.append((value.strip(), note.rstrip(")") or None))
+    return items
+
+
+# ================= 各采集脚本的记录解析 =================
+
+def parse_qianlima(record: Dict[str, Any]) -> Parsed:
+    """qianlima.py 的 transform_to_osint_json 输出，或 QianlimaCollector 的标准响应"""
+    if "persons" in record:
+        target = record.get("target", {})
+        name = target.get("name", "")
+        contacts = []
+        if target.get("phone"):
+            contacts.append((classify_phone(target["phone"]), target["phone"], None, "企业注册电话"))
+        for person in record.get("persons", []):
+            if person.get("decrypted_mobile"):
+                contacts.append(("mobile", person["decrypted_mobile"], person.get("name"), person.get("position")))
+            if person.get("phone"):
+                contacts.append((classify_phone(person["phone"]), person["phone"], person.get("name"), person.get("position")))
+        return name, [((name, name, "company"), contacts)]
+
+    name = record.get("nickname", "")
+    contacts = []
+    # details_raw 带联系人姓名，先写入；拼接字符串里的同一号码会被去重
+    for detail in record.get("details_raw", []):
+        if detail.get("decrypted_mobile"):
+            contacts.append(("mobile", detail["decrypted_mobile"], detail.get("name"), detail.get("title")))
+    for value, note in _split_joined(record.get("contact_mobile")):
+        contacts.append(("mobile", value, None, note))
+    for value, note in _split_joined(record.get("contact_landline")):
+        contacts.append((classify_phone(value), value, None, note))
+    return record.get("uid") or name, [((record.get("uid") or name, name, "company"), contacts)]
+
+
+def parse_tianyancha(record: Dict[str, Any]) -> Parsed:
+    """tianyancha.handler 的输出 (target + data.联系方式)"""
+    name = record.get("target", "")
+    contacts = []
+    contact_data = (record.get("data", {}).get("联系方式") or {}).get("result") or {}
+    for key in ("phoneNumber", "phone"):
+        if contact_data.get(key):
+            contacts.append((classify_phone(contact_data[key]), contact_data[key], None, "天眼查联系方式"))
+    if contact_data.get("email"):
+        contacts.append(("email", contact_data["email"], None, "天眼查联系方式"))
+    return name, [((name, name, "company"), contacts)]
+
+
+def is_placeholder(name: Optional[str]) -> bool:
+    return not name or not str(name).strip() or str(name).strip() in PLACEHOLDER_NAMES
+
+
+def parse_sogou(record: Dict[str, Any]) -> Parsed:
+    """sougou.py 的文章记录，一篇文章可能包含多个主体"""
+    url = record.get("url", "")
+    grouped: Dict[str, List[Contact]] = {}
+    for item in record.get("extracted_data", []):
+        entity = item.get("entity") or "未识别主体"
+        person = item.get("contact_person")
+        grouped.setdefault(entity, []).append(
+            (item["type"], item["value"], None if person == "未知" else person, item.get("context"))
+        )
+    entities = []
+    for name, contacts in grouped.items():
+        external_id = normalize_name(name)
+        if is_placeholder(name):
+            # 没识别出主体的联系方式只属于这篇文章，不同文章的占位主体不是同一个
+            external_id = f"{url}#{external_id}"
+        entities.append(((external_id, name, "company"), contacts))
+    return url, entities
+
+
+def parse_douyin(record: Dict[str, Any]) -> Parsed:
+    """test-douyin.py 的用户记录 (contacts 为分类列表)"""
+    url = record.get("profile_url", "")
+    contacts = []
+    for c_type, values in (record.get("contacts") or {}).items():
+        for value in values:
+            contacts.append((c_type, value, None, record.get("description")))
+    return url, [((url, record.get("nickname", ""), "account"), contacts)]
+
+
+def parse_weibo(record: Dict[str, Any]) -> Parsed:
+    """weibo-userlist.py 的用户记录 (contact_* 为 "; " 拼接字符串，post_contacts 来自微博正文)"""
+    uid = str(record.get("uid", ""))
+    contacts = []
+    for c_type in ("mobile", "landline", "wechat", "qq"):
+        for value, _ in _split_joined(record.get(f"contact_{c_type}")):
+            contacts.append((c_type, value, None, "简介"))
+    for hit in record.get("post_contacts", []):
+        contacts.append((hit["type"], hit["value"], None, f"微博 {hit.get('post_id')}"))
+    return f"https://weibo.com/u/{uid}", [((uid, record.get("nickname", ""), "account"), contacts)]
+
+
+PARSERS: Dict[str, Callable[[Dict[str, Any]], Parsed]] = {
+    "qianlima": parse_qianlima,
+    "tianyancha": parse_tianyancha,
+    "sogou": parse_sogou,
+    "douyin": parse_douyin,
+    "weibo": parse_weibo,
+}
+
+
+class ContactStore:
+    """
+    所有来源共用的联系方式库
+
+    用法:
+        with ContactStore("osint_contacts.db") as store:
+            store.add_weibo(users)
+            store.find_contact("138-0013-8000")
+    """
+
+    def __init__(self, path: str = "osint_contacts.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    # ---------- 写入 ----------
+
+    def _entity_id(self, collector: str, entity: Entity, cache: Dict[str, int]) -> int:
+        external_id, name, kind = entity
+        if external_id in cache:
+            return cache[external_id]
+        self.conn.execute(
+            "INSERT INTO entities (collector, external_id, name, name_norm, kind) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (collector, external_id) DO UPDATE SET name = excluded.name, name_norm = excluded.name_norm",
+            (collector, external_id, name, normalize_name(name), kind)
+        )
+        entity_id = self.conn.execute(
+            "SELECT id FROM entities WHERE collector = ? AND external_id = ?", (collector, external_id)
+        ).fetchone()[0]
+        cache[external_id] = entity_id
+        return entity_id
+
+    def _source_id(self, collector: str, ref: str, now: float) -> int:
+        """同一来源 (collector, ref) 只有一行，重复导入时只刷新采集时间"""
+        self.conn.execute(
+            "INSERT INTO sources (collector, ref, collected_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (collector, ref) DO UPDATE SET collected_at = excluded.collected_at",
+            (collector, ref, now)
+        )
+        return self.conn.execute(
+            "SELECT id FROM sources WHERE collector = ? AND ref = ?", (collector, ref)
+        ).fetchone()[0]
+
+    def ingest(self, collector: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        批量写入某个采集脚本的输出记录 (单个事务)；同一份输出重复导入不会产生重复数据
+
+        Args:
+            collector: qianlima / tianyancha / sogou / douyin / weibo
+            records: 该脚本输出的记录
+
+        Returns:
+            新写入的联系方式条数
+        """
+        if collector not in PARSERS:
+            raise ValueError(f"未知的采集来源: {collector}")
+        parse = PARSERS[collector]
+        now = time.time()
+        entity_ids: Dict[str, int] = {}
+        rows = []
+
+        with self.conn:
+            for record in records:
+                ref, entities = parse(record)
+                source_id = self._source_id(collector, ref, now)
+                for entity, contacts in entities:
+                    if not entity[0]:
+                        continue
+                    entity_id = self._entity_id(collector, entity, entity_ids)
+                    for c_type, value, person, context in contacts:
+                        value_norm = normalize_contact(c_type, value)
+                        if value_norm:
+                            rows.append((entity_id, source_id, c_type, value, value_norm, person, context))
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO contacts (entity_id, source_id, type, value, value_norm, person, context) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return self.conn.total_changes - before
+
+    def ingest_file(self, collector: str, path: str) -> int:
+        """写入 JsonlSink 输出的文件"""
+        return self.ingest(collector, read_jsonl(path))
+
+    def add_qianlima(self, records: Iterable[Dict[str, Any]]) -> int:
+        return self.ingest("qianlima", records)
+
+    def add_tianyancha(self, records: Iterable[Dict[str, Any]]) -> int:
+        return self.ingest("tianyancha", records)
+
+    def add_sogou(self, records: Iterable[Dict[str, Any]]) -> int:
+        return self.ingest("sogou", records)
+
+    def add_douyin(self, records: Iterable[Dict[str, Any]]) -> int:
+        return self.ingest("douyin", records)
+
+    def add_weibo(self, records: Iterable[Dict[str, Any]]) -> int:
+        return self.ingest("weibo", records)
+
+    # ---------- 查询 ----------
+
+    def find_contact(self, value: str, contact_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        反查某个号码/邮箱/微信在哪些主体、哪些来源出现过
+
+        Args:
+            value: 原始值，会按类型归一化；不指定类型时按号码和原样各查一次
+            contact_type: mobile / landline / email / wechat / qq
+        """
+        if contact_type:
+            candidates = {(contact_type, normalize_contact(contact_type, value))}
+        else:
+            candidates = {(None, normalize_phone(value)), (None, str(value).strip().lower())}
+
+        results = []
+        for c_type, norm in candidates:
+            if not norm:
+                continue
+            sql = (
+                "SELECT c.type, c.value, c.person, c.context, e.id AS entity_id, e.name AS entity_name, "
+                "e.collector, e.external_id, s.ref AS source_ref, s.collected_at "
+                "FROM contacts c JOIN entities e ON e.id = c.entity_id JOIN sources s ON s.id = c.source_id "
+                "WHERE c.value_norm = ?"
+            )
+            params = [norm]
+            if c_type:
+                sql += " AND c.type = ?"
+                params.append(c_type)
+            results.extend(dict(row) for row in self.conn.execute(sql, params))
+        return results
+
+    def find_entity(self, name: str) -> List[Dict[str, Any]]:
+        """按归一化名称精确查找主体"""
+        rows = self.conn.execute(
+            "SELECT id, collector, external_id, name, kind FROM entities WHERE name_norm = ?",
+            (normalize_name(name),)
+        )
+        return [dict(row) for row in rows]
+
+    def entity_contacts(self, entity_id: int) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT c.type, c.value, c.person, c.context, s.ref AS source_ref "
+            "FROM contacts c JOIN sources s ON s.id = c.source_id WHERE c.entity_id = ?",
+            (entity_id,)
+        )
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,223 @@
+"""
+跨来源实体关联
+同一家公司会以千里马 nickname、天眼查 target、搜狗 entity、微博 verified_reason 等不同形式出现。
+这里用 "分块键" (归一化号码 / 邮箱 / 微信 / QQ / 公司名) 把记录增量合并成簇，
+每条记录只和共享键的已有簇合并 (并查集)，整体近似线性时间；每个簇输出一份合并档案
+
+共享同一个键的记录超过 max_block_size 时，该键视为公共号码 (客服热线等)：键被拉黑，
+之前经由它做的合并在下次查询簇时撤销 (按剩余的键重建并查集)
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from osint_common.contact_store import PARSERS, is_placeholder
+from osint_common.normalize import (
+    company_key, find_company_names, looks_like_company, normalize_contact, phone_key
+)
+from osint_common.sink import read_jsonl
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def add(self, node: str):
+        if node not in self.parent:
+            self.parent[node] = node
+            self.size[node] = 1
+
+    def find(self, node: str) -> str:
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # 路径压缩
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+
+    def union(self, a: str, b: str) -> str:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+
+class EntityResolver:
+    """
+    增量实体关联
+
+    用法:
+        resolver = EntityResolver()
+        resolver.add_file("qianlima", "qianlima_osint_data.jsonl")
+        resolver.add_file("weibo", "weibo_osint_data.jsonl")
+        for dossier in resolver.dossiers():
+            ...
+    """
+
+    def __init__(self, max_block_size: int = 50, stop_keys: Iterable[str] = ()):
+        """
+        Args:
+            max_block_size: 一个键最多关联的记录数；超过后视为公共号码 (如客服热线)，已做的合并也撤销
+            stop_keys: 不参与合并的键，格式同 blocking_keys 的返回值，如 "phone:95369"
+        """
+        self.max_block_size = max_block_size
+        self.stop_keys: Set[str] = set(stop_keys)
+        self._uf = _UnionFind()
+        self._blocks: Dict[str, Set[str]] = {}           # 键 -> 共享该键的记录 (不含已拉黑的键)
+        self._hot_keys: Set[str] = set()                 # 超过 max_block_size 被拉黑的键
+        self._dirty = False                              # 有键被拉黑，并查集需要重建
+        self._nodes: Dict[str, Dict[str, Any]] = {}      # 记录 id -> 名称/联系方式/来源
+
+    # ---------- 分块键 ----------
+
+    @staticmethod
+    def blocking_keys(names: Iterable[str], contacts: Iterable[Tuple[str, str]]) -> Set[str]:
+        keys = set()
+        for name in names:
+            if is_placeholder(name):
+                continue
+            key = company_key(name)
+            if len(key) >= 2:
+                keys.add(f"name:{key}")
+        for c_type, value in contacts:
+            if c_type in ("mobile", "landline"):
+                key = phone_key(value)
+                # 过短的号码 (如 5 位短号) 区分度太低
+                if len(key) >= 7:
+                    keys.add(f"phone:{key}")
+            else:
+                key = normalize_contact(c_type, value)
+                if key:
+                    keys.add(f"{c_type}:{key}")
+        return keys
+
+    @staticmethod
+    def _company_names(collector: str, name: str, kind: str, record: Dict[str, Any]) -> List[str]:
+        """取出可用于名称匹配的公司名：企业类主体直接用名称，账号类只用认证信息里的公司名"""
+        names = []
+        if kind == "company" or looks_like_company(name):
+            names.append(name)
+        for field in ("verified_reason", "description"):
+            if field in record and collector in ("weibo", "douyin"):
+                names.extend(find_company_names(str(record.get(field) or "")))
+        return names
+
+    # ---------- 增量写入 ----------
+
+    def add(self, collector: str, record: Dict[str, Any]) -> List[str]:
+        """加入一条采集记录，返回它拆出的记录 id"""
+        ref, entities = PARSERS[collector](record)
+        node_ids = []
+        for (external_id, name, kind), contacts in entities:
+            if not external_id:
+                continue
+            node_id = f"{collector}:{external_id}"
+            node = self._nodes.setdefault(node_id, {
+                "collector": collector, "external_id": external_id, "names": set(),
+                "contacts": set(), "sources": set(),
+            })
+            names = self._company_names(collector, name, kind, record)
+            node["names"].update(n for n in [name, *names] if not is_placeholder(n))
+            node["sources"].add(ref)
+            pairs = [(c_type, value) for c_type, value, _, _ in contacts]
+            node["contacts"].update(pairs)
+
+            self._uf.add(node_id)
+            for key in self.blocking_keys(names, pairs):
+                if key in self.stop_keys or key in self._hot_keys:
+                    continue
+                members = self._blocks.setdefault(key, set())
+                if node_id in members:
+                    continue
+                if len(members) >= self.max_block_size:
+                    # 公共号码：拉黑该键，之前经由它的合并在重建时撤销
+                    del self._blocks[key]
+                    self._hot_keys.add(key)
+                    self._dirty = True
+                    continue
+                if members:
+                    # 块内记录已在同一个簇，和任意一个合并即可
+                    self._uf.union(next(iter(members)), node_id)
+                members.add(node_id)
+            node_ids.append(node_id)
+        return node_ids
+
+    def _rebuild(self):
+        """按未被拉黑的键重建并查集"""
+        uf = _UnionFind()
+        for node_id in self._nodes:
+            uf.add(node_id)
+        for members in self._blocks.values():
+            anchor = next(iter(members))
+            for node_id in members:
+                uf.union(anchor, node_id)
+        self._uf = uf
+        self._dirty = False
+
+    def _find(self, node_id: str) -> str:
+        if self._dirty:
+            self._rebuild()
+        return self._uf.find(node_id)
+
+    def add_records(self, collector: str, records: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for record in records:
+            self.add(collector, record)
+            count += 1
+        return count
+
+    def add_file(self, collector: str, path: str) -> int:
+        """加入 JsonlSink 输出的文件"""
+        return self.add_records(collector, read_jsonl(path))
+
+    # ---------- 输出 ----------
+
+    def cluster_of(self, collector: str, external_id: str) -> Optional[str]:
+        node_id = f"{collector}:{external_id}"
+        return self._find(node_id) if node_id in self._nodes else None
+
+    def clusters(self) -> Dict[str, List[str]]:
+        """簇 id -> 记录 id 列表"""
+        groups: Dict[str, List[str]] = {}
+        for node_id in self._nodes:
+            groups.setdefault(self._find(node_id), []).append(node_id)
+        return groups
+
+    def dossiers(self, min_sources: int = 1) -> List[Dict[str, Any]]:
+        """
+        每个簇合并成一份档案
+
+        Args:
+            min_sources: 至少包含几个不同采集来源的簇才输出
+        """
+        result = []
+        for cluster_id, members in self.clusters().items():
+            nodes = [self._nodes[m] for m in members]
+            collectors = sorted({n["collector"] for n in nodes})
+            if len(collectors) < min_sources:
+                continue
+
+            contacts: Dict[str, Dict[str, Set[str]]] = {}
+            for node in nodes:
+                for c_type, value in node["contacts"]:
+                    # 号码按匹配键合并，带区号和不带区号的座机算同一个
+                    norm = phone_key(value) if c_type in ("mobile", "landline") else normalize_contact(c_type, value)
+                    contacts.setdefault(c_type, {}).setdefault(norm, set()).add(node["collector"])
+
+            result.append({
+                "cluster_id": cluster_id,
+                "names": sorted({name for n in nodes for name in n["names"]}),
+                "collectors": collectors,
+                "records": [{"collector": n["collector"], "external_id": n["external_id"],
+                             "sources": sorted(n["sources"])} for n in nodes],
+                "contacts": {
+                    c_type: [{"value": value, "seen_in": sorted(seen)} for value, seen in sorted(values.items())]
+                    for c_type, values in contacts.items()
+                },
+            })
+        result.sort(key=lambda d: (-len(d["collectors"]), -len(d["records"])))
+        return result
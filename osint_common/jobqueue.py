@@ -0,0 +1,588 @@
+"""
+持久化任务队列
+任务是 (collector, target) 二元组，工作进程租用 (lease) 任务后执行，超时未完成的租约会被其他进程接手；
+失败的任务按退避时间重试，超过最大次数进入死信 (dead)；
+来源熔断 (breaker.CircuitOpen) 的任务不算失败，交还队列由其他会话 (账号/Token/出口) 的工作进程接手
+
+后端:
+    SqliteJobQueue  默认后端，单机多进程共享一个数据库文件
+    HttpJobQueue    网络后端的客户端，多台机器的工作进程通过它访问同一个队列
+    serve_queue     把任意后端通过 HTTP 暴露出去，可作为网络后端的本地替代 (生产环境可换成 Redis 等)
+                    默认只监听 127.0.0.1；监听其他地址时必须设置 OSINT_QUEUE_TOKEN，客户端用同一个值访问
+
+用法:
+    python -m osint_common.jobqueue enqueue qianlima companies.txt
+    python -m osint_common.jobqueue work --processes 4
+    OSINT_QUEUE_TOKEN=... python -m osint_common.jobqueue serve --host 0.0.0.0 --port 8765  # 在队列所在机器上
+    OSINT_QUEUE_TOKEN=... python -m osint_common.jobqueue work --url http://host:8765         # 在其他机器上
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from osint_common import breaker, metrics
+from osint_common.sink import JsonlSink
+
+# ===== 配置区域 =====
+QUEUE_FILE = "osint_jobs.db"
+RESULT_DIR = "data/jobs"
+LEASE_SECONDS = 300        # 租约时长，执行期间由心跳续约
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30      # 第 n 次失败后等待 RETRY_BASE_DELAY * 2^(n-1) 秒再重试
+IDLE_SLEEP = 5             # 队列为空时的轮询间隔
+QUEUE_RETRY_DELAY = 2      # 访问队列出错 (网络/数据库锁) 后的首次等待，之后翻倍
+QUEUE_RETRY_MAX_DELAY = 60
+QUEUE_CALL_ATTEMPTS = 5    # complete/fail/release 出错时的最多尝试次数
+QUEUE_TOKEN = os.environ.get("OSINT_QUEUE_TOKEN", "")  # 网络后端的共享口令
+TOKEN_HEADER = "X-Queue-Token"
+# ===================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY,
+    collector    TEXT NOT NULL,
+    target       TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'queued',   -- queued / leased / done / dead
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_until  REAL,
+    worker       TEXT,
+    last_error   TEXT,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL,
+    UNIQUE (collector, target)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_until);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    collector: str
+    target: str
+    attempts: int
+    max_attempts: int
+    worker: str
+
+
+class SqliteJobQueue:
+    """SQLite 后端；WAL 模式下多个进程可以同时读写同一个文件"""
+
+    def __init__(self, path: str = QUEUE_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 连接不能跨线程共享，每个线程一个
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- 入队 ----------
+
+    def enqueue(self, collector: str, target: str, max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """入队一个任务；同一 (collector, target) 已存在时忽略，返回是否新增"""
+        return self.enqueue_many([(collector, target)], max_attempts) == 1
+
+    def enqueue_many(self, jobs: Iterable[Tuple[str, str]], max_attempts: int = MAX_ATTEMPTS) -> int:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (collector, target, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((collector, target, max_attempts, now, now, now) for collector, target in jobs),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return conn.total_changes - before
+
+    # ---------- 租约 ----------
+
+    def lease(self, worker: str, lease_seconds: float = LEASE_SECONDS,
+              collectors: Optional[List[str]] = None) -> Optional[Job]:
+        """
+        取一个可执行的任务：排队中且已到重试时间，或租约已过期 (原工作进程崩溃)
+
+        Args:
+            collectors: 只领取这些来源的任务，None 表示不限
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._expire_leases(conn, now)
+            sql = "SELECT id, collector, target, attempts, max_attempts FROM jobs WHERE status = 'queued' AND available_at <= ?"
+            params: List[Any] = [now]
+            if collectors:
+                sql += f" AND collector IN ({','.join('?' * len(collectors))})"
+                params.extend(collectors)
+            row = conn.execute(sql + " ORDER BY available_at, id LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job_id, collector, target, attempts, max_attempts = row
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_until = ?, worker = ?, updated_at = ? "
+                "WHERE id = ?",
+                (now + lease_seconds, worker, now, job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return Job(job_id, collector, target, attempts + 1, max_attempts, worker)
+
+    @staticmethod
+    def _expire_leases(conn: sqlite3.Connection, now: float):
+        """过期租约算一次失败：次数用完进死信，否则重新排队"""
+        conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END, "
+            "last_error = 'lease expired', worker = NULL, available_at = ?, updated_at = ? "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (now, now, now),
+        )
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """续约；返回 False 表示租约已被收回 (已过期并被他人领取)"""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = 'done', lease_until = NULL, last_error = NULL, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time(), job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str, retry_delay: float = RETRY_BASE_DELAY) -> bool:
+        """记录失败；还有重试次数时按指数退避重新排队，否则进死信"""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END, "
+            "available_at = ? + ? * (1 << (attempts - 1)), lease_until = NULL, worker = NULL, "
+            "last_error = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now, retry_delay, error[-2000:], now, job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def release(self, job_id: int, worker: str, reason: str, delay: float = 0) -> bool:
+        """交还任务 (不计入失败次数)，用于本会话熔断、需要换会话执行的情况"""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = 'queued', attempts = attempts - 1, available_at = ?, lease_until = NULL, "
+            "worker = NULL, last_error = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now + delay, reason[-2000:], now, job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    # ---------- 运维 ----------
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """collector -> status -> 数量"""
+        result: Dict[str, Dict[str, int]] = {}
+        for collector, status, count in self._conn().execute(
+            "SELECT collector, status, COUNT(*) FROM jobs GROUP BY collector, status"
+        ):
+            result.setdefault(collector, {})[status] = count
+        return result
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, collector, target, attempts, last_error FROM jobs WHERE status = 'dead' ORDER BY updated_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(zip(("id", "collector", "target", "attempts", "last_error"), row)) for row in rows]
+
+    def requeue_dead(self, collector: Optional[str] = None) -> int:
+        """把死信任务重新放回队列 (次数清零)"""
+        now = time.time()
+        sql = "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ? WHERE status = 'dead'"
+        params: List[Any] = [now, now]
+        if collector:
+            sql += " AND collector = ?"
+            params.append(collector)
+        return self._conn().execute(sql, params).rowcount
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ================= 网络后端 =================
+
+class HttpJobQueue:
+    """与 SqliteJobQueue 接口一致的 HTTP 客户端，对端为 serve_queue 或兼容的服务"""
+
+    def __init__(self, base_url: str, timeout: float = 30, token: Optional[str] = None):
+        """token: 服务端的共享口令，默认取 OSINT_QUEUE_TOKEN"""
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        token = QUEUE_TOKEN if token is None else token
+        if token:
+            self.session.headers[TOKEN_HEADER] = token
+
+    def _call(self, method: str, **params) -> Any:
+        resp = self.session.post(f"{self.base_url}/{method}", json=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()["result"]
+
+    def enqueue(self, collector: str, target: str, max_attempts: int = MAX_ATTEMPTS) -> bool:
+        return self._call("enqueue", collector=collector, target=target, max_attempts=max_attempts)
+
+    def enqueue_many(self, jobs: Iterable[Tuple[str, str]], max_attempts: int = MAX_ATTEMPTS) -> int:
+        return self._call("enqueue_many", jobs=[list(job) for job in jobs], max_attempts=max_attempts)
+
+    def lease(self, worker: str, lease_seconds: float = LEASE_SECONDS,
+              collectors: Optional[List[str]] = None) -> Optional[Job]:
+        result = self._call("lease", worker=worker, lease_seconds=lease_seconds, collectors=collectors)
+        return Job(**result) if result else None
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        return self._call("heartbeat", job_id=job_id, worker=worker, lease_seconds=lease_seconds)
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        return self._call("complete", job_id=job_id, worker=worker)
+
+    def fail(self, job_id: int, worker: str, error: str, retry_delay: float = RETRY_BASE_DELAY) -> bool:
+        return self._call("fail", job_id=job_id, worker=worker, error=error, retry_delay=retry_delay)
+
+    def release(self, job_id: int, worker: str, reason: str, delay: float = 0) -> bool:
+        return self._call("release", job_id=job_id, worker=worker, reason=reason, delay=delay)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return self._call("stats")
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self._call("dead_letters", limit=limit)
+
+    def requeue_dead(self, collector: Optional[str] = None) -> int:
+        return self._call("requeue_dead", collector=collector)
+
+    def close(self):
+        self.session.close()
+
+
+_REMOTE_METHODS = {"enqueue", "enqueue_many", "lease", "heartbeat", "complete", "fail", "release",
+                   "stats", "dead_letters", "requeue_dead"}
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve_queue(queue, host: str = "127.0.0.1", port: int = 8765,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    通过 HTTP 暴露队列 (POST /<方法名>，JSON 参数)，返回已创建但未启动的 server，
+    调用方执行 server.serve_forever()
+
+    Args:
+        token: 共享口令，默认取 OSINT_QUEUE_TOKEN；设置后请求头须带 X-Queue-Token，
+               监听非本机地址时必须设置
+    """
+    token = QUEUE_TOKEN if token is None else token
+    if not token and not _is_loopback(host):
+        raise ValueError(f"监听 {host} 需要设置 OSINT_QUEUE_TOKEN，否则任何人都能读写队列")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode(), token.encode()):
+                self.send_error(401)
+                return
+            method = self.path.strip("/")
+            if method not in _REMOTE_METHODS:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(length) or b"{}")
+            if method == "enqueue_many":
+                params["jobs"] = [tuple(job) for job in params["jobs"]]
+            try:
+                result = getattr(queue, method)(**params)
+            except Exception as e:
+                self.send_error(500, str(e))
+                return
+            if isinstance(result, Job):
+                result = asdict(result)
+            body = json.dumps({"result": result}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def open_queue(url: Optional[str] = None, path: str = QUEUE_FILE):
+    """有 url 时使用网络后端，否则使用本地 SQLite 文件"""
+    return HttpJobQueue(url) if url else SqliteJobQueue(path)
+
+
+# ================= 工作进程 =================
+
+def default_handlers() -> Dict[str, Callable[[str], Dict[str, Any]]]:
+    """collector -> 执行函数；复用编排器对各脚本入口的包装 (千里马优先走 QianlimaCollector.run)"""
+    from osint_common.orchestrator import SOURCES
+
+    handlers = {}
+    for name, source_cls in SOURCES.items():
+        def run(target: str, source_cls=source_cls) -> Dict[str, Any]:
+            source = source_cls(_source_config(source_cls.name))
+            if source.is_async:
+                return asyncio.run(source.run(target))
+            return source.run(target)
+        handlers[name] = run
+    return handlers
+
+
+def _source_config(name: str) -> Dict[str, Any]:
+    """各来源的配置从环境变量读取，便于在不同机器上分别设置"""
+    config: Dict[str, Any] = {"work_dir": os.path.join(RESULT_DIR, "work")}
+    if name == "tianyancha":
+        config["token"] = os.environ.get("TIANYANCHA_TOKEN", "")
+    return config
+
+
+# run_one 的结果：执行了一个任务 / 没有可领的任务 / 还有任务但对应来源在本会话熔断中
+RAN, EMPTY, BLOCKED = "ran", "empty", "blocked"
+
+# 访问队列时可重试的错误：网络后端的请求失败、SQLite 后端的锁超时
+TRANSPORT_ERRORS = (requests.exceptions.RequestException, sqlite3.OperationalError)
+
+
+class Worker:
+    """
+    循环领取任务并执行，结果追加写入 RESULT_DIR/<collector>.<worker>.jsonl
+    (每个工作进程写自己的文件，避免多进程写同一文件)
+
+    访问队列出错时退避重试，不会让工作进程退出；租约被收回的任务不写结果 (已由其他进程接手)
+    """
+
+    def __init__(self, queue, handlers: Optional[Dict[str, Callable]] = None,
+                 worker_id: Optional[str] = None, lease_seconds: float = LEASE_SECONDS,
+                 collectors: Optional[List[str]] = None, result_dir: str = RESULT_DIR):
+        self.queue = queue
+        self.handlers = handlers or default_handlers()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.collectors = collectors or list(self.handlers)
+        self.result_dir = result_dir
+        self._sinks: Dict[str, JsonlSink] = {}
+
+    def _sink(self, collector: str) -> JsonlSink:
+        if collector not in self._sinks:
+            path = os.path.join(self.result_dir, f"{collector}.{self.worker_id}.jsonl")
+            self._sinks[collector] = JsonlSink(path, batch_size=1, append=True)
+        return self._sinks[collector]
+
+    def _queue_call(self, method: str, *args) -> Any:
+        """调用队列方法，网络/锁错误时退避重试，尝试 QUEUE_CALL_ATTEMPTS 次后抛出"""
+        delay = QUEUE_RETRY_DELAY
+        for attempt in range(1, QUEUE_CALL_ATTEMPTS + 1):
+            try:
+                return getattr(self.queue, method)(*args)
+            except TRANSPORT_ERRORS as e:
+                if attempt == QUEUE_CALL_ATTEMPTS:
+                    raise
+                print(f"[Worker {self.worker_id}] 队列 {method} 出错 ({e})，{delay:.0f} 秒后重试")
+                time.sleep(delay)
+                delay = min(delay * 2, QUEUE_RETRY_MAX_DELAY)
+
+    def _keep_alive(self, job: Job, done: threading.Event, lost: threading.Event):
+        """执行期间每 1/3 租约时长续约一次；续约出错时稍后重试，租约被收回时设置 lost"""
+        interval = self.lease_seconds / 3
+        wait = interval
+        while not done.wait(wait):
+            try:
+                held = self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds)
+            except TRANSPORT_ERRORS as e:
+                wait = min(QUEUE_RETRY_DELAY, interval)
+                print(f"[Worker {self.worker_id}] 任务 {job.id} 续约出错 ({e})，稍后重试")
+                continue
+            if not held:
+                lost.set()
+                print(f"[Worker {self.worker_id}] 任务 {job.id} 租约已失效")
+                return
+            wait = interval
+
+    def run_one(self) -> str:
+        """执行一个任务，返回 RAN；没有可领的任务时返回 EMPTY，剩下的任务都属于熔断中的来源时返回 BLOCKED"""
+        # 本会话熔断中的来源不领取，留给其他会话
+        collectors = [c for c in self.collectors if breaker.get(c).available()]
+        blocked = [c for c in self.collectors if c not in collectors]
+        job = self.queue.lease(self.worker_id, self.lease_seconds, collectors) if collectors else None
+        if job is None:
+            stats = self.queue.stats() if blocked else {}
+            return BLOCKED if any(stats.get(c, {}).get("queued") for c in blocked) else EMPTY
+
+        print(f"[Worker {self.worker_id}] 开始 #{job.id} {job.collector}: {job.target} (第 {job.attempts} 次)")
+        done, lost = threading.Event(), threading.Event()
+        threading.Thread(target=self._keep_alive, args=(job, done, lost), daemon=True).start()
+        try:
+            try:
+                result = self.handlers[job.collector](job.target)
+                if isinstance(result, dict) and result.get("success") is False:
+                    raise RuntimeError(result.get("error") or "采集失败")
+                records = result.get("records", [result]) if isinstance(result, dict) else list(result or [])
+            except breaker.CircuitOpen as e:
+                # 本会话被拦截：任务原样交还，其他会话的工作进程可以立即领取
+                self._queue_call("release", job.id, self.worker_id, str(e))
+                print(f"[Worker {self.worker_id}] 交还 #{job.id}: {e}")
+                return RAN
+            except Exception as e:
+                self._queue_call("fail", job.id, self.worker_id, f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+                print(f"[Worker {self.worker_id}] 失败 #{job.id}: {e}")
+                return RAN
+
+            # 写结果前确认租约仍在：已过期并被其他进程接手的任务由对方写结果，这里丢弃，避免重复
+            if lost.is_set() or not self._queue_call("heartbeat", job.id, self.worker_id, self.lease_seconds):
+                print(f"[Worker {self.worker_id}] #{job.id} 租约已失效，丢弃 {len(records)} 条结果")
+                return RAN
+            sink = self._sink(job.collector)
+            sink.write_many({"job_id": job.id, "target": job.target, **record} for record in records)
+            sink.flush()
+            if not self._queue_call("complete", job.id, self.worker_id):
+                print(f"[Worker {self.worker_id}] #{job.id} 结果已写出，但完成时租约已失效")
+            print(f"[Worker {self.worker_id}] 完成 #{job.id}: {len(records)} 条记录")
+        finally:
+            done.set()
+        return RAN
+
+    def run(self, stop_when_empty: bool = False):
+        delay = QUEUE_RETRY_DELAY
+        try:
+            while True:
+                try:
+                    status = self.run_one()
+                except TRANSPORT_ERRORS as e:
+                    # 队列暂时不可用 (网络中断、数据库锁)：退避后继续，租约过期的任务会被重新领取
+                    print(f"[Worker {self.worker_id}] 访问队列出错 ({e})，{delay:.0f} 秒后重试")
+                    time.sleep(delay)
+                    delay = min(delay * 2, QUEUE_RETRY_MAX_DELAY)
+                    continue
+                delay = QUEUE_RETRY_DELAY
+                if status == EMPTY and stop_when_empty:
+                    return
+                if status != RAN:
+                    # 熔断中的来源还有任务时不退出，等冷却结束 (或其他会话领走)
+                    time.sleep(IDLE_SLEEP)
+        finally:
+            for sink in self._sinks.values():
+                sink.close()
+
+
+def _worker_process(url: Optional[str], path: str, collectors: Optional[List[str]], stop_when_empty: bool):
+    metrics.start_from_env()
+    Worker(open_queue(url, path), collectors=collectors).run(stop_when_empty)
+
+
+def run_workers(processes: int, url: Optional[str] = None, path: str = QUEUE_FILE,
+                collectors: Optional[List[str]] = None, stop_when_empty: bool = False):
+    """在本机启动多个工作进程；多台机器各自运行本函数并指向同一个 url 即可横向扩展"""
+    procs = [
+        multiprocessing.Process(target=_worker_process, args=(url, path, collectors, stop_when_empty))
+        for _ in range(processes)
+    ]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSINT 任务队列")
+    parser.add_argument("--url", help="网络后端地址，不填则使用本地 SQLite")
+    parser.add_argument("--db", default=QUEUE_FILE, help="SQLite 队列文件")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="从文件 (每行一个目标) 批量入队")
+    p_enqueue.add_argument("collector")
+    p_enqueue.add_argument("targets_file")
+    p_enqueue.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+
+    p_work = sub.add_parser("work", help="启动工作进程")
+    p_work.add_argument("--processes", type=int, default=1)
+    p_work.add_argument("--collectors", nargs="*")
+    p_work.add_argument("--stop-when-empty", action="store_true", help="队列为空时退出 (熔断中的来源还有任务时继续等待)")
+
+    p_serve = sub.add_parser("serve", help="通过 HTTP 暴露本地队列")
+    p_serve.add_argument("--host", default="127.0.0.1", help="监听其他地址时须设置 OSINT_QUEUE_TOKEN")
+    p_serve.add_argument("--port", type=int, default=8765)
+
+    sub.add_parser("stats", help="查看各状态任务数")
+    p_dead = sub.add_parser("dead", help="查看死信任务")
+    p_dead.add_argument("--requeue", action="store_true", help="重新放回队列")
+
+    args = parser.parse_args()
+
+    if args.command == "work":
+        run_workers(args.processes, args.url, args.db, args.collectors, args.stop_when_empty)
+        return
+    if args.command == "serve":
+        server = serve_queue(SqliteJobQueue(args.db), args.host, args.port)
+        print(f"[队列] 监听 {args.host}:{args.port}")
+        server.serve_forever()
+        return
+
+    queue = open_queue(args.url, args.db)
+    if args.command == "enqueue":
+        with open(args.targets_file, "r", encoding="utf-8") as f:
+            targets = [line.strip() for line in f if line.strip()]
+        added = queue.enqueue_many(((args.collector, t) for t in targets), args.max_attempts)
+        print(f"[队列] 新增 {added} 个任务 (共 {len(targets)} 个目标)")
+    elif args.command == "stats":
+        print(json.dumps(queue.stats(), ensure_ascii=False, indent=2))
+    elif args.command == "dead":
+        if args.requeue:
+            print(f"[队列] 重新排队 {queue.requeue_dead()} 个任务")
+        else:
+            print(json.dumps(queue.dead_letters(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+指标采集
+计数器 (请求数、错误、403/429、验证码) 和耗时直方图 (按接口、按 Playwright goto/wait_for_selector)，
+以及各来源的产出条数；可导出 Prometheus 文本格式，或定时写 JSON 快照
+
+用法:
+    from osint_common import metrics
+
+    response = metrics.http_request("tianyancha", requests.get, url, params=params, timeout=30)
+
+    with metrics.timer("playwright", collector="douyin", op="goto"):
+        await page.goto(url)
+
+    metrics.inc("captchas_total", collector="sogou")
+    metrics.start_from_env()    # OSINT_METRICS_FILE / OSINT_METRICS_PORT (默认只监听 127.0.0.1，OSINT_METRICS_HOST 可改)
+
+指标名称:
+    http_requests_total{collector,endpoint,status}   按状态码计数，网络异常时 status="error"
+    http_request_seconds{collector,endpoint}         接口耗时
+    playwright_seconds{collector,op}                 goto / wait_for_selector 等操作耗时
+    errors_total{collector,kind}                     异常，kind 为异常类名或 http_403 / http_429
+    captchas_total{collector}                        触发验证码/滑块的次数
+    items_total{collector}                           写出的记录数 (JsonlSink 指定 collector 时自动计数)
+    breaker_trips_total{breaker}                     熔断器打开次数 / breaker_probes_total 半开探测次数
+    ratelimit_wait_seconds{host}                     令牌桶限速的等待时间
+    proxy_requests_total{proxy,ok}                   经各代理的请求数 / proxy_latency_seconds 代理延迟
+    proxy_evictions_total{proxy}                     代理被剔除的次数
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+# ===== 配置区域 =====
+# 秒；覆盖从本地缓存命中 (毫秒级) 到页面加载超时 (数十秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SNAPSHOT_INTERVAL = 30
+# ===================
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 最后一格是 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶上界估计分位数"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return None
+
+
+class Registry:
+    """线程安全的指标表"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self.buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """
+        记录代码块耗时 (同步/异步代码都可用)；抛出的异常计入 errors_total 后继续抛出
+        取消、Ctrl+C、生成器关闭 (CancelledError/KeyboardInterrupt/GeneratorExit) 不算错误
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc("errors_total", collector=labels.get("collector", ""), kind=type(e).__name__)
+            raise
+        finally:
+            self.observe(name + "_seconds", time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    # ---------- 导出 ----------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON 友好的快照，附带各来源的平均产出速率"""
+        now = time.time()
+        uptime = max(now - self.started_at, 1e-9)
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key), "count": h.count, "sum": round(h.sum, 6),
+                    "avg": round(h.sum / h.count, 6) if h.count else None,
+                    "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                } for key, h in series.items()]
+                for name, series in self._histograms.items()
+            }
+            items = self._counters.get("items_total", {})
+            rates = {dict(key).get("collector", ""): round(value / uptime, 3) for key, value in items.items()}
+        return {
+            "timestamp": now,
+            "uptime": round(uptime, 3),
+            "counters": counters,
+            "histograms": histograms,
+            "items_per_second": rates,
+        }
+
+    def to_prometheus(self, prefix: str = "osint_") -> str:
+        lines = []
+
+        def fmt(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in series.items():
+                    lines.append(f"{prefix}{name}{fmt(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), h.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{prefix}{name}_bucket{fmt(key, (('le', le),))} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{fmt(key)} {h.sum}")
+                    lines.append(f"{prefix}{name}_count{fmt(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+
+
+# ================= HTTP 请求埋点 =================
+
+def endpoint_of(url: str) -> str:
+    """host + path，去掉查询参数，避免每个关键词都成为一条新序列"""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def record_response(collector: str, endpoint: str, status: int, seconds: float):
+    REGISTRY.inc("http_requests_total", collector=collector, endpoint=endpoint, status=status)
+    REGISTRY.observe("http_request_seconds", seconds, collector=collector, endpoint=endpoint)
+    if status in (403, 429):
+        REGISTRY.inc("errors_total", collector=collector, kind=f"http_{status}")
+
+
+def http_request(collector: str, send: Callable[..., Any], url: str, **kwargs):
+    """
+    调用 requests.get / session.get 等并记录状态码与耗时，返回原始 response，异常原样抛出
+
+    Args:
+        send: 实际发请求的函数
+    """
+    endpoint = endpoint_of(url)
+    started = time.perf_counter()
+    try:
+        response = send(url, **kwargs)
+    except Exception as e:
+        REGISTRY.inc("http_requests_total", collector=collector, endpoint=endpoint, status="error")
+        REGISTRY.inc("errors_total", collector=collector, kind=type(e).__name__)
+        REGISTRY.observe("http_request_seconds", time.perf_counter() - started, collector=collector, endpoint=endpoint)
+        raise
+    record_response(collector, endpoint, response.status_code, time.perf_counter() - started)
+    return response
+
+
+# ================= 导出 =================
+
+def start_snapshotter(path: str, interval: float = SNAPSHOT_INTERVAL, registry: Registry = REGISTRY) -> threading.Event:
+    """后台线程定时写 JSON 快照，返回的 Event 置位后停止 (停止前再写一次)"""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            registry.write_snapshot(path)
+        registry.write_snapshot(path)
+
+    threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+    # 守护线程随进程退出，退出前补写最后一次
+    atexit.register(registry.write_snapshot, path)
+    return stop
+
+
+def serve_prometheus(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """在后台线程提供 GET /metrics；默认只监听本机，需要远程抓取时显式传 host (OSINT_METRICS_HOST)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+_started = False
+
+
+def start_from_env():
+    """按环境变量开启导出：OSINT_METRICS_FILE 定时写快照，OSINT_METRICS_PORT 提供 Prometheus 抓取"""
+    global _started
+    if _started:
+        return
+    _started = True
+    path = os.environ.get("OSINT_METRICS_FILE")
+    if path:
+        start_snapshotter(path, float(os.environ.get("OSINT_METRICS_INTERVAL", SNAPSHOT_INTERVAL)))
+    port = os.environ.get("OSINT_METRICS_PORT")
+    if port:
+        serve_prometheus(int(port), os.environ.get("OSINT_METRICS_HOST") or "127.0.0.1")
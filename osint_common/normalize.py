@@ -0,0 +1,86 @@
+"""
+联系方式与名称的归一化
+入库和关联时都用归一化后的值比较，避免 "138-0013-8000" 和 "13800138000" 被当成两个号码
+"""
+import re
+
+CONTACT_TYPES = ("mobile", "landline", "email", "wechat", "qq")
+
+
+def normalize_phone(value: str) -> str:
+    """去掉分隔符和 +86/0086 国家码，只保留数字"""
+    digits = re.sub(r"\D", "", str(value or ""))
+    for prefix in ("0086", "86"):
+        if digits.startswith(prefix) and len(digits) - len(prefix) >= 10:
+            digits = digits[len(prefix):]
+            break
+    return digits
+
+
+def normalize_name(value: str) -> str:
+    """去掉空白、统一全角括号"""
+    name = re.sub(r"\s+", "", str(value or ""))
+    return name.replace("（", "(").replace("）", ")")
+
+
+def normalize_contact(contact_type: str, value: str) -> str:
+    """按类型归一化联系方式"""
+    if contact_type in ("mobile", "landline"):
+        return normalize_phone(value)
+    if contact_type in ("email", "wechat"):
+        return str(value or "").strip().lower()
+    if contact_type == "qq":
+        return re.sub(r"\D", "", str(value or ""))
+    return str(value or "").strip()
+
+
+# ================= 实体关联用的匹配键 =================
+
+# 三位区号：010 及 02X
+_THREE_DIGIT_AREA = re.compile(r"^0(?:10|2\d)")
+_COMPANY_SUFFIXES = (
+    "股份有限公司", "有限责任公司", "有限公司", "集团股份", "集团有限", "总公司", "分公司", "集团", "公司",
+)
+_COMPANY_IN_TEXT = re.compile(
+    r"([\u4e00-\u9fa5()（）a-zA-Z0-9]{2,30}?(?:股份有限公司|有限责任公司|有限公司|集团|公司))"
+)
+
+
+def phone_key(value: str) -> str:
+    """
+    号码匹配键
+    手机号保持 11 位；400/800 热线保留完整 10 位；座机去掉区号，只比本地号码
+    """
+    digits = normalize_phone(value)
+    if len(digits) == 11 and digits.startswith("1"):
+        return digits
+    if digits.startswith(("400", "800")) and len(digits) == 10:
+        return digits
+    if digits.startswith("0") and len(digits) >= 10:
+        area_len = 3 if _THREE_DIGIT_AREA.match(digits) else 4
+        return digits[area_len:]
+    return digits
+
+
+def company_key(value: str) -> str:
+    """公司名匹配键：去掉括号内容和 有限公司/集团 等后缀"""
+    name = normalize_name(value)
+    name = re.sub(r"\([^)]*\)", "", name)
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in _COMPANY_SUFFIXES:
+            if name.endswith(suffix) and len(name) > len(suffix) + 1:
+                name = name[:-len(suffix)]
+                stripped = True
+                break
+    return name
+
+
+def looks_like_company(value: str) -> bool:
+    return bool(value) and normalize_name(value).endswith(_COMPANY_SUFFIXES)
+
+
+def find_company_names(text: str):
+    """从认证信息等自由文本中找出公司名"""
+    return _COMPANY_IN_TEXT.findall(normalize_name(text))
@@ -0,0 +1,251 @@
+"""
+多来源并发编排
+对一个目标同时跑所有可用的采集脚本，每个来源有自己的并发上限和最小请求间隔，
+结果经 EntityResolver 合并成一份档案；单个目标的耗时取决于最慢的来源，而不是所有来源之和
+
+每个来源都包装成与 BaseCollector 一致的 run(target_name) 接口：
+千里马优先直接使用 QianlimaCollector，其余来源包装各脚本现有的入口函数
+"""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+from osint_common import breaker
+from osint_common.entity_resolution import EntityResolver
+from osint_common.scripts import load_script
+from osint_common.sink import read_jsonl
+
+
+# ================= 各来源的包装 =================
+
+class ScriptCollector:
+    """
+    把独立脚本包装成 BaseCollector 风格的 run(target_name) 接口
+    返回 {"source", "success", "records", "error"}，records 为该脚本原生的记录格式
+    """
+
+    name = ""
+    is_async = False
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        self.work_dir = self.config.get("work_dir", "data")
+
+    def available(self) -> bool:
+        """当前环境是否具备运行条件 (登录态、Token 等)"""
+        return True
+
+    def output_path(self, target_name: str) -> str:
+        safe_name = "".join(ch for ch in target_name if ch not in '\\/:*?"<>| ')
+        return os.path.join(self.work_dir, f"{self.name}_{safe_name}_{int(time.time() * 1000)}.jsonl")
+
+    def response(self, records: List[Dict[str, Any]], error: Optional[str] = None) -> Dict[str, Any]:
+        return {"source": self.name, "success": error is None, "records": records, "error": error}
+
+    def read_output(self, path: str) -> List[Dict[str, Any]]:
+        return list(read_jsonl(path)) if os.path.exists(path) else []
+
+    def run(self, target_name: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class QianlimaSource(ScriptCollector):
+    name = "qianlima"
+
+    def run(self, target_name: str) -> Dict[str, Any]:
+        try:
+            collector_module = load_script("千里马/qianlima_collector.py", "qianlima_collector")
+        except ImportError:
+            collector_module = None
+
+        if collector_module is not None:
+            collector = collector_module.QianlimaCollector(self.config.get("collector_config"))
+            try:
+                return self.response([collector.run(target_name)])
+            except collector_module.AntiSpiderException:
+                # 插件只认识自己的异常类型，熔断时统一成 CircuitOpen 方便上层改派
+                circuit = breaker.get(self.name)
+                if not circuit.available():
+                    raise circuit.open_error()
+                raise
+
+        result = load_script("千里马/qianlima.py", "qianlima").handler({"keyword": target_name})
+        if "error" in result:
+            return self.response([], result["error"])
+        return self.response([result])
+
+
+class TianyanchaSource(ScriptCollector):
+    name = "tianyancha"
+
+    def available(self) -> bool:
+        return bool(self.config.get("token"))
+
+    def run(self, target_name: str) -> Dict[str, Any]:
+        module = load_script("天眼查/tianyancha.py", "tianyancha")
+        args = SimpleNamespace(input=SimpleNamespace(token=self.config.get("token"), keyword=target_name), is_test=False)
+        result = module.handler(args)
+        if "error" in result:
+            return self.response([], result["error"])
+        return self.response([result])
+
+
+class SogouSource(ScriptCollector):
+    name = "sogou"
+    is_async = True
+
+    async def run(self, target_name: str) -> Dict[str, Any]:
+        module = load_script("搜狗浏览器/sougou.py", "sougou")
+        path = self.output_path(target_name)
+        keyword = self.config.get("keyword_template", "{target} 联系方式").format(target=target_name)
+        await module.run(keyword=keyword, target_count=self.config.get("target_count", module.TARGET_COUNT), filename=path)
+        return self.response(self.read_output(path))
+
+
+class DouyinSource(ScriptCollector):
+    name = "douyin"
+    is_async = True
+
+    def available(self) -> bool:
+        # 需要已登录的持久化浏览器目录
+        return os.path.isdir(self.config.get("user_data_dir", "douyin_user_data"))
+
+    async def run(self, target_name: str) -> Dict[str, Any]:
+        module = load_script("test-douyin.py", "test_douyin")
+        path = self.output_path(target_name)
+        # 编排模式下没有人值守，不能等待回车确认登录；只对本次运行生效，不改脚本的 CONFIG
+        await module.run(keywords=[target_name], save_file_name=path, headless=True)
+        return self.response(self.read_output(path))
+
+
+class WeiboSource(ScriptCollector):
+    name = "weibo"
+
+    def available(self) -> bool:
+        # 没有登录态文件时脚本会弹出扫码登录，编排模式下跳过；路径以脚本自己的 STATE_FILE 为准
+        try:
+            module = load_script("weibo-userlist.py", "weibo_userlist")
+        except ImportError:
+            return False
+        return os.path.exists(module.STATE_FILE)
+
+    def run(self, target_name: str) -> Dict[str, Any]:
+        module = load_script("weibo-userlist.py", "weibo_userlist")
+        path = self.output_path(target_name)
+        module.main(keyword=target_name, output_file=path)
+        return self.response(self.read_output(path))
+
+
+SOURCES = {
+    "qianlima": QianlimaSource,
+    "tianyancha": TianyanchaSource,
+    "sogou": SogouSource,
+    "douyin": DouyinSource,
+    "weibo": WeiboSource,
+}
+
+# 浏览器类来源共用一个登录目录/Cookie，同一来源默认不并发
+DEFAULT_LIMITS = {
+    "qianlima": {"concurrency": 4, "min_interval": 0.5},
+    "tianyancha": {"concurrency": 4, "min_interval": 0.5},
+    "sogou": {"concurrency": 1, "min_interval": 5.0},
+    "douyin": {"concurrency": 1, "min_interval": 5.0},
+    "weibo": {"concurrency": 1, "min_interval": 5.0},
+}
+
+
+class _SourceLimiter:
+    """单个来源的并发上限 + 两次启动之间的最小间隔"""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._last_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self._lock:
+            wait = self._last_start + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start = time.monotonic()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class Orchestrator:
+    """
+    用法:
+        orchestrator = Orchestrator({"tianyancha": {"token": "..."}})
+        dossier = asyncio.run(orchestrator.run_target("山东航空"))
+    """
+
+    def __init__(self, config: Optional[Dict[str, Dict[str, Any]]] = None,
+                 sources: Optional[Iterable[str]] = None):
+        """
+        Args:
+            config: 来源名 -> 该来源的配置 (会传给包装类)，可包含 concurrency/min_interval
+            sources: 启用的来源，默认全部
+        """
+        self.config = config or {}
+        self.collectors: Dict[str, ScriptCollector] = {}
+        self.limiters: Dict[str, _SourceLimiter] = {}
+        for name in sources or SOURCES:
+            source_config = self.config.get(name, {})
+            collector = SOURCES[name](source_config)
+            if not collector.available():
+                print(f"[编排] 跳过 {name}: 运行条件不满足")
+                continue
+            limits = {**DEFAULT_LIMITS[name], **source_config}
+            self.collectors[name] = collector
+            self.limiters[name] = _SourceLimiter(limits["concurrency"], limits["min_interval"])
+
+    async def _run_source(self, name: str, target_name: str) -> Dict[str, Any]:
+        collector = self.collectors[name]
+        async with self.limiters[name]:
+            started = time.monotonic()
+            try:
+                circuit = breaker.get(name)
+                if not circuit.available():
+                    # 熔断中不启动浏览器/不发请求
+                    raise circuit.open_error()
+                if collector.is_async:
+                    result = await collector.run(target_name)
+                else:
+                    # requests / sync Playwright 放到线程里，不阻塞事件循环
+                    result = await asyncio.to_thread(collector.run, target_name)
+            except breaker.CircuitOpen as e:
+                result = collector.response([], str(e))
+                result["circuit_open"] = True
+            except Exception as e:
+                result = collector.response([], str(e))
+            result["elapsed"] = round(time.monotonic() - started, 2)
+        print(f"[编排] {target_name} / {name}: {len(result['records'])} 条记录, "
+              f"{result['elapsed']}s{'' if result['success'] else ' 失败: ' + str(result['error'])}")
+        return result
+
+    async def run_target(self, target_name: str) -> Dict[str, Any]:
+        """对一个目标并发跑所有来源，合并成一份结果"""
+        started = time.monotonic()
+        results = await asyncio.gather(*(self._run_source(name, target_name) for name in self.collectors))
+
+        resolver = EntityResolver()
+        for result in results:
+            resolver.add_records(result["source"], result["records"])
+
+        return {
+            "target": target_name,
+            "elapsed": round(time.monotonic() - started, 2),
+            "sources": {r["source"]: {"success": r["success"], "records": len(r["records"]),
+                                      "elapsed": r["elapsed"], "error": r["error"]} for r in results},
+            "dossiers": resolver.dossiers(),
+            "raw": {r["source"]: r["records"] for r in results},
+        }
+
+    async def run_targets(self, target_names: Iterable[str]) -> List[Dict[str, Any]]:
+        """多个目标同时进行，各来源的并发/频率限制在目标之间共享"""
+        return await asyncio.gather(*(self.run_target(name) for name in target_names))
@@ -0,0 +1,228 @@
+"""
+分阶段计时与性能剖析 (默认关闭)
+各脚本的关键函数用 @profiled("阶段名") 标记，开启后按阶段累计调用次数与耗时；
+整次运行还可以套上 cProfile (确定性) 或栈采样器，输出 pstats 文件或 flamegraph 折叠栈
+
+开启方式 (环境变量):
+    OSINT_PROFILE=spans      只统计阶段耗时
+    OSINT_PROFILE=cprofile   阶段耗时 + cProfile，输出 <前缀>.prof (可用 snakeviz / pstats 查看)
+    OSINT_PROFILE=sample     阶段耗时 + 栈采样，输出 <前缀>.folded (flamegraph.pl / speedscope 可直接读取)，覆盖所有线程
+    OSINT_PROFILE_OUTPUT     输出文件前缀，默认 osint_profile
+    OSINT_PROFILE_INTERVAL   采样间隔 (秒)，默认 0.005
+
+关闭时 @profiled 包装只多一次全局变量判断，span() 返回共享的空上下文
+"""
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+# ===== 配置区域 =====
+MODES = ("spans", "cprofile", "sample")
+DEFAULT_OUTPUT = "osint_profile"
+SAMPLE_INTERVAL = 0.005
+# ===================
+
+_mode: Optional[str] = os.environ.get("OSINT_PROFILE") or None
+_enabled = _mode in MODES
+_lock = threading.Lock()
+_stages: Dict[str, Dict[str, float]] = {}
+_NULL = nullcontext()
+
+
+def enable(mode: str = "spans"):
+    global _mode, _enabled
+    if mode not in MODES:
+        raise ValueError(f"未知的剖析模式: {mode}，可选 {MODES}")
+    _mode, _enabled = mode, True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _record(stage: str, seconds: float):
+    with _lock:
+        stat = _stages.get(stage)
+        if stat is None:
+            stat = _stages[stage] = {"count": 0, "total": 0.0, "max": 0.0}
+        stat["count"] += 1
+        stat["total"] += seconds
+        if seconds > stat["max"]:
+            stat["max"] = seconds
+
+
+@contextmanager
+def _timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(stage, time.perf_counter() - started)
+
+
+def span(stage: str):
+    """
+    代码块计时，同步/异步代码都可用:
+        with profiling.span("page_load"):
+            await page.goto(url)
+    """
+    return _timed(stage) if _enabled else _NULL
+
+
+def profiled(stage: str):
+    """函数装饰器，支持普通函数和协程函数"""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _record(stage, time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(stage, time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
+
+# ================= 报告 =================
+
+def stage_stats() -> Dict[str, Dict[str, float]]:
+    with _lock:
+        return {
+            stage: {**stat, "avg": stat["total"] / stat["count"] if stat["count"] else 0.0}
+            for stage, stat in _stages.items()
+        }
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def format_report() -> str:
+    """
+    按总耗时排序的阶段表
+    注意阶段可能嵌套 (如 detail 内含 regex_extract)，各行总耗时不能直接相加
+    """
+    stats = sorted(stage_stats().items(), key=lambda item: -item[1]["total"])
+    lines = [f"{'阶段':<24}{'次数':>8}{'总耗时(s)':>12}{'平均(ms)':>12}{'最大(ms)':>12}"]
+    for stage, stat in stats:
+        lines.append(f"{stage:<24}{int(stat['count']):>8}{stat['total']:>12.3f}"
+                     f"{stat['avg'] * 1000:>12.2f}{stat['max'] * 1000:>12.2f}")
+    return "\n".join(lines)
+
+
+# ================= 整次运行剖析 =================
+
+class StackSampler:
+    """
+    后台线程定期抓取所有线程的调用栈，统计折叠栈 ("thread 名;a;b;c 次数")；
+    异步代码跑在事件循环所在线程，asyncio.to_thread / 线程池里的同步调用在各自线程，都能采到
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, thread_id: Optional[int] = None):
+        """thread_id 为 None 时采集全部线程 (采样线程自身除外)，否则只采这一个线程"""
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (self.thread_id is not None and ident != self.thread_id):
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                # 线程名作为根节点，火焰图里按线程分开
+                stack.append(f"thread {names.get(ident, ident)}")
+                self.samples[";".join(reversed(stack))] += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_folded(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def run(fn: Callable[[], Any], output: Optional[str] = None) -> Any:
+    """
+    运行 fn 并按 OSINT_PROFILE 的模式剖析，未开启时直接调用
+    用法 (脚本入口):
+        profiling.run(main)
+        profiling.run(lambda: asyncio.run(run()))
+    """
+    if not _enabled:
+        return fn()
+
+    output = output or os.environ.get("OSINT_PROFILE_OUTPUT", DEFAULT_OUTPUT)
+    profiler = sampler = None
+    if _mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif _mode == "sample":
+        sampler = StackSampler(float(os.environ.get("OSINT_PROFILE_INTERVAL", SAMPLE_INTERVAL)))
+        sampler.start()
+
+    try:
+        return fn()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(output + ".prof")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+            print(f"[profile] cProfile 结果: {output}.prof")
+        if sampler is not None:
+            sampler.stop()
+            sampler.write_folded(output + ".folded")
+            print(f"[profile] 折叠栈 ({sum(sampler.samples.values())} 个样本): {output}.folded")
+        with open(output + ".stages.json", "w", encoding="utf-8") as f:
+            json.dump(stage_stats(), f, ensure_ascii=False, indent=2)
+        print("\n" + format_report())
@@ -0,0 +1,183 @@
+"""
+跨进程共享的按主机限速 (令牌桶)
+同一台机器上所有采集进程共用一个 SQLite 文件里的令牌桶，每个 (主机, 出口) 一个桶；
+不管开多少个进程/线程，从同一出口对同一主机的总请求速率都不会超过配置的上限。
+经代理发出的请求传 via=代理 URL，每个代理出口有自己的一份预算
+
+用法:
+    ratelimit.acquire(url)                  # requests 调用前
+    await ratelimit.acquire_async(url)      # Playwright goto / 点击跳转前
+    session.mount("https://", ratelimit.RateLimitedAdapter(...))   # Session 内所有请求自动限速
+
+环境变量:
+    OSINT_RATE_DB       令牌桶文件，默认系统临时目录下的 osint_ratelimit.db
+    OSINT_RATE_LIMIT=0  关闭限速 (调试用)
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from requests.utils import select_proxy
+
+from osint_common import cassette, metrics
+
+# ===== 配置区域 =====
+# 主机 -> (每秒补充的令牌数, 桶容量)；未列出的主机不限速
+HOST_BUDGETS: Dict[str, Tuple[float, float]] = {
+    "search.vip.qianlima.com": (2.0, 4),
+    "open.api.tianyancha.com": (2.0, 4),
+    "m.weibo.cn": (1.0, 3),
+    "s.weibo.com": (0.5, 2),
+    "weibo.com": (0.5, 2),
+    "weixin.sogou.com": (0.2, 1),
+    "mp.weixin.qq.com": (0.5, 2),
+    "www.douyin.com": (1.0, 3),
+}
+DB_FILE = os.environ.get("OSINT_RATE_DB") or os.path.join(tempfile.gettempdir(), "osint_ratelimit.db")
+# ===================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    host    TEXT PRIMARY KEY,
+    tokens  REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class TokenBucketStore:
+    """SQLite 令牌桶；取令牌在 BEGIN IMMEDIATE 事务里完成，多进程之间互斥"""
+
+    def __init__(self, path: str = DB_FILE, budgets: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.path = path
+        self.budgets = dict(HOST_BUDGETS if budgets is None else budgets)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def budget_for(self, host: str) -> Optional[Tuple[float, float]]:
+        return self.budgets.get(host)
+
+    def try_acquire(self, host: str, tokens: float = 1.0, bucket: Optional[str] = None) -> float:
+        """
+        尝试取令牌：成功返回 0，否则返回还需等待的秒数 (不扣令牌)
+        未配置预算的主机总是成功；bucket 为桶名 (默认即主机名)，预算按主机查
+        """
+        budget = self.budget_for(host)
+        if budget is None:
+            return 0.0
+        rate, capacity = budget
+        bucket = bucket or host
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (bucket,)).fetchone()
+            available = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+            if available >= tokens:
+                available -= tokens
+                wait = 0.0
+            else:
+                wait = (tokens - available) / rate
+            conn.execute(
+                "INSERT INTO buckets (host, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(host) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (bucket, available, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+_store: Optional[TokenBucketStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> TokenBucketStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TokenBucketStore()
+    return _store
+
+
+def configure(host: str, rate: float, capacity: float):
+    """调整某个主机的预算 (同一主机的所有进程应使用相同配置)"""
+    get_store().budgets[host] = (rate, capacity)
+
+
+def _enabled() -> bool:
+    # 回放时不访问网络，不需要限速
+    return os.environ.get("OSINT_RATE_LIMIT", "1") != "0" and not cassette.replaying()
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).hostname or url
+
+
+def _bucket(host: str, via: Optional[str]) -> str:
+    return f"{host}@{host_of(via)}" if via else host
+
+
+def acquire(url: str, tokens: float = 1.0, via: Optional[str] = None) -> float:
+    """阻塞直到拿到令牌，返回等待的总秒数；via 为出口代理 URL (直连时为 None)"""
+    if not _enabled():
+        return 0.0
+    host = host_of(url)
+    bucket = _bucket(host, via)
+    store = get_store()
+    waited = 0.0
+    while True:
+        wait = store.try_acquire(host, tokens, bucket)
+        if wait <= 0:
+            break
+        time.sleep(wait)
+        waited += wait
+    if waited:
+        metrics.observe("ratelimit_wait_seconds", waited, host=host)
+    return waited
+
+
+async def acquire_async(url: str, tokens: float = 1.0, via: Optional[str] = None) -> float:
+    """acquire 的协程版本，等待期间不阻塞事件循环"""
+    import asyncio
+
+    if not _enabled():
+        return 0.0
+    host = host_of(url)
+    bucket = _bucket(host, via)
+    store = get_store()
+    waited = 0.0
+    while True:
+        # 其他进程持有写锁时 BEGIN IMMEDIATE 会阻塞 (最长 busy timeout)，放到线程里执行，不卡住其他协程
+        wait = await asyncio.to_thread(store.try_acquire, host, tokens, bucket)
+        if wait <= 0:
+            break
+        await asyncio.sleep(wait)
+        waited += wait
+    if waited:
+        metrics.observe("ratelimit_wait_seconds", waited, host=host)
+    return waited
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """发送前按目标主机 (及出口代理) 取令牌的 HTTPAdapter"""
+
+    def send(self, request, *args, **kwargs):
+        acquire(request.url, via=select_proxy(request.url, kwargs.get("proxies") or {}))
+        return super().send(request, *args, **kwargs)
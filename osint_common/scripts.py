@@ -0,0 +1,29 @@
+"""
+按文件路径加载采集脚本
+脚本名带连字符或位于中文目录，无法直接 import；本模块只依赖标准库，
+命令行入口可以在不加载编排器 (asyncio 等) 的情况下拿到单个脚本
+"""
+import importlib.util
+import os
+import sys
+from typing import Any, Dict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_loaded_scripts: Dict[str, Any] = {}
+
+
+def load_script(relative_path: str, module_name: str):
+    """按文件路径加载脚本，同一进程内按模块名缓存"""
+    if module_name in _loaded_scripts:
+        return _loaded_scripts[module_name]
+    path = os.path.join(REPO_ROOT, relative_path)
+    # 脚本会 import 同目录的模块 (如 decrypt_scheduler)
+    script_dir = os.path.dirname(path)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded_scripts[module_name] = module
+    return module
@@ -0,0 +1,176 @@
+"""
+统一的流式输出
+所有采集脚本都通过 JsonlSink 写结果：每条记录一行 JSON，攒够一批再写盘，
+可选 fsync、gzip/zstd 压缩和按大小切分文件；进程崩溃时最后一次 flush 之前的数据都在
+"""
+import gzip
+import io
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from osint_common import metrics, profiling
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class JsonlSink:
+    """
+    JSONL 输出端，线程安全
+
+    用法:
+        with JsonlSink("out.jsonl", batch_size=50, compression="gzip") as sink:
+            sink.write({"nickname": "..."})
+    """
+
+    def __init__(self,
+                 path: str,
+                 batch_size: int = 100,
+                 fsync: bool = False,
+                 compression: Optional[str] = None,
+                 rotate_bytes: Optional[int] = None,
+                 append: bool = False,
+                 collector: Optional[str] = None):
+        """
+        Args:
+            path: 输出文件路径，开启压缩时自动补 .gz/.zst 后缀
+            batch_size: 缓冲多少条记录后写盘
+            fsync: 每次写盘后是否 fsync
+            compression: None / "gzip" / "zstd"
+            rotate_bytes: 单个文件的未压缩字节数上限，超过后切到下一个文件
+            append: 追加到已有文件末尾而不是覆盖 (只作用于第一个分片)
+            collector: 来源名，指定后每条记录计入 items_total 指标
+        """
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"不支持的压缩格式: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd 压缩需要安装 zstandard: pip install zstandard")
+
+        suffix = COMPRESSION_SUFFIX[compression]
+        if suffix and not path.endswith(suffix):
+            path += suffix
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.fsync = fsync
+        self.compression = compression
+        self.rotate_bytes = rotate_bytes
+        self.append = append
+        self.collector = collector
+
+        self.paths: List[str] = []   # 已经写过的全部分片
+        self.count = 0               # 已写入的记录总数
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._raw = None
+        self._stream = None
+        self._part_bytes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._open_part()
+
+    def _part_path(self, index: int) -> str:
+        """第 0 片就是 path，之后为 name.1.jsonl.gz、name.2.jsonl.gz ..."""
+        if index == 0:
+            return self.path
+        suffix = COMPRESSION_SUFFIX[self.compression]
+        base = self.path[:-len(suffix)] if suffix else self.path
+        stem, ext = os.path.splitext(base)
+        return f"{stem}.{index}{ext}{suffix}"
+
+    def _open_part(self):
+        path = self._part_path(len(self.paths))
+        self._raw = open(path, "ab" if self.append and not self.paths else "wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._stream = self._raw
+        self._part_bytes = 0
+        self.paths.append(path)
+
+    def _close_part(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        if not self._raw.closed:
+            self._raw.close()
+
+    def _flush_buffer(self):
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+
+        if self.rotate_bytes and self._part_bytes and self._part_bytes + len(data) > self.rotate_bytes:
+            self._close_part()
+            self._open_part()
+        self._stream.write(data)
+        self._part_bytes += len(data)
+
+        # 压缩流需要先把已压缩的块推到底层文件，崩溃后才能解出来
+        if self.compression == "gzip":
+            self._stream.flush()
+        elif self.compression == "zstd":
+            self._stream.flush(zstandard.FLUSH_FRAME)
+        self._raw.flush()
+        if self.fsync:
+            os.fsync(self._raw.fileno())
+
+    def write(self, record: Dict[str, Any]):
+        with profiling.span("serialize"):
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush_buffer()
+        if self.collector:
+            metrics.inc("items_total", collector=self.collector)
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        with self._lock:
+            self._flush_buffer()
+
+    def close(self):
+        with self._lock:
+            if self._raw is None:
+                return
+            self._flush_buffer()
+            self._close_part()
+            self._raw = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_jsonl(path: str) -> Iterable[Dict[str, Any]]:
+    """按行读取 JsonlSink 写出的文件 (自动识别 .gz/.zst)"""
+    if path.endswith(".gz"):
+        f = gzip.open(path, "rt", encoding="utf-8")
+    elif path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("读取 zstd 文件需要安装 zstandard: pip install zstandard")
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        f = io.TextIOWrapper(reader, encoding="utf-8")
+    else:
+        f = open(path, "r", encoding="utf-8")
+    with f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
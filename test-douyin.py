@@ -3,28 +3,170 @@ import json
 import random
 import os
 import re
+import sys
+import time
 from playwright.async_api import async_playwright
 
+from osint_common import cassette, checkpoint, metrics, profiling, proxypool, ratelimit
+from osint_common.profiling import profiled
+from osint_common.sink import JsonlSink
+
+cassette.install_from_env()
+
 # ==========================================
 # 👇👇👇 【用户配置区域】 👇👇👇
 # ==========================================
 
 CONFIG = {
     "keyword": "测试目标",        
-    "target_count": 20,          
-    "save_file_name": "users_cleaned.json",
-    "headless_mode": True 
+    "keywords": [],               # 多关键词模式，非空时忽略 keyword
+    "shards": 1,                  # 并行分片数，每个分片使用一个独立的已登录浏览器目录
+    "target_count": 20,           # 每个关键词的目标用户数
+    "save_file_name": "users_cleaned.jsonl",  # 每行一个用户
+    "headless_mode": True,
+    "incremental_harvest": True,  # True=页面内 MutationObserver 增量收集, False=每轮全量扫描 DOM
+    "capture_api": True,          # True=优先解析页面自身的搜索接口 JSON，DOM 文本仅作兜底
+    "min_scroll_delay": (0.8, 1.6),  # 每次滚动后的最小随机等待 (秒)
+    "max_scroll_wait": 8.0,          # 等待新结果出现的最长时间 (秒)
+    "fixed_scroll_delay": (2.0, 4.0),  # 接口抓包和增量收集都关闭时，每次滚动后的固定随机等待 (秒)
+    "settle_delay": 3.0,             # 启动后、打开搜索页后的固定等待 (秒)
+    "max_idle_scrolls": 5,           # 连续多少轮没有新用户就停止 (has_more 一直为真也生效)
+    "enrich_profiles": False,        # True=逐个打开主页补全简介和联系方式
+    "enrich_concurrency": 4,         # 同时打开的主页标签数
+    "enrich_cache_file": "douyin_profile_cache.json",
+    "enrich_cache_ttl": 7 * 24 * 3600,  # 主页缓存有效期 (秒)
+    "base_url": "https://www.douyin.com",  # 离线基准测试时指向本地 fixture 服务
+    "resume": False,                       # True=从断点继续 (命令行 --resume)：跳过已完成的关键词，沿用已滚动收集到的用户
+    "browser_channel": "chrome"            # None=使用 Playwright 自带的 Chromium
 }
 
 # ==========================================
 # 👆👆👆 配置结束 👆👆👆
 # ==========================================
 
+# --- 页面内用户卡片收集脚本 ---
+
+# 全量扫描：每轮重新遍历所有用户链接 (兜底方案)
+FULL_SCAN_JS = '''() => {
+    function getTextWithSpaces(node) {
+        if (node.nodeType === 3) return node.nodeValue;
+        if (node.nodeType === 1) {
+            let s = "";
+            node.childNodes.forEach(child => s += getTextWithSpaces(child));
+            return s + " "; 
+        }
+        return "";
+    }
+    const items = [];
+    const userLinks = document.querySelectorAll('a[href*="/user/"]');
+    userLinks.forEach(link => {
+        const href = link.href;
+        const text = getTextWithSpaces(link).trim(); 
+        if (href.includes('/user/') && !href.includes('self') && !href.includes('from_nav')) {
+            if (text.length > 0) {
+                items.push({
+                    'nickname': text, 
+                    'profileUrl': href.split('?')[0], 
+                    'details': text 
+                });
+            }
+        }
+    });
+    return items;
+}'''
+
+# 增量收集：MutationObserver 只处理新插入的节点，结果放进 window.__dyHarvest 缓冲区
+# 同一个用户的文本变长 (卡片懒渲染) 时会再次入队，Python 端按 details 长度合并
+HARVEST_INSTALL_JS = '''() => {
+    if (window.__dyHarvest) return true;
+    const SELECTOR = 'a[href*="/user/"]';
+    const bestLength = new Map();
+    const buffer = [];
+
+    function getTextWithSpaces(node) {
+        if (node.nodeType === 3) return node.nodeValue;
+        if (node.nodeType === 1) {
+            let s = "";
+            node.childNodes.forEach(child => s += getTextWithSpaces(child));
+            return s + " ";
+        }
+        return "";
+    }
+
+    function harvest(link) {
+        const href = link.href || "";
+        if (!href.includes('/user/') || href.includes('self') || href.includes('from_nav')) return;
+        const text = getTextWithSpaces(link).trim();
+        if (text.length === 0) return;
+        const url = href.split('?')[0];
+        if ((bestLength.get(url) || 0) >= text.length) return;
+        bestLength.set(url, text.length);
+        buffer.push({'nickname': text, 'profileUrl': url, 'details': text});
+    }
+
+    function collect(node, pending) {
+        const el = node.nodeType === 1 ? node : node.parentElement;
+        if (!el) return;
+        // 节点本身在某个用户链接内部 (链接先插入、文字后渲染)
+        const owner = el.closest(SELECTOR);
+        if (owner) pending.add(owner);
+        if (node.nodeType === 1) el.querySelectorAll(SELECTOR).forEach(a => pending.add(a));
+    }
+
+    const initial = new Set();
+    collect(document.body, initial);
+    initial.forEach(harvest);
+
+    const observer = new MutationObserver(mutations => {
+        const pending = new Set();
+        for (const m of mutations) {
+            if (m.type === 'characterData') collect(m.target, pending);
+            m.addedNodes.forEach(n => collect(n, pending));
+        }
+        pending.forEach(harvest);
+    });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+
+    window.__dyHarvest = {
+        drain: () => buffer.splice(0, buffer.length),
+        pending: () => buffer.length,
+        size: () => bestLength.size,
+    };
+    return true;
+}'''
+
+HARVEST_DRAIN_JS = "() => window.__dyHarvest ? window.__dyHarvest.drain() : []"
+HARVEST_PENDING_JS = "() => !!window.__dyHarvest && window.__dyHarvest.pending() > 0"
+
 def clean_text(text):
     if not text:
         return ""
     return re.sub(r'\s+', ' ', text).strip()
 
+# --- 联系方式正则组 ---
+re_mobile_loose = re.compile(r'(?:手机|电话|联系|V|VX|vx|微信|合作)[:：]?\s*(1[3-9](?:[\s-]*\d){9})')
+re_landline = re.compile(r'(?<!\d)(0\d{2,3}[-\s]?\d{7,8})(?!\d)')
+re_hotline = re.compile(r'(?<!\d)(400[-\s]?\d{3}[-\s]?\d{4})(?!\d)')
+re_wechat = re.compile(r'(?:微信|V|VX|vx|微)[:：]?\s*([a-zA-Z][a-zA-Z0-9_-]{5,19})')
+re_qq = re.compile(r'(?:QQ|qq|Q)[:：]?\s*(\d{5,11})')
+re_email = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+@profiled("regex_extract")
+def extract_contacts(text):
+    """从简介文本中提取手机/座机/微信/QQ/邮箱"""
+    text = clean_text(text).replace('：', ':')
+    raw_mobiles = re_mobile_loose.findall(text)
+    clean_mobiles = [re.sub(r'[\s-]', '', m) for m in raw_mobiles]
+
+    return {
+        "mobile": list(set(clean_mobiles)),
+        "landline": list(set(re_landline.findall(text) + re_hotline.findall(text))),
+        "wechat": list(set(re_wechat.findall(text))),
+        "qq": list(set(re_qq.findall(text))),
+        "email": list(set(re_email.findall(text)))
+    }
+
+@profiled("extract")
 def extract_info(raw_data):
     """
     提取逻辑修正版 V7：
@@ -52,14 +194,6 @@ def extract_info(raw_data):
     re_likes = re.compile(r'(\d+(?:\.\d+)?[万wW亿]?)\s*获赞')
     re_followers = re.compile(r'(\d+(?:\.\d+)?[万wW亿]?)\s*粉丝')
 
-    # 5. 联系方式正则组
-    re_mobile_loose = re.compile(r'(?:手机|电话|联系|V|VX|vx|微信|合作)[:：]?\s*(1[3-9](?:[\s-]*\d){9})')
-    re_landline = re.compile(r'(?<!\d)(0\d{2,3}[-\s]?\d{7,8})(?!\d)')
-    re_hotline = re.compile(r'(?<!\d)(400[-\s]?\d{3}[-\s]?\d{4})(?!\d)')
-    re_wechat = re.compile(r'(?:微信|V|VX|vx|微)[:：]?\s*([a-zA-Z][a-zA-Z0-9_-]{5,19})')
-    re_qq = re.compile(r'(?:QQ|qq|Q)[:：]?\s*(\d{5,11})')
-    re_email = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-
     for item in raw_data:
         # 获取最全的文本
         raw_text = item.get('details', '') 
@@ -93,15 +227,6 @@ def extract_info(raw_data):
             bio_id_match = re_bio_after_id.search(raw_text)
             bio = bio_id_match.group(1).strip() if bio_id_match else ""
 
-        # --- 🅾️ 联系方式提取 ---
-        raw_mobiles = re_mobile_loose.findall(raw_text)
-        clean_mobiles = [re.sub(r'[\s-]', '', m) for m in raw_mobiles]
-
-        all_landlines = list(set(re_landline.findall(raw_text) + re_hotline.findall(raw_text)))
-        wechat_match = re_wechat.findall(raw_text)
-        qq_match = re_qq.findall(raw_text)
-        email_match = re_email.findall(raw_text)
-        
         cleaned_item = {
             "nickname": nickname,
             "douyin_id": douyin_id,
@@ -112,115 +237,445 @@ def extract_info(raw_data):
                 "likes": likes,
                 "followers": followers
             },
-            "contacts": {
-                "mobile": list(set(clean_mobiles)),
-                "landline": all_landlines,
-                "wechat": list(set(wechat_match)),
-                "qq": list(set(qq_match)),
-                "email": list(set(email_match))
-            }
+            # --- 🅾️ 联系方式提取 ---
+            "contacts": extract_contacts(raw_text)
         }
         cleaned_list.append(cleaned_item)
         
     return cleaned_list
 
-async def run():
-    # ... (主程序逻辑保持不变，复制 V6 的 run 函数即可) ...
-    user_data_dir = os.path.join(os.getcwd(), 'douyin_user_data')
-    if not os.path.exists(user_data_dir):
-        os.makedirs(user_data_dir)
+# --- 搜索接口抓包解析 ---
 
-    print(f'🚀 启动任务...')
-    async with async_playwright() as p:
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            channel="chrome",
-            headless=CONFIG["headless_mode"],
-            viewport={'width': 1920, 'height': 1080},
-            args=['--start-maximized', '--no-sandbox', '--disable-blink-features=AutomationControlled', '--ignore-certificate-errors'],
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        page = context.pages[0]
-        await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
+# 抖音网页版用户搜索走的接口 (XHR/fetch)，返回结构化的 user_list
+SEARCH_API_MARKERS = ("/aweme/v1/web/discover/search", "/aweme/v1/web/general/search")
+
+class SearchApiCapture:
+    """
+    监听页面自己发出的搜索请求，直接解析响应里的用户对象
+    比从链接文本里用正则还原昵称/抖音号/粉丝数更准，也省掉逐条正则的开销
+    """
+
+    def __init__(self):
+        self.users = {}          # profile_url -> 标准化用户
+        self.has_more = None     # 最近一次响应的 has_more
+        self.responses = 0
+        self.arrived = asyncio.Event()  # 有新的搜索响应到达
+
+    async def on_response(self, response):
+        if not any(marker in response.url for marker in SEARCH_API_MARKERS):
+            return
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
         try:
-            await page.goto("https://www.douyin.com", wait_until='domcontentloaded')
-        except: pass
+            payload = await response.json()
+        except Exception:
+            return
+
+        user_list = payload.get("user_list")
+        if user_list is None:
+            return
+        self.responses += 1
+        if "has_more" in payload:
+            self.has_more = bool(payload.get("has_more"))
+
+        for entry in user_list:
+            user = self.parse_user(entry.get("user_info") or {})
+            if user:
+                self.users[user["profile_url"]] = user
+        self.arrived.set()
+
+    @staticmethod
+    def parse_user(info):
+        """把接口里的 user_info 转成与 extract_info 相同的结构"""
+        sec_uid = info.get("sec_uid")
+        if not sec_uid:
+            return None
+        signature = info.get("signature") or ""
+        return {
+            "nickname": info.get("nickname", ""),
+            "douyin_id": info.get("unique_id") or info.get("short_id") or "未找到",
+            "description": clean_text(signature),
+            "profile_url": f"{CONFIG['base_url']}/user/{sec_uid}",
+            "stats": {
+                "likes": str(info.get("total_favorited", 0)),
+                "followers": str(info.get("follower_count", 0))
+            },
+            "contacts": extract_contacts(signature),
+            "source": "api"
+        }
+
+# --- 滚动节奏控制 ---
+
+async def scroll_and_wait(page, api_capture, incremental):
+    """
+    滚动一屏，然后等到新结果出现再返回，而不是固定睡 2~4 秒
+    1. 先睡一个随机的最小间隔，保证请求节奏不比原来更激进
+    2. 再等 "页面出现新用户卡片" 或 "收到新的搜索响应"，谁先到算谁
+    3. 两者都没等到时，最多等 max_scroll_wait 秒
+    接口抓包和增量收集都关闭时没有可等的信号，退回原来的固定随机等待
+    """
+    api_capture.arrived.clear()
+    # 每次滚动会触发一次搜索接口请求，按主机取令牌
+    await ratelimit.acquire_async(CONFIG["base_url"], via=proxypool.via(page))
+    await page.evaluate('window.scrollBy(0, document.body.scrollHeight)')
+    if not CONFIG["capture_api"] and not incremental:
+        await cassette.async_sleep(random.uniform(*CONFIG["fixed_scroll_delay"]))
+        return
+    await cassette.async_sleep(random.uniform(*CONFIG["min_scroll_delay"]))
+
+    timeout = CONFIG["max_scroll_wait"]
+    waiters = [asyncio.create_task(api_capture.arrived.wait())]
+    if incremental:
+        waiters.append(asyncio.create_task(
+            page.wait_for_function(HARVEST_PENDING_JS, timeout=timeout * 1000)
+        ))
+
+    done, pending = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        # wait_for_function 超时会抛异常，这里只关心是否等到了信号
+        task.exception()
 
-        if not CONFIG["headless_mode"]:
-            input("👉 确认登录就绪后，请按【回车键】继续...")
+# --- 主页补全 (可选) ---
+
+# 主页头部信息区，找不到时退回整页文本
+PROFILE_TEXT_JS = '''() => {
+    const el = document.querySelector('[data-e2e="user-info"]') || document.body;
+    return el ? el.innerText : "";
+}'''
+
+def load_profile_cache(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_profile_cache(path, cache):
+    if not path:
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+def merge_profile(user, profile):
+    """把主页提取结果合并进搜索卡片结果：联系方式取并集，其余字段只补缺"""
+    if len(profile.get("description", "")) > len(user.get("description", "")):
+        user["description"] = profile["description"]
+    if user.get("douyin_id") in (None, "", "未找到"):
+        user["douyin_id"] = profile.get("douyin_id", user.get("douyin_id"))
+    for key in ("likes", "followers"):
+        if user["stats"].get(key, "0") == "0":
+            user["stats"][key] = profile.get("stats", {}).get(key, "0")
+    for key, values in profile.get("contacts", {}).items():
+        user["contacts"][key] = sorted(set(user["contacts"].get(key, [])) | set(values))
+    user["enriched"] = True
+    return user
+
+@profiled("enrich")
+async def enrich_profiles(context, users, cache):
+    """
+    用固定数量的标签页并发打开用户主页，对主页文本跑 extract_info 并合并
+    已缓存且未过期的主页不再打开；cache 由调用方加载和保存，多个分片可共用
+    """
+    ttl = CONFIG["enrich_cache_ttl"]
+    now = time.time()
+
+    todo = []
+    for user in users:
+        cached = cache.get(user["profile_url"])
+        if cached and now - cached.get("fetched_at", 0) < ttl:
+            merge_profile(user, cached["profile"])
+        elif user["profile_url"]:
+            todo.append(user)
+
+    print(f"🔎 主页补全: 缓存命中 {len(users) - len(todo)} 个，待打开 {len(todo)} 个")
+    if not todo:
+        return users
+
+    # 标签池：每个标签页串行处理队列里的用户，图片/视频/字体一律不加载
+    tab_count = max(1, min(CONFIG["enrich_concurrency"], len(todo)))
+    queue = asyncio.Queue()
+    for user in todo:
+        queue.put_nowait(user)
+
+    async def block_heavy(route):
+        if route.request.resource_type in ("image", "media", "font"):
+            await route.abort()
         else:
-            await asyncio.sleep(3)
+            await route.continue_()
+
+    async def worker(tab):
+        while not queue.empty():
+            user = queue.get_nowait()
+            try:
+                await ratelimit.acquire_async(user["profile_url"], via=proxypool.via(tab))
+                with metrics.timer("playwright", collector="douyin", op="goto_profile"), profiling.span("page_load"):
+                    await tab.goto(user["profile_url"], wait_until='domcontentloaded')
+                await tab.wait_for_timeout(random.uniform(500, 1200))
+                text = await tab.evaluate(PROFILE_TEXT_JS)
+            except Exception as e:
+                print(f"    [-] 主页打开失败: {user['profile_url']} ({e})")
+                continue
+            profile = extract_info([{'details': text, 'profileUrl': user["profile_url"]}])[0]
+            cache[user["profile_url"]] = {"fetched_at": time.time(), "profile": profile}
+            merge_profile(user, profile)
+
+    tabs = []
+    for _ in range(tab_count):
+        tab = await context.new_page()
+        await tab.route("**/*", block_heavy)
+        tabs.append(tab)
+    try:
+        await asyncio.gather(*(worker(tab) for tab in tabs))
+    finally:
+        for tab in tabs:
+            await tab.close()
 
-        search_url = f"https://www.douyin.com/search/{CONFIG['keyword']}?type=user"
+    return users
+
+# --- 单个关键词的采集流程 ---
+
+@profiled("search")
+async def crawl_keyword(page, keyword, ckpt=None):
+    """
+    在给定标签页里搜索一个关键词，滚动采集直到凑够 target_count 或结果到底
+    指定断点时，收集到的用户 (DOM 与接口两路) 随滚动定期落盘；续采时先装回上次收集的用户再接着滚动
+    """
+    api_capture = SearchApiCapture()
+    unique_users_map = {}
+    if ckpt is not None:
+        harvest = ckpt.get("harvest")
+        if harvest is None:
+            harvest = {}
+            ckpt.set("harvest", harvest)
+        saved = harvest.get(keyword)
+        if saved:
+            unique_users_map.update(saved["dom"])
+            api_capture.users.update(saved["api"])
+            print(f"♻️ [{keyword}] 断点: 已收集 {len(unique_users_map.keys() | api_capture.users.keys())} 个用户")
+        # 直接引用两个字典，滚动过程中的新增随断点一起落盘
+        harvest[keyword] = {"dom": unique_users_map, "api": api_capture.users}
+    if CONFIG["capture_api"]:
+        page.on("response", api_capture.on_response)
+
+    search_url = f"{CONFIG['base_url']}/search/{keyword}?type=user"
+    await ratelimit.acquire_async(search_url, via=proxypool.via(page))
+    with metrics.timer("playwright", collector="douyin", op="goto"), profiling.span("page_load"):
         await page.goto(search_url, wait_until='domcontentloaded')
-        await asyncio.sleep(3)
+    await cassette.async_sleep(CONFIG["settle_delay"])
 
-        unique_users_map = {}
-        no_new_data_count = 0
-        
-        print('⬇️ 开始抓取数据...')
-
-        while len(unique_users_map) < CONFIG['target_count']:
-            current_batch = await page.evaluate('''() => {
-                function getTextWithSpaces(node) {
-                    if (node.nodeType === 3) return node.nodeValue;
-                    if (node.nodeType === 1) {
-                        let s = "";
-                        node.childNodes.forEach(child => s += getTextWithSpaces(child));
-                        return s + " "; 
-                    }
-                    return "";
-                }
-                const items = [];
-                const userLinks = document.querySelectorAll('a[href*="/user/"]');
-                userLinks.forEach(link => {
-                    const href = link.href;
-                    const text = getTextWithSpaces(link).trim(); 
-                    if (href.includes('/user/') && !href.includes('self') && !href.includes('from_nav')) {
-                        if (text.length > 0) {
-                            items.push({
-                                'nickname': text, 
-                                'profileUrl': href.split('?')[0], 
-                                'details': text 
-                            });
-                        }
-                    }
-                });
-                return items;
-            }''')
+    incremental = CONFIG["incremental_harvest"]
+    if incremental:
+        try:
+            await page.evaluate(HARVEST_INSTALL_JS)
+        except Exception as e:
+            print(f"⚠️ 增量收集器注入失败，回退到全量扫描: {e}")
+            incremental = False
+
+    no_new_data_count = 0
+    size_after = 0
+    
+    print(f'⬇️ [{keyword}] 开始抓取数据...')
 
-            size_before = len(unique_users_map)
-            for user in current_batch:
-                url = user['profileUrl']
-                if url not in unique_users_map:
+    while size_after < CONFIG['target_count']:
+        if incremental:
+            # 只取回上次抽取之后新增/变长的用户卡片
+            current_batch = await page.evaluate(HARVEST_DRAIN_JS)
+        else:
+            current_batch = await page.evaluate(FULL_SCAN_JS)
+
+        size_before = size_after
+        for user in current_batch:
+            url = user['profileUrl']
+            if url not in unique_users_map:
+                unique_users_map[url] = user
+            else:
+                if len(user['details']) > len(unique_users_map[url]['details']):
                     unique_users_map[url] = user
+        
+        # DOM 和接口两路结果按 profile_url 合并计数
+        size_after = len(unique_users_map.keys() | api_capture.users.keys())
+        print(f"📊 [{keyword}] 当前有效用户: {size_after} / {CONFIG['target_count']}")
+        if ckpt is not None and size_after != size_before:
+            ckpt.changed()
+
+        if size_after >= CONFIG['target_count']: break
+        if api_capture.has_more is False:
+            print(f"🔚 [{keyword}] 搜索接口返回 has_more=0，结果已全部加载")
+            break
+        # 兜底: 接口一直报 has_more 但页面不再出新用户 (懒加载卡住、XHR 被拦) 时同样停止
+        if size_after == size_before:
+            no_new_data_count += 1
+            if no_new_data_count > CONFIG["max_idle_scrolls"]:
+                print(f"🔚 [{keyword}] 连续 {no_new_data_count} 轮没有新用户，停止滚动")
+                break
+        else:
+            no_new_data_count = 0 
+
+        await scroll_and_wait(page, api_capture, incremental)
+
+    if CONFIG["capture_api"]:
+        page.remove_listener("response", api_capture.on_response)
+
+    # 接口里有的用户直接用结构化数据，只有接口没覆盖到的才走正则兜底
+    fallback_raw = [u for url, u in unique_users_map.items() if url not in api_capture.users]
+    print(f"🧹 [{keyword}] 接口解析 {len(api_capture.users)} 个用户，正则兜底 {len(fallback_raw)} 个...")
+    final_data = list(api_capture.users.values()) + extract_info(fallback_raw)
+    for user in final_data:
+        user["keywords"] = [keyword]
+    return final_data[:CONFIG['target_count']]
+
+# --- 分片：每个分片一个已登录的持久化浏览器目录 ---
+
+def shard_user_data_dir(shard_idx):
+    """分片 0 沿用原来的 douyin_user_data，其余分片为 douyin_user_data_<n>"""
+    name = 'douyin_user_data' if shard_idx == 0 else f'douyin_user_data_{shard_idx}'
+    return os.path.join(os.getcwd(), name)
+
+async def launch_shard(p, shard_idx, headless):
+    user_data_dir = shard_user_data_dir(shard_idx)
+    if not os.path.exists(user_data_dir):
+        os.makedirs(user_data_dir)
+
+    # 每个分片固定一个出口代理，分片数就是可以并行使用的出口数
+    proxy = proxypool.assign(f"douyin_{shard_idx}")
+    context = await p.chromium.launch_persistent_context(
+        user_data_dir,
+        **proxypool.context_options(proxy),
+        channel=CONFIG["browser_channel"],
+        headless=headless,
+        viewport={'width': 1920, 'height': 1080},
+        args=['--start-maximized', '--no-sandbox', '--disable-blink-features=AutomationControlled', '--ignore-certificate-errors'],
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    )
+    await cassette.attach_har(context, f"douyin_{shard_idx}")
+    proxypool.track(context, proxy)
+    page = context.pages[0]
+    await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    
+    try:
+        await ratelimit.acquire_async(CONFIG["base_url"], via=proxypool.via(context))
+        await page.goto(CONFIG["base_url"], wait_until='domcontentloaded')
+    except: pass
+    return context
+
+def merge_user(merged, user):
+    """
+    按 profile_url 合并到 merged (所有分片共享)：关键词取并集，接口记录优先于正则兜底的记录
+    返回合并后的记录 (新用户或有变化的已有用户)，没有变化时返回 None
+    """
+    url = user["profile_url"]
+    existing = merged.get(url)
+    if existing is None:
+        merged[url] = user
+        return user
+
+    keywords = sorted(set(existing["keywords"]) | set(user["keywords"]))
+    upgraded = existing.get("source") != "api" and user.get("source") == "api"
+    if not upgraded and keywords == existing["keywords"]:
+        return None
+    if upgraded:
+        # 已补全过主页的，把主页信息带到接口记录上
+        if existing.get("enriched"):
+            merge_profile(user, existing)
+        existing = merged[url] = user
+    existing["keywords"] = keywords
+    return existing
+
+async def run_shard(context, keywords, merged, cache, ckpt):
+    """
+    一个分片内的关键词串行采集，分片之间并行
+    每个关键词采集完就对新用户按需补全主页，再按 profile_url 合并进 merged (所有分片共享，保存在断点里)，
+    并在断点里记为已完成；结果文件在全部关键词结束后由 run() 一次写出，每个用户一行
+    """
+    page = context.pages[0]
+    for keyword in keywords:
+        try:
+            records = await crawl_keyword(page, keyword, ckpt)
+        except Exception as e:
+            print(f"⚠️ [{keyword}] 采集失败: {e}")
+            # 未记为已完成，保留断点以便 --resume 重试这个关键词
+            ckpt.incomplete(keyword)
+            continue
+
+        fresh = [user for user in records if user["profile_url"] not in merged]
+        if CONFIG["enrich_profiles"] and fresh:
+            await enrich_profiles(context, fresh, cache)
+
+        # 补全期间其他分片可能已合并了同一批用户，新增/更新按合并时的状态重新判断
+        added = updated = 0
+        for user in records:
+            is_new = user["profile_url"] not in merged
+            if merge_user(merged, user) is not None:
+                if is_new:
+                    added += 1
                 else:
-                    if len(user['details']) > len(unique_users_map[url]['details']):
-                        unique_users_map[url] = user
-            
-            size_after = len(unique_users_map)
-            print(f"📊 当前有效用户: {size_after} / {CONFIG['target_count']}")
-
-            if size_after >= CONFIG['target_count']: break
-            if size_after == size_before:
-                no_new_data_count += 1
-                if no_new_data_count > 5: break
-            else:
-                no_new_data_count = 0 
+                    updated += 1
+        print(f"🧩 [{keyword}] 新增 {added} 个用户，更新 {updated} 个已有用户")
 
-            await page.evaluate('window.scrollBy(0, document.body.scrollHeight)')
-            await asyncio.sleep(random.uniform(2.0, 4.0))
+        ckpt.changed()
+        ckpt.get("harvest", {}).pop(keyword, None)
+        ckpt.mark("done_keywords", keyword)
+        ckpt.save()
 
-        raw_data = list(unique_users_map.values())[:CONFIG['target_count']]
-        
-        print("🧹 正在进行数据清洗和提取...")
-        final_data = extract_info(raw_data)
+def write_users(path, merged):
+    """同一用户可能被多个关键词命中，合并完再写，每个 profile_url 只有一行 (续采时 merged 含上次的用户)"""
+    with JsonlSink(path, collector="douyin") as sink:
+        sink.write_many(merged.values())
+    return sink.count
+
+async def run(keywords=None, save_file_name=None, headless=None):
+    """headless 为 None 时取 CONFIG["headless_mode"]；编排器无人值守，直接传 True"""
+    keywords = keywords or CONFIG["keywords"] or [CONFIG["keyword"]]
+    headless = CONFIG["headless_mode"] if headless is None else headless
+    save_file_name = save_file_name or CONFIG['save_file_name']
+    ckpt = checkpoint.start("douyin", ",".join(keywords), resume=CONFIG["resume"])
+    if ckpt.resumed:
+        done = ckpt.marked("done_keywords")
+        print(f"♻️ 断点: {len(done)} 个关键词已完成，已合并 {len(ckpt.get('users', {}))} 个用户")
+        keywords = [k for k in keywords if k not in done]
+        if not keywords:
+            # 上次在写出结果前中断：直接写出断点里合并好的用户
+            count = write_users(save_file_name, ckpt.get("users", {}))
+            ckpt.finish()
+            print(f"✅ 所有关键词均已完成，已写出 {count} 个用户: {save_file_name}")
+            return
+    shard_count = max(1, min(CONFIG["shards"], len(keywords)))
+
+    print(f'🚀 启动任务: {len(keywords)} 个关键词, {shard_count} 个分片...')
+    async with async_playwright() as p:
+        contexts = await asyncio.gather(*(launch_shard(p, i, headless) for i in range(shard_count)))
+
+        if not headless:
+            input("👉 确认所有分片登录就绪后，请按【回车键】继续...")
+        else:
+            await cassette.async_sleep(CONFIG["settle_delay"])
+
+        # 合并结果放在断点里，续采时后来的关键词仍能与已写出的用户合并
+        merged = ckpt.get("users")
+        if merged is None:
+            merged = {}
+            ckpt.set("users", merged)
+        cache = load_profile_cache(CONFIG["enrich_cache_file"]) if CONFIG["enrich_profiles"] else {}
+        with ckpt:
+            # 关键词轮流分配给各分片
+            await asyncio.gather(*(
+                run_shard(context, keywords[i::shard_count], merged, cache, ckpt)
+                for i, context in enumerate(contexts)
+            ))
+            count = write_users(save_file_name, merged)
+        if CONFIG["enrich_profiles"]:
+            save_profile_cache(CONFIG["enrich_cache_file"], cache)
 
-        with open(CONFIG['save_file_name'], 'w', encoding='utf-8') as f:
-            json.dump(final_data, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 数据已清洗并保存: {save_file_name} (共 {count} 个用户)")
 
-        print(f"\n✅ 数据已清洗并保存: {CONFIG['save_file_name']}")
+        for context in contexts:
+            await context.close()
 
 if __name__ == '__main__':
-    asyncio.run(run())
\ No newline at end of file
+    CONFIG["resume"] = CONFIG["resume"] or "--resume" in sys.argv[1:]
+    metrics.start_from_env()
+    profiling.run(lambda: asyncio.run(run()))
\ No newline at end of file
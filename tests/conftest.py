@@ -0,0 +1,7 @@
+"""
+测试共用设置：把仓库根目录加入 sys.path，便于 import osint_common
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,100 @@
+"""
+熔断器状态转换测试
+"""
+import threading
+
+import pytest
+
+from osint_common import breaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker, "time", clock)
+    monkeypatch.delenv("OSINT_BREAKER", raising=False)
+    return clock
+
+
+@pytest.fixture
+def circuit(tmp_path, clock):
+    return breaker.CircuitBreaker("test@default", breaker.BreakerStore(str(tmp_path / "breaker.db")), cooldown=60)
+
+
+def test_trip_opens_until_cooldown_ends(circuit, clock):
+    assert circuit.allow()
+    circuit.trip("滑块")
+    assert circuit.state() == breaker.OPEN
+    assert not circuit.allow() and not circuit.available()
+    with pytest.raises(breaker.CircuitOpen):
+        circuit.check()
+
+    clock.sleep(61)
+    assert circuit.state() == breaker.HALF_OPEN
+    assert circuit.available()
+
+
+def test_failures_below_threshold_stay_closed(circuit):
+    for _ in range(breaker.FAILURE_THRESHOLD - 1):
+        circuit.record_failure("timeout")
+    assert circuit.state() == breaker.CLOSED
+    circuit.record_failure("timeout")
+    assert circuit.state() == breaker.OPEN
+
+
+def test_only_one_probe_after_cooldown(circuit, clock):
+    circuit.trip("滑块")
+    clock.sleep(61)
+    assert circuit.allow()
+    assert not circuit.allow()
+    assert not circuit.available()
+
+    circuit.record_success()
+    assert circuit.state() == breaker.CLOSED
+    assert circuit.allow()
+
+
+def test_failed_probe_doubles_cooldown(circuit, clock):
+    circuit.trip("滑块")
+    clock.sleep(61)
+    assert circuit.allow()
+    circuit.trip("滑块")
+    assert circuit.state() == breaker.OPEN
+    assert circuit.retry_after() == pytest.approx(120)
+
+    clock.sleep(121)
+    assert circuit.allow()
+    circuit.record_success()
+    # 恢复后冷却时间回到初始值
+    circuit.trip("滑块")
+    assert circuit.retry_after() == pytest.approx(60)
+
+
+def test_in_flight_success_does_not_close(circuit, clock):
+    # 其他线程 trip 之后，打开前就已发出的请求成功返回
+    circuit.trip("滑块")
+    circuit.record_success()
+    assert circuit.state() == breaker.OPEN
+    assert not circuit.allow()
+
+    # 半开时只有探测者的成功算数
+    clock.sleep(61)
+    assert circuit.allow()
+    other = threading.Thread(target=circuit.record_success)
+    other.start()
+    other.join()
+    assert circuit.state() == breaker.HALF_OPEN
+
+    circuit.record_success()
+    assert circuit.state() == breaker.CLOSED
@@ -0,0 +1,24 @@
+"""
+断点保存/删除测试
+"""
+import os
+
+from osint_common import checkpoint
+
+
+def test_clean_exit_removes_checkpoint(tmp_path):
+    with checkpoint.start("weibo", "航空", directory=str(tmp_path)) as ckpt:
+        ckpt.mark("done", "1001")
+        ckpt.save()
+    assert not os.path.exists(ckpt.path)
+
+
+def test_incomplete_run_keeps_checkpoint(tmp_path):
+    with checkpoint.start("weibo", "航空", directory=str(tmp_path)) as ckpt:
+        ckpt.mark("done", "1001")
+        ckpt.incomplete("1002")
+    assert os.path.exists(ckpt.path)
+
+    resumed = checkpoint.start("weibo", "航空", resume=True, directory=str(tmp_path))
+    assert resumed.is_marked("done", "1001")
+    assert not resumed.is_marked("done", "1002")
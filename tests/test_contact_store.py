@@ -0,0 +1,36 @@
+"""
+ContactStore 写入测试
+"""
+from osint_common.contact_store import ContactStore
+
+WEIBO_USERS = [
+    {"uid": "1001", "nickname": "山航客服", "contact_mobile": "13800138000", "contact_landline": "0531-88888888"},
+    {"uid": "1002", "nickname": "山航票务", "contact_wechat": "sdair_ticket"},
+]
+
+
+def _counts(store):
+    return {
+        table: store.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("sources", "entities", "contacts")
+    }
+
+
+def test_reingest_is_idempotent(tmp_path):
+    with ContactStore(str(tmp_path / "contacts.db")) as store:
+        assert store.add_weibo(WEIBO_USERS) == 3
+        first = _counts(store)
+
+        assert store.add_weibo(WEIBO_USERS) == 0
+        assert _counts(store) == first
+        assert len(store.find_contact("138-0013-8000")) == 1
+
+
+def test_placeholder_entities_stay_per_article(tmp_path):
+    articles = [
+        {"url": "https://mp.weixin.qq.com/s/a", "extracted_data": [{"type": "mobile", "value": "13800138000"}]},
+        {"url": "https://mp.weixin.qq.com/s/b", "extracted_data": [{"type": "mobile", "value": "13900139000"}]},
+    ]
+    with ContactStore(str(tmp_path / "contacts.db")) as store:
+        assert store.add_sogou(articles) == 2
+        assert _counts(store)["entities"] == 2
@@ -0,0 +1,76 @@
+"""
+千里马解密断点测试
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "千里马"))
+
+from decrypt_scheduler import DecryptCache, DecryptError, DecryptScheduler, checkpointed_decrypt  # noqa: E402
+from osint_common import checkpoint  # noqa: E402
+
+
+def test_failed_decrypt_is_retried_on_resume(tmp_path):
+    answers = {"h1": "13800138000", "h2": None}
+    calls = []
+
+    def flaky(mobile_hash):
+        calls.append(mobile_hash)
+        if mobile_hash == "h3":
+            raise DecryptError("解密接口返回 code=500")
+        return answers[mobile_hash]
+
+    with pytest.raises(DecryptError):
+        with checkpoint.start("qianlima", "测试公司", directory=str(tmp_path), save_every=1) as ckpt:
+            decrypt = checkpointed_decrypt(flaky, ckpt)
+            for mobile_hash in ("h1", "h2", "h3"):
+                decrypt(mobile_hash)
+
+    answers["h3"] = "13900139000"
+    calls.clear()
+    with checkpoint.start("qianlima", "测试公司", resume=True, directory=str(tmp_path)) as ckpt:
+        decrypt = checkpointed_decrypt(lambda mobile_hash: calls.append(mobile_hash) or answers[mobile_hash], ckpt)
+        # 已答复的 (包括没有号码的) 不再消耗额度，失败的重新解密
+        assert [decrypt(h) for h in ("h1", "h2", "h3")] == ["13800138000", None, "13900139000"]
+    assert calls == ["h3"]
+
+
+class Blocked(Exception):
+    pass
+
+
+def test_execute_skips_failed_hash_and_raises_fatal(tmp_path):
+    scheduler = DecryptScheduler(cache=DecryptCache(str(tmp_path / "cache.json")))
+    plan = scheduler.plan([{"mobile": h, "count": 1} for h in ("h1", "h2", "h3")])
+
+    def decrypt(mobile_hash):
+        if mobile_hash == "h2":
+            raise DecryptError("timeout")
+        return "138" + mobile_hash
+
+    with checkpoint.start("qianlima", "跳过", directory=str(tmp_path)) as ckpt:
+        resolved = scheduler.execute(plan, checkpointed_decrypt(decrypt, ckpt), fatal=(Blocked,))
+        assert resolved == {"h1": "138h1", "h3": "138h3"}
+        assert "h2" not in ckpt.get("decrypted")
+    assert [item["mobile"] for item in plan.skipped if item["reason"] == "decrypt_failed"] == ["h2"]
+
+    def blocked(mobile_hash):
+        raise Blocked()
+
+    with pytest.raises(Blocked):
+        scheduler.execute(scheduler.plan([{"mobile": "h4"}]), blocked, fatal=(Blocked,))
+
+
+def test_plan_explores_zero_score_contacts_and_spends_whole_budget(tmp_path):
+    scheduler = DecryptScheduler(budget=5, cache=DecryptCache(str(tmp_path / "cache.json")),
+                                 company_phone="0531-88888888", explore_ratio=0.4)
+    contacts = [{"mobile": f"h{n}", "count": n} for n in (50, 20, 10)]
+    contacts.append({"mobile": "h0"})
+    contacts += [{"mobile": f"dup{i}", "phone": "053188888888", "count": 5} for i in range(3)]
+
+    plan = scheduler.plan(contacts)
+    # 得分为 0 的非重复联系人也能被探索到，抽样不够的名额补给排名靠前的，预算用满
+    assert [c["mobile"] for c in plan.selected] == ["h50", "h20", "h10", "h0", "dup0"]
+    assert [s["reason"] for s in plan.skipped] == ["duplicate_company_phone"] * 2
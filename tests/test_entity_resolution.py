@@ -0,0 +1,36 @@
+"""
+EntityResolver 分块合并测试
+"""
+from osint_common.entity_resolution import EntityResolver
+
+
+def test_hotline_does_not_merge_records():
+    resolver = EntityResolver(max_block_size=50)
+    users = [{"uid": str(i), "nickname": f"用户{i}", "contact_landline": "400-800-1234"} for i in range(200)]
+    # 另有两个账号共享一个手机号，应照常合并
+    users[0]["contact_mobile"] = "13800138000"
+    users[1]["contact_mobile"] = "13800138000"
+    resolver.add_records("weibo", users)
+
+    sizes = sorted(len(members) for members in resolver.clusters().values())
+    assert sizes == [1] * 198 + [2]
+    assert resolver.cluster_of("weibo", "0") == resolver.cluster_of("weibo", "1")
+    assert resolver.cluster_of("weibo", "2") != resolver.cluster_of("weibo", "3")
+
+
+def test_placeholder_entity_is_not_a_hub():
+    resolver = EntityResolver()
+    resolver.add_records("weibo", [
+        {"uid": "1", "nickname": "甲", "contact_mobile": "13800138000"},
+        {"uid": "2", "nickname": "乙", "contact_mobile": "13900139000"},
+    ])
+    # 两篇文章都没识别出主体，各自带一个号码
+    resolver.add_records("sogou", [
+        {"url": "https://mp.weixin.qq.com/s/a",
+         "extracted_data": [{"type": "mobile", "value": "13800138000"}]},
+        {"url": "https://mp.weixin.qq.com/s/b",
+         "extracted_data": [{"type": "mobile", "value": "13900139000", "entity": ""}]},
+    ])
+
+    assert resolver.cluster_of("weibo", "1") != resolver.cluster_of("weibo", "2")
+    assert all("未识别主体" not in d["names"] for d in resolver.dossiers())
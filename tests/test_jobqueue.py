@@ -0,0 +1,117 @@
+"""
+任务队列网络后端测试
+"""
+import threading
+
+import pytest
+import requests
+
+from osint_common import jobqueue
+from osint_common.jobqueue import HttpJobQueue, SqliteJobQueue, serve_queue
+
+
+@pytest.fixture
+def served(tmp_path):
+    server = serve_queue(SqliteJobQueue(str(tmp_path / "jobs.db")), "127.0.0.1", 0, token="s3cret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_required(served):
+    with pytest.raises(requests.HTTPError):
+        HttpJobQueue(served, token="").stats()
+    with pytest.raises(requests.HTTPError):
+        HttpJobQueue(served, token="wrong").stats()
+
+    client = HttpJobQueue(served, token="s3cret")
+    assert client.enqueue("qianlima", "山东航空") is True
+    assert client.stats() == {"qianlima": {"queued": 1}}
+
+
+def test_public_bind_without_token_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        serve_queue(SqliteJobQueue(str(tmp_path / "jobs.db")), "0.0.0.0", 0, token="")
+
+
+class FlakyQueue:
+    """前 n 次 lease 抛网络错误的队列"""
+
+    def __init__(self, queue, failures):
+        self.queue = queue
+        self.failures = failures
+
+    def lease(self, *args):
+        if self.failures:
+            self.failures -= 1
+            raise requests.ConnectionError("connection reset")
+        return self.queue.lease(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.queue, name)
+
+
+@pytest.fixture
+def worker_env(monkeypatch):
+    # 不退避等待；不受本机熔断状态影响
+    monkeypatch.setattr(jobqueue, "QUEUE_RETRY_DELAY", 0)
+    monkeypatch.setenv("OSINT_BREAKER", "0")
+
+
+def test_worker_survives_transport_errors(tmp_path, worker_env):
+    queue = SqliteJobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("sogou", "山东航空")
+    worker = jobqueue.Worker(FlakyQueue(queue, 2), {"sogou": lambda target: {"records": [{"name": target}]}},
+                             worker_id="w1", result_dir=str(tmp_path / "out"))
+    worker.run(stop_when_empty=True)
+    assert queue.stats() == {"sogou": {"done": 1}}
+
+
+def test_results_dropped_when_lease_lost(tmp_path, worker_env):
+    queue = SqliteJobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("sogou", "山东航空")
+
+    def handler(target):
+        # 执行期间租约过期并被其他进程领取
+        queue._conn().execute("UPDATE jobs SET worker = 'w2'")
+        return {"records": [{"name": target}]}
+
+    worker = jobqueue.Worker(queue, {"sogou": handler}, worker_id="w1", result_dir=str(tmp_path / "out"))
+    assert worker.run_one() == jobqueue.RAN
+    assert not (tmp_path / "out" / "sogou.w1.jsonl").exists()
+    assert queue.stats() == {"sogou": {"leased": 1}}
+
+
+def test_heartbeat_errors_do_not_stop_keep_alive(worker_env):
+    answers = [requests.Timeout("timeout"), requests.ConnectionError("reset"), False]
+
+    class Queue:
+        def heartbeat(self, *args):
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+    worker = jobqueue.Worker(Queue(), {"sogou": None}, worker_id="w1", lease_seconds=0.03)
+    job = jobqueue.Job(1, "sogou", "山东航空", 1, 3, "w1")
+    lost = threading.Event()
+    worker._keep_alive(job, threading.Event(), lost)
+    assert lost.is_set() and not answers
+
+
+def test_blocked_is_not_empty(tmp_path, worker_env, monkeypatch):
+    class Circuit:
+        def __init__(self, source):
+            self.source = source
+
+        def available(self):
+            return self.source != "weibo"
+
+    monkeypatch.setattr(jobqueue.breaker, "get", Circuit)
+    queue = SqliteJobQueue(str(tmp_path / "jobs.db"))
+    worker = jobqueue.Worker(queue, {"sogou": None, "weibo": None}, worker_id="w1")
+    assert worker.run_one() == jobqueue.EMPTY
+
+    queue.enqueue("weibo", "山东航空")
+    assert worker.run_one() == jobqueue.BLOCKED
@@ -0,0 +1,27 @@
+"""
+指标注册表测试
+"""
+import asyncio
+
+import pytest
+
+from osint_common.metrics import Registry
+
+
+def _errors(registry):
+    return registry.snapshot()["counters"].get("errors_total", [])
+
+
+def test_timer_counts_exceptions_but_not_cancellation():
+    registry = Registry()
+    with pytest.raises(ValueError):
+        with registry.timer("playwright", collector="weibo"):
+            raise ValueError("bad json")
+    with pytest.raises(asyncio.CancelledError):
+        with registry.timer("playwright", collector="weibo"):
+            raise asyncio.CancelledError()
+    with pytest.raises(KeyboardInterrupt):
+        with registry.timer("playwright", collector="weibo"):
+            raise KeyboardInterrupt()
+
+    assert [(e["labels"]["kind"], e["value"]) for e in _errors(registry)] == [("ValueError", 1)]
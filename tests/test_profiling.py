@@ -0,0 +1,31 @@
+"""
+栈采样器测试
+"""
+import threading
+import time
+
+from osint_common.profiling import StackSampler
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_covers_worker_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name="worker")
+    worker.start()
+    sampler = StackSampler(interval=0.005)
+    sampler.start()
+    try:
+        time.sleep(0.2)
+    finally:
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+    stacks = list(sampler.samples)
+    assert any(s.startswith("thread worker;") and "_busy_worker" in s for s in stacks)
+    assert any(s.startswith("thread MainThread;") for s in stacks)
+    assert not any(s.startswith("thread profile-sampler;") for s in stacks)
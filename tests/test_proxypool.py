@@ -0,0 +1,87 @@
+"""
+代理池测试：经本地代理替身访问 fixture 服务，验证剔除、粘性分配和加权选择
+"""
+import random
+
+import pytest
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.proxy_standin import ProxyStandIn
+from osint_common import proxypool
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("OSINT_RATE_LIMIT", "0")
+    with FixtureServer() as server:
+        yield server
+
+
+def _get(pool, key, url, times):
+    http = proxypool.session(key, pool=pool)
+    try:
+        return [http.get(url, timeout=10).status_code for _ in range(times)]
+    finally:
+        http.close()
+
+
+def test_blocked_proxy_is_evicted(server):
+    with ProxyStandIn(block_rate=1.0, seed=1) as standin:
+        pool = proxypool.ProxyPool([standin.url])
+        statuses = _get(pool, "weibo", f"{server.base_url}/weibo/m", proxypool.EVICT_AFTER_FAILURES)
+
+    proxy = pool.proxies[0]
+    assert statuses == [429] * proxypool.EVICT_AFTER_FAILURES
+    assert proxy.evicted_until > 0
+    assert proxy.evictions == 1
+    assert pool.live() == []
+
+
+def test_evictions_reset_only_after_healthy_streak():
+    pool = proxypool.ProxyPool(["http://127.0.0.1:1"])
+    proxy = pool.proxies[0]
+    proxy.evictions = 2
+
+    for _ in range(proxypool.HEALTHY_STREAK - 1):
+        pool.report(proxy, True)
+    pool.report(proxy, False)
+    # 连胜被打断，剔除次数保留，下次剔除仍然翻倍
+    assert proxy.evictions == 2
+
+    for _ in range(proxypool.HEALTHY_STREAK):
+        pool.report(proxy, True)
+    assert proxy.evictions == 0
+
+
+def test_session_sticks_to_one_proxy(server):
+    with ProxyStandIn(seed=1) as first, ProxyStandIn(seed=2) as second:
+        pool = proxypool.ProxyPool([first.url, second.url])
+        statuses = _get(pool, "douyin_0", f"{server.base_url}/weibo/m", 10)
+        assigned = pool.assign("douyin_0")
+
+    assert statuses == [200] * 10
+    by_url = {first.url: first, second.url: second}
+    assert by_url[assigned.url].stats["requests"] == 10
+    assert sum(s.stats["requests"] for s in by_url.values()) == 10
+
+
+def test_choice_favours_faster_proxy(server):
+    url = f"{server.base_url}/weibo/m"
+    with ProxyStandIn(seed=1) as fast, ProxyStandIn(latency=0.2, seed=2) as slow:
+        fast_proxy, slow_proxy = proxypool.Proxy(fast.url), proxypool.Proxy(slow.url)
+        # 各用单代理的池测一次延迟；Proxy 对象共享，统计带进合并后的池
+        for proxy in (fast_proxy, slow_proxy):
+            _get(proxypool.ProxyPool([proxy]), "warmup", url, 2)
+
+    pool = proxypool.ProxyPool([fast_proxy, slow_proxy])
+    random.seed(0)
+    picks = [pool.choose() for _ in range(2000)]
+    assert picks.count(fast_proxy) / len(picks) > 0.7
+
+
+def test_choice_follows_configured_weight():
+    heavy, light = proxypool.parse_proxies(["http://127.0.0.1:1|3", "http://127.0.0.1:2"])
+    pool = proxypool.ProxyPool([heavy, light])
+    random.seed(0)
+    picks = [pool.choose() for _ in range(2000)]
+    assert 0.7 < picks.count(heavy) / len(picks) < 0.8
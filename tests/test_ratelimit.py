@@ -0,0 +1,77 @@
+"""
+令牌桶限速测试
+"""
+import asyncio
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from osint_common import ratelimit
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ratelimit.TokenBucketStore(str(tmp_path / "rate.db"), {"example.com": (2.0, 3)})
+    monkeypatch.setattr(ratelimit, "_store", store)
+    monkeypatch.delenv("OSINT_RATE_LIMIT", raising=False)
+    return store
+
+
+def test_burst_then_wait(store):
+    assert [store.try_acquire("example.com") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.try_acquire("example.com") == pytest.approx(0.5, abs=0.05)
+    # 未配置预算的主机不限速
+    assert store.try_acquire("other.com") == 0.0
+
+
+def test_each_exit_has_its_own_bucket(store):
+    for _ in range(3):
+        ratelimit.acquire("https://example.com/a")
+    assert ratelimit.acquire("https://example.com/a", via="http://10.0.0.1:8080") == 0.0
+    assert store.try_acquire("example.com", bucket="example.com") > 0
+
+
+def _take_all(path, results):
+    store = ratelimit.TokenBucketStore(path, {"example.com": (0.001, 5)})
+    results.put(sum(store.try_acquire("example.com") == 0 for _ in range(5)))
+
+
+def test_budget_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "rate.db")
+    ratelimit.TokenBucketStore(path)
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_take_all, args=(path, results)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(30)
+    assert sum(results.get(timeout=5) for _ in procs) == 5
+
+
+def test_acquire_async_does_not_block_the_loop(store):
+    # 另一个进程持有写锁时，等锁期间其他协程照常运行
+    holder = sqlite3.connect(store.path, isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.3, lambda: holder.execute("COMMIT")).start()
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        started = time.monotonic()
+        await ratelimit.acquire_async("https://example.com/")
+        task.cancel()
+        return ticks, time.monotonic() - started
+
+    ticks, elapsed = asyncio.run(main())
+    assert elapsed >= 0.25
+    assert ticks >= 10
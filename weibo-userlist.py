@@ -3,15 +3,57 @@ import random
 import re
 import os
 import json
+import queue
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from playwright.sync_api import sync_playwright
 
+import requests
+
+from osint_common import breaker, cassette, checkpoint, metrics, profiling, proxypool, ratelimit
+from osint_common.profiling import profiled
+from osint_common.sink import JsonlSink
+
+cassette.install_from_env()
+
 # ================= 配置区域 =================
 KEYWORD = "山东航空"          # 搜索关键词
 STATE_FILE = "state.json"    # 登录Cookie保存文件
 HEADLESS = True              # True=后台静默运行, False=显示浏览器观察
-OUTPUT_FILE = "weibo_osint_data.json" 
+OUTPUT_FILE = "weibo_osint_data.jsonl"  # 每行一个用户，采集完一个写一个
+DETAIL_MODE = "http"         # http=直接调用 getIndex 接口 (仅滑块时用浏览器), browser=全程浏览器
+HTTP_CONCURRENCY = 4         # http 模式下的并发请求数
+SEARCH_MAX_PAGES = 5         # 搜索结果最多翻页数
+MINE_POSTS = False           # True=额外抓取最近微博，从正文里挖联系方式
+POSTS_PAGES = 2              # 每个用户抓取的微博页数
+POSTS_CONCURRENCY = 4        # 微博抓取并发数 (browser 模式下单独使用)
+POSTS_CACHE_FILE = "weibo_posts_cache.json"
+POSTS_CACHE_TTL = 24 * 3600  # 微博联系方式缓存有效期 (秒)
+PROFILE_CACHE_FILE = "weibo_profile_cache.db"  # UID -> userInfo 持久化缓存
+PROFILE_CACHE_TTL = 24 * 3600  # userInfo 缓存有效期 (秒)，0 表示不使用缓存
+PROFILE_CACHE_MAX = 50000      # 缓存最多保留的 UID 数
+RESUME = False                 # True=从上次中断的断点继续 (命令行 --resume)，跳过已翻的搜索页和已写出的 UID
 # ===========================================
 
+MOBILE_UA = "Mozilla/5.0 (iPhone; CPU iPhone OS 13_2_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/13.0.3 Mobile/15E148 Safari/604.1"
+# 离线基准测试时以下地址指向本地 fixture 服务
+SEARCH_URL = "https://s.weibo.com/user"
+MOBILE_HOME = "https://m.weibo.cn"
+GET_INDEX_URL = f"{MOBILE_HOME}/api/container/getIndex"
+# 滑块/安全验证页的特征：被重定向到验证域名，或页面里出现验证提示
+CHALLENGE_URL_MARKERS = ("passport.weibo", "security.weibo", "verify", "captcha")
+CHALLENGE_TEXT_MARKERS = ("验证码", "滑块", "安全验证", "请完成验证")
+
+def is_challenge_page(page, response, content):
+    """浏览器拿到的 getIndex 结果是否为验证页 (而不是普通的空页/错误页)"""
+    if response is not None and response.status in (403, 418):
+        return True
+    if any(marker in page.url for marker in CHALLENGE_URL_MARKERS):
+        return True
+    return any(marker in content for marker in CHALLENGE_TEXT_MARKERS)
+
 # --- 辅助工具 1: 数字转换 ---
 def extract_number(text):
     """提取并转换数字（处理万/亿单位）"""
@@ -30,6 +72,7 @@ def extract_number(text):
         return "0"
 
 # --- 辅助工具 2: 联系方式提取 (核心新增) ---
+@profiled("regex_extract")
 def extract_contacts(text):
     """
     从文本中提取联系方式（手机、座机/热线、微信、QQ）
@@ -82,32 +125,149 @@ def extract_contacts(text):
 
     return contacts
 
-# --- 阶段一：PC模式搜索 ---
-def run_search_phase(browser, keyword):
-    print(f"\n[*] === 阶段一：PC模式搜索关键词 [{keyword}] ===")
+# --- 辅助工具 3: 解析 getIndex 返回的 userInfo ---
+def apply_user_info(user, data_obj):
+    """把 getIndex 接口返回的 userInfo 写入 user 并缓存，返回是否成功"""
+    if data_obj.get('ok') == 1 and 'userInfo' in data_obj.get('data', {}):
+        info = data_obj['data']['userInfo']
+        if PROFILE_CACHE_TTL:
+            get_profile_cache().put(user['uid'], info)
+        fill_user_fields(user, info)
+        return True
+
+    print(f"    [-] API 状态异常: {data_obj.get('msg', 'unknown error')}")
+    user['description'] = "无数据"
+    return False
+
+def fill_user_fields(user, info):
+    """userInfo -> 输出字段 (简介、联系方式、统计数据)"""
+    # 1. 简介原文
+    desc_text = info.get('description', '')
+    user['description'] = desc_text if desc_text else '无简介'
     
-    if os.path.exists(STATE_FILE):
-        context = browser.new_context(storage_state=STATE_FILE)
-    else:
-        context = browser.new_context()
-        
-    page = context.new_page()
-    # 伪造 Referer 绕过部分搜索风控
-    target_url = f"https://s.weibo.com/user?q={keyword}&Refer=weibo_user"
+    # 2. [NEW] 提取联系方式
+    contacts = extract_contacts(desc_text)
+    user['contact_mobile'] = "; ".join(contacts['mobile'])
+    user['contact_landline'] = "; ".join(contacts['landline'])
+    user['contact_wechat'] = "; ".join(contacts['wechat'])
+    user['contact_qq'] = "; ".join(contacts['qq'])
+
+    # 3. 统计数据
+    user['followers_count'] = info.get('followers_count', 0)
+    user['statuses_count'] = info.get('statuses_count', 0)
+    user['verified_reason'] = info.get('verified_reason', '未认证')
     
-    try:
-        page.goto(target_url, wait_until="domcontentloaded")
-        # 等待搜索结果卡片加载
-        page.wait_for_selector("div.card.card-user-b", timeout=8000)
-    except:
-        print("[-] 未找到搜索结果或网络超时。")
-        context.close()
-        return []
+    print(f"    -> [提取] {user['nickname']} 简介长度: {len(user['description'])}")
+    if user['contact_landline'] or user['contact_mobile']:
+        print(f"    -> [发现] 电话: {user['contact_landline']} {user['contact_mobile']}")
+    if user['contact_wechat']:
+        print(f"    -> [发现] 微信: {user['contact_wechat']}")
 
-    cards = page.locator("div.card.card-user-b").all()
-    print(f"[+] 找到 {len(cards)} 个目标，开始解析 UID...")
+# --- 辅助工具 4: UID -> userInfo 持久化缓存 ---
+class ProfileCache:
+    """
+    SQLite 持久化的 userInfo 缓存，记录抓取时间
+    每次写入立即落盘，中途触发滑块也不会丢失已采集的用户；多线程共用一个连接
+    """
 
-    users_list = []
+    def __init__(self, path, ttl=PROFILE_CACHE_TTL, max_entries=PROFILE_CACHE_MAX):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "uid TEXT PRIMARY KEY, user_info TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_fetched_at ON profiles(fetched_at)")
+        self.conn.commit()
+
+    def get(self, uid):
+        """返回未过期的 userInfo，没有或已过期返回 None"""
+        return self.get_many([uid]).get(uid)
+
+    def get_many(self, uids):
+        """批量读取未过期的 userInfo: {uid: userInfo}"""
+        uids = list(uids)
+        found = {}
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            for i in range(0, len(uids), 500):
+                chunk = uids[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT uid, user_info FROM profiles WHERE fetched_at >= ? "
+                    f"AND uid IN ({','.join('?' * len(chunk))})",
+                    [cutoff, *chunk]
+                ).fetchall()
+                found.update((uid, json.loads(info)) for uid, info in rows)
+        return found
+
+    def put(self, uid, info):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO profiles (uid, user_info, fetched_at) VALUES (?, ?, ?)",
+                (uid, json.dumps(info, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+    def evict(self):
+        """删除过期条目，并把条目数压到 max_entries 以内 (先删最旧的)，返回删除数"""
+        with self.lock:
+            removed = self.conn.execute(
+                "DELETE FROM profiles WHERE fetched_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            removed += self.conn.execute(
+                "DELETE FROM profiles WHERE uid IN ("
+                "SELECT uid FROM profiles ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            self.conn.commit()
+        return removed
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_profile_cache = None
+
+def get_profile_cache():
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = ProfileCache(PROFILE_CACHE_FILE)
+    return _profile_cache
+
+def load_cached_profile(user):
+    """命中缓存则直接填充 user 并返回 True"""
+    if not PROFILE_CACHE_TTL:
+        return False
+    info = get_profile_cache().get(user['uid'])
+    if info is None:
+        return False
+    print(f"    -> [缓存] {user['nickname']}")
+    fill_user_fields(user, info)
+    return True
+
+# 在页面内一次性解析全部用户卡片，返回 [{nickname, uid}]
+# UID 提取策略与 parse_cards_with_locators 一致：优先关注按钮，其次昵称链接
+CARD_EXTRACT_JS = """cards => cards.map(card => {
+    const nameEl = card.querySelector('a.name');
+    const actionEl = card.querySelector("a[action-data*='uid=']");
+    let uid = null;
+    if (actionEl) {
+        const m = (actionEl.getAttribute('action-data') || '').match(/uid=(\\d+)/);
+        uid = m ? m[1] : null;
+    } else if (nameEl) {
+        const href = nameEl.getAttribute('href') || '';
+        if (href.includes('/u/')) uid = href.split('/u/')[1].split('?')[0];
+    }
+    return {nickname: nameEl ? nameEl.innerText.trim() : '未知', uid: uid};
+})"""
+
+@profiled("search_parse")
+def parse_cards_with_locators(page):
+    """逐卡片用 locator 解析 (兜底方案，每张卡片多次往返)"""
+    cards = page.locator("div.card.card-user-b").all()
+    parsed = []
     for card in cards:
         user = {}
         try:
@@ -129,50 +289,150 @@ def run_search_phase(browser, keyword):
                     user['uid'] = None
         except:
             user['uid'] = None
+        parsed.append(user)
+    return parsed
 
-        if user['uid']:
-            print(f"    -> 锁定: {user['nickname']} (UID: {user['uid']})")
-            users_list.append(user)
+# --- 阶段一：PC模式搜索 ---
+def iter_search_pages(browser, keyword, ckpt=None):
+    """
+    逐页翻 s.weibo.com/user 的搜索结果，每页产出一批带 UID 的用户
+    指定断点时记录已翻的页和找到的用户；续采时先产出上次找到但未写出的用户，再从下一页接着翻
+    """
+    print(f"\n[*] === 阶段一：PC模式搜索关键词 [{keyword}] ===")
+    seen_uids = set()
+    start_page = 1
+    if ckpt is not None and ckpt.resumed:
+        found = ckpt.get("found", [])
+        seen_uids.update(user['uid'] for user in found)
+        pending = [dict(user) for user in found if not ckpt.is_marked("done", user['uid'])]
+        print(f"[*] 断点: 已翻 {ckpt.get('search_page', 0)} 页，找到 {len(found)} 个，待采集 {len(pending)} 个")
+        if pending:
+            yield pending
+        if ckpt.get("search_done"):
+            return
+        start_page = ckpt.get("search_page", 0) + 1
     
-    context.close() 
+    # 同一账号的浏览器和接口请求固定走同一个出口
+    proxy = proxypool.assign("weibo")
+    if os.path.exists(STATE_FILE):
+        context = browser.new_context(storage_state=STATE_FILE, **proxypool.context_options(proxy))
+    else:
+        context = browser.new_context(**proxypool.context_options(proxy))
+    cassette.attach_har_sync(context, "weibo_search")
+    proxypool.track(context, proxy)
+        
+    page = context.new_page()
+
+    try:
+        for page_no in range(start_page, SEARCH_MAX_PAGES + 1):
+            # 伪造 Referer 绕过部分搜索风控
+            target_url = f"{SEARCH_URL}?q={keyword}&Refer=weibo_user&page={page_no}"
+            
+            try:
+                ratelimit.acquire(target_url, via=proxypool.via(page))
+                with metrics.timer("playwright", collector="weibo", op="goto"), profiling.span("page_load"):
+                    page.goto(target_url, wait_until="domcontentloaded")
+                # 等待搜索结果卡片加载
+                with metrics.timer("playwright", collector="weibo", op="wait_for_selector"), profiling.span("page_load"):
+                    page.wait_for_selector("div.card.card-user-b", timeout=8000)
+            except:
+                if page_no == 1:
+                    print("[-] 未找到搜索结果或网络超时。")
+                else:
+                    print(f"[*] 第 {page_no} 页无结果，搜索结束。")
+                break
+
+            try:
+                # 一次 evaluate 取回所有卡片的昵称和 UID
+                parsed = page.eval_on_selector_all("div.card.card-user-b", CARD_EXTRACT_JS)
+            except Exception as e:
+                print(f"[-] 批量解析失败，回退到逐卡片解析: {e}")
+                parsed = parse_cards_with_locators(page)
+            print(f"[+] 第 {page_no} 页找到 {len(parsed)} 个目标，开始解析 UID...")
+
+            batch = []
+            for user in parsed:
+                if user['uid'] and user['uid'] not in seen_uids:
+                    seen_uids.add(user['uid'])
+                    print(f"    -> 锁定: {user['nickname']} (UID: {user['uid']})")
+                    batch.append(user)
+
+            # 翻到重复页 (超出结果总页数时微博会返回最后一页)
+            if not batch:
+                break
+            if ckpt is not None:
+                # 先记下这一页再交给详情阶段，之后崩溃时由断点里的 found 补回未写出的用户
+                ckpt.extend("found", (dict(user) for user in batch))
+                ckpt.set("search_page", page_no)
+                batch = [user for user in batch if not ckpt.is_marked("done", user['uid'])]
+            if batch:
+                yield batch
+            cassette.sleep(random.uniform(1.0, 2.0))
+        if ckpt is not None:
+            ckpt.set("search_done", True)
+    finally:
+        context.close() 
+
+@profiled("search")
+def run_search_phase(browser, keyword, ckpt=None):
+    users_list = []
+    for batch in iter_search_pages(browser, keyword, ckpt):
+        users_list.extend(batch)
     return users_list
 
 # --- 阶段二：iPhone 模式数据采集 ---
+@profiled("detail")
 def run_mobile_detail_phase(browser, users_list):
     print(f"\n[*] === 阶段二：切换 Mobile Context 深度采集 ===")
+    # 浏览器是最后的兜底通道，这里也被拦时停止本次采集
+    # (只检查不占探测资格，半开时由下面第一个用户的 allow() 做探测)
+    circuit = breaker.get("weibo")
+    if not circuit.available():
+        raise circuit.open_error()
     
     # 模拟 iPhone X 指纹
     iphone_device = {
-        "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_2_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/13.0.3 Mobile/15E148 Safari/604.1",
+        "user_agent": MOBILE_UA,
         "viewport": {"width": 375, "height": 812},
         "device_scale_factor": 3,
         "is_mobile": True,
         "has_touch": True
     }
 
+    proxy = proxypool.assign("weibo")
     if os.path.exists(STATE_FILE):
-        context = browser.new_context(**iphone_device, storage_state=STATE_FILE)
+        context = browser.new_context(**iphone_device, **proxypool.context_options(proxy), storage_state=STATE_FILE)
     else:
-        context = browser.new_context(**iphone_device)
+        context = browser.new_context(**iphone_device, **proxypool.context_options(proxy))
+    cassette.attach_har_sync(context, "weibo_mobile")
+    proxypool.track(context, proxy)
 
     page = context.new_page()
     
     # 预热：访问首页激活 Session
     try:
-        page.goto("https://m.weibo.cn", wait_until="domcontentloaded")
-        time.sleep(1.5)
+        ratelimit.acquire(MOBILE_HOME, via=proxypool.via(page))
+        page.goto(MOBILE_HOME, wait_until="domcontentloaded")
+        cassette.sleep(1.5)
     except:
         pass
 
     for i, user in enumerate(users_list):
         uid = user['uid']
         print(f"[{i+1}/{len(users_list)}] 解析中: {user['nickname']} ...")
+        if load_cached_profile(user):
+            continue
+        if not circuit.allow():
+            context.close()
+            raise circuit.open_error()
         
         # 调用 Mobile API
-        api_url = f"https://m.weibo.cn/api/container/getIndex?type=uid&value={uid}"
+        api_url = f"{GET_INDEX_URL}?type=uid&value={uid}"
         
         try:
-            response = page.goto(api_url)
+            ratelimit.acquire(api_url, via=proxypool.via(page))
+            with metrics.timer("playwright", collector="weibo", op="goto_api"), profiling.span("page_load"):
+                response = page.goto(api_url)
             content = page.locator("body").inner_text()
             
             # 清洗非 JSON 字符
@@ -184,51 +444,287 @@ def run_mobile_detail_phase(browser, users_list):
 
             try:
                 data_obj = json.loads(content)
-            except:
-                print("    [-] JSON 解析失败 (可能触发滑块)")
+            except ValueError:
                 user['description'] = "Error"
+                if is_challenge_page(page, response, content):
+                    print("    [-] 触发滑块验证")
+                    metrics.inc("captchas_total", collector="weibo")
+                    circuit.trip("滑块")
+                else:
+                    # 普通的解析失败 (空页、接口报错) 按一般失败计，连续多次才熔断
+                    print("    [-] JSON 解析失败")
+                    circuit.record_failure("JSON 解析失败")
                 continue
             
-            # 提取字段
-            if data_obj.get('ok') == 1 and 'userInfo' in data_obj.get('data', {}):
-                info = data_obj['data']['userInfo']
-                
-                # 1. 简介原文
-                desc_text = info.get('description', '')
-                user['description'] = desc_text if desc_text else '无简介'
-                
-                # 2. [NEW] 提取联系方式
-                contacts = extract_contacts(desc_text)
-                user['contact_mobile'] = "; ".join(contacts['mobile'])
-                user['contact_landline'] = "; ".join(contacts['landline'])
-                user['contact_wechat'] = "; ".join(contacts['wechat'])
-                user['contact_qq'] = "; ".join(contacts['qq'])
-
-                # 3. 统计数据
-                user['followers_count'] = info.get('followers_count', 0)
-                user['statuses_count'] = info.get('statuses_count', 0)
-                user['verified_reason'] = info.get('verified_reason', '未认证')
-                
-                print(f"    -> [提取] 简介长度: {len(user['description'])}")
-                if user['contact_landline'] or user['contact_mobile']:
-                    print(f"    -> [发现] 电话: {user['contact_landline']} {user['contact_mobile']}")
-                if user['contact_wechat']:
-                    print(f"    -> [发现] 微信: {user['contact_wechat']}")
-
-            else:
-                print(f"    [-] API 状态异常: {data_obj.get('msg', 'unknown error')}")
-                user['description'] = "无数据"
+            circuit.record_success()
+            apply_user_info(user, data_obj)
 
         except Exception as e:
             print(f"    [-] 请求异常: {e}")
             
-        time.sleep(random.uniform(1.2, 2.5)) # 随机延迟
+        cassette.sleep(random.uniform(1.2, 2.5)) # 随机延迟
 
     context.close()
     return users_list
 
+# --- 阶段二 (http 模式)：连接池直连 Mobile API ---
+class SliderChallenge(Exception):
+    """接口返回的不是 JSON，通常是触发了滑块验证"""
+
+def build_http_session(pool_size):
+    """用 state.json 里的 Cookie 构造带连接池的 requests.Session"""
+    session = requests.Session()
+    # 与浏览器阶段、其他进程共用 m.weibo.cn 的令牌桶；配置了代理时与浏览器走同一个出口
+    adapter = proxypool.ProxyAdapter("weibo", pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": MOBILE_UA,
+        "Referer": "https://m.weibo.cn/",
+        "Accept": "application/json, text/plain, */*",
+        "X-Requested-With": "XMLHttpRequest",
+        "MWeibo-Pwa": "1",
+    })
+
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        for cookie in state.get("cookies", []):
+            session.cookies.set(cookie["name"], cookie["value"],
+                                domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return session
+
+@profiled("detail_fetch")
+def fetch_user_index(session, uid):
+    """请求单个 UID 的 getIndex，非 JSON 响应视为滑块"""
+    response = metrics.http_request("weibo", session.get, GET_INDEX_URL, params={"type": "uid", "value": uid}, timeout=15)
+    if response.status_code in (403, 418) or "json" not in response.headers.get("Content-Type", ""):
+        metrics.inc("captchas_total", collector="weibo")
+        raise SliderChallenge(f"HTTP {response.status_code}")
+    try:
+        return response.json()
+    except ValueError:
+        raise SliderChallenge("响应不是 JSON")
+
+def fetch_detail_http(session, user, challenged):
+    """http 模式下采集单个用户，触发滑块的放进 challenged，返回是否已完成"""
+    if load_cached_profile(user):
+        return True
+    # 接口熔断期间不再请求，直接转给浏览器
+    circuit = breaker.get("weibo_api")
+    if not circuit.allow():
+        challenged.append(user)
+        return False
+    # 保留少量随机间隔，避免并发后整体频率过高
+    cassette.sleep(random.uniform(0.3, 0.8))
+    try:
+        data_obj = fetch_user_index(session, user['uid'])
+    except SliderChallenge as e:
+        print(f"    [-] {user['nickname']} 触发验证 ({e})，稍后交给浏览器处理")
+        circuit.trip(f"滑块: {e}")
+        challenged.append(user)
+        return False
+    except requests.exceptions.RequestException as e:
+        print(f"    [-] {user['nickname']} 请求异常: {e}")
+        circuit.record_failure(type(e).__name__)
+        return True
+    circuit.record_success()
+    apply_user_info(user, data_obj)
+    return True
+
+def run_http_detail_phase(browser, users_list):
+    print(f"\n[*] === 阶段二：连接池直连 Mobile API (并发 {HTTP_CONCURRENCY}) ===")
+    session = build_http_session(HTTP_CONCURRENCY)
+    challenged = []
+
+    with ThreadPoolExecutor(max_workers=HTTP_CONCURRENCY) as pool:
+        list(pool.map(lambda user: fetch_detail_http(session, user, challenged), users_list))
+    session.close()
+
+    # 只有被滑块拦下的 UID 才走浏览器
+    if challenged:
+        print(f"[!] {len(challenged)} 个用户触发验证，切换浏览器模式重试...")
+        run_mobile_detail_phase(browser, challenged)
+
+    return users_list
+
+def prefetch_profiles(uids):
+    """
+    批量预取一批已知 UID 的 userInfo 到缓存 (只请求缺失或过期的)
+    返回触发滑块、未能预取的 UID 列表
+    """
+    cache = get_profile_cache()
+    uids = list(dict.fromkeys(uids))
+    missing = [uid for uid in uids if uid not in cache.get_many(uids)]
+    print(f"[*] 预取 userInfo: 共 {len(uids)} 个，缓存命中 {len(uids) - len(missing)} 个")
+    challenged = []
+    if missing:
+        session = build_http_session(HTTP_CONCURRENCY)
+        users = [{'uid': uid, 'nickname': uid} for uid in missing]
+        with ThreadPoolExecutor(max_workers=HTTP_CONCURRENCY) as pool:
+            list(pool.map(lambda user: fetch_detail_http(session, user, challenged), users))
+        session.close()
+    return [user['uid'] for user in challenged]
+
+# --- 阶段三 (可选)：最近微博联系方式挖掘 ---
+def load_json_cache(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_json_cache(path, cache):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+def iter_user_posts(session, uid):
+    """逐页读取用户微博时间线 (containerid=107603+UID)，逐条产出 (微博id, 纯文本)"""
+    for page_no in range(1, POSTS_PAGES + 1):
+        response = metrics.http_request("weibo", session.get, GET_INDEX_URL, params={
+            "type": "uid", "value": uid, "containerid": f"107603{uid}", "page": page_no
+        }, timeout=15)
+        if "json" not in response.headers.get("Content-Type", ""):
+            metrics.inc("captchas_total", collector="weibo")
+            raise SliderChallenge(f"HTTP {response.status_code}")
+        data_obj = response.json()
+        if data_obj.get('ok') != 1:
+            return
+
+        cards = data_obj.get('data', {}).get('cards', [])
+        for card in cards:
+            mblog = card.get('mblog')
+            if card.get('card_type') != 9 or not mblog:
+                continue
+            text = re.sub(r'<[^>]+>', ' ', mblog.get('text', ''))
+            yield mblog.get('id'), text
+        if not cards:
+            return
+        cassette.sleep(random.uniform(0.3, 0.8))
+
+@profiled("posts")
+def mine_user_posts(session, user, cache):
+    """把最近微博逐条送进 extract_contacts，命中的联系方式附带来源微博 id"""
+    uid = user['uid']
+    cached = cache.get(uid)
+    if cached and time.time() - cached.get("fetched_at", 0) < POSTS_CACHE_TTL:
+        user['post_contacts'] = cached['hits']
+        return
+
+    circuit = breaker.get("weibo_api")
+    if not circuit.allow():
+        user['post_contacts'] = []
+        return
+
+    hits = []
+    seen = set()
+    try:
+        for post_id, text in iter_user_posts(session, uid):
+            for c_type, values in extract_contacts(text).items():
+                for value in values:
+                    if (c_type, value) in seen:
+                        continue
+                    seen.add((c_type, value))
+                    hits.append({"type": c_type, "value": value, "post_id": post_id})
+    except (SliderChallenge, requests.exceptions.RequestException, ValueError) as e:
+        print(f"    [-] {user['nickname']} 微博抓取中断: {e}")
+        if isinstance(e, SliderChallenge):
+            circuit.trip(f"滑块: {e}")
+        user['post_contacts'] = hits
+        return
+    circuit.record_success()
+
+    if hits:
+        print(f"    -> [微博] {user['nickname']} 发现 {len(hits)} 条联系方式")
+    cache[uid] = {"fetched_at": time.time(), "hits": hits}
+    user['post_contacts'] = hits
+
+def run_posts_phase(users_list, cache=None):
+    print(f"\n[*] === 阶段三：最近微博联系方式挖掘 (并发 {POSTS_CONCURRENCY}) ===")
+    session = build_http_session(POSTS_CONCURRENCY)
+    own_cache = cache is None
+    if own_cache:
+        cache = load_json_cache(POSTS_CACHE_FILE)
+
+    with ThreadPoolExecutor(max_workers=POSTS_CONCURRENCY) as pool:
+        list(pool.map(lambda user: mine_user_posts(session, user, cache), users_list))
+
+    session.close()
+    if own_cache:
+        save_json_cache(POSTS_CACHE_FILE, cache)
+    return users_list
+
+# --- 搜索与详情流水线 (http 模式) ---
+def run_pipeline(browser, keyword, sink, ckpt=None):
+    """
+    搜索 (生产者) 和详情采集 (消费者) 同时进行:
+    主线程用浏览器翻搜索结果页，把 UID 放进队列；HTTP 线程池边收边采集
+    总耗时约为 max(搜索, 详情)，而不是两者之和；每个用户采集完立即写入 sink，并在断点里记为已完成
+    """
+    print(f"\n[*] === 搜索/详情流水线 (详情并发 {HTTP_CONCURRENCY}) ===")
+    session = build_http_session(HTTP_CONCURRENCY)
+    posts_cache = load_json_cache(POSTS_CACHE_FILE) if MINE_POSTS else None
+    todo = queue.Queue()
+    challenged = []
+    failed = []
+
+    def consumer():
+        while True:
+            user = todo.get()
+            if user is None:
+                return
+            # 单个用户的意外异常只记失败，不能让工作线程退出 (线程全死后队列里的用户不会再被写出)
+            try:
+                if fetch_detail_http(session, user, challenged):
+                    if MINE_POSTS:
+                        mine_user_posts(session, user, posts_cache)
+                    sink.write(user)
+                    if ckpt is not None:
+                        ckpt.mark("done", user['uid'])
+            except Exception as e:
+                print(f"    [-] {user.get('nickname')} 处理失败: {type(e).__name__}: {e}")
+                metrics.inc("errors_total", collector="weibo", kind=type(e).__name__)
+                failed.append(user)
+                if ckpt is not None:
+                    # 未记为已完成，保留断点以便 --resume 重试
+                    ckpt.incomplete(user['uid'])
+
+    workers = [threading.Thread(target=consumer, daemon=True) for _ in range(HTTP_CONCURRENCY)]
+    for t in workers:
+        t.start()
+
+    try:
+        for batch in iter_search_pages(browser, keyword, ckpt):
+            for user in batch:
+                todo.put(user)
+    finally:
+        for _ in workers:
+            todo.put(None)
+        for t in workers:
+            t.join()
+        session.close()
+    if failed:
+        print(f"[!] {len(failed)} 个用户处理失败，未写出")
+
+    # 浏览器只能在主线程使用，滑块用户等搜索结束后统一处理
+    if challenged:
+        print(f"[!] {len(challenged)} 个用户触发验证，切换浏览器模式重试...")
+        try:
+            run_mobile_detail_phase(browser, challenged)
+            if MINE_POSTS:
+                run_posts_phase(challenged, posts_cache)
+        finally:
+            # 浏览器也被熔断时，已有的搜索结果照样写出 (已写出的不再续采，避免结果重复)
+            sink.write_many(challenged)
+            if ckpt is not None:
+                for user in challenged:
+                    ckpt.mark("done", user['uid'])
+    if MINE_POSTS:
+        save_json_cache(POSTS_CACHE_FILE, posts_cache)
+
 # --- 主程序 ---
-def main():
+def main(keyword=KEYWORD, output_file=OUTPUT_FILE):
     with sync_playwright() as p:
         print("[*] 正在初始化引擎...")
         
@@ -252,20 +748,35 @@ def main():
                 print("[-] 登录超时，请重试。")
                 return
 
+        if PROFILE_CACHE_TTL:
+            removed = get_profile_cache().evict()
+            if removed:
+                print(f"[*] 清理过期/超量的 userInfo 缓存: {removed} 条")
+
         # 启动任务
-        browser = p.chromium.launch(headless=HEADLESS)
-        
-        # Step 1: 搜索
-        results = run_search_phase(browser, KEYWORD)
+        browser = p.chromium.launch(headless=HEADLESS, **proxypool.launch_options())
         
-        if results:
-            # Step 2: 详情采集 + 正则提取
-            final_data = run_mobile_detail_phase(browser, results)
-            
-            # Step 3: 保存
-            print(f"\n[*] 写入文件: {OUTPUT_FILE}")
-            with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-                json.dump(final_data, f, ensure_ascii=False, indent=4)
+        # 续采时追加到上次的结果文件；断点落盘前先把已采集的用户刷到结果文件
+        ckpt = checkpoint.start("weibo", keyword, resume=RESUME)
+        with JsonlSink(output_file, batch_size=10, collector="weibo", append=ckpt.resumed) as sink, ckpt:
+            ckpt.before_save = sink.flush
+            if DETAIL_MODE == "http":
+                # Step 1 + 2: 搜索翻页与详情采集并行，结果逐条写入
+                run_pipeline(browser, keyword, sink, ckpt)
+            else:
+                # Step 1: 搜索
+                results = run_search_phase(browser, keyword, ckpt)
+                # Step 2: 详情采集 + 正则提取
+                final_data = run_mobile_detail_phase(browser, results) if results else []
+                # Step 3 (可选): 最近微博联系方式挖掘
+                if final_data and MINE_POSTS:
+                    run_posts_phase(final_data)
+                sink.write_many(final_data)
+                for user in final_data:
+                    ckpt.mark("done", user['uid'])
+
+        if sink.count:
+            print(f"\n[*] 已写入 {sink.count} 个用户: {output_file}")
             print("[=] 任务全部完成。")
         else:
             print("[-] 无任务执行。")
@@ -273,4 +784,9 @@ def main():
         browser.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    RESUME = RESUME or "--resume" in sys.argv[1:]
+    metrics.start_from_env()
+    try:
+        profiling.run(main)
+    except breaker.CircuitOpen as e:
+        print(f"[!] {e}")
\ No newline at end of file
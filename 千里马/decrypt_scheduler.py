@@ -0,0 +1,270 @@
+"""
+千里马手机号解密调度器
+解密一次手机号会消耗一次额度，这里在每次运行的解密预算内按价值给联系人排序，
+优先解密高价值联系人，并记录被跳过的联系人
+"""
+import json
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Iterable, Tuple, Type
+
+# 标题中出现这些词，说明联系人来自与采购/招投标直接相关的项目
+DEFAULT_RELEVANCE_TERMS = ("采购", "招标", "中标", "成交", "项目", "工程", "询价", "竞争性")
+
+
+class DecryptError(Exception):
+    """解密接口没有给出明确结果 (返回码不是 200)；和网络错误、被拦截一样，不能当作 "没有号码" 记下"""
+
+
+def _digits(value: Optional[str]) -> str:
+    """只保留数字，用于号码比对"""
+    return re.sub(r"\D", "", str(value or ""))
+
+
+class DecryptCache:
+    """
+    已解密手机号的缓存 (mobile 哈希 -> 真实号码)
+    命中缓存的哈希不再消耗解密额度；指定 path 时持久化为 JSON 文件
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._data: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+
+    def __contains__(self, mobile_hash: str) -> bool:
+        return mobile_hash in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, mobile_hash: str) -> Optional[str]:
+        return self._data.get(mobile_hash)
+
+    def put(self, mobile_hash: str, mobile: str):
+        self._data[mobile_hash] = mobile
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class DecryptPlan:
+    """一次调度的结果"""
+    selected: List[Dict[str, Any]] = field(default_factory=list)   # 需要花费额度解密的联系人
+    cached: List[Dict[str, Any]] = field(default_factory=list)     # 命中缓存、无需花费额度
+    skipped: List[Dict[str, Any]] = field(default_factory=list)    # 跳过的联系人及原因 (含解密失败的)
+    budget: Optional[int] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "selected": len(self.selected),
+            "cache_hits": len(self.cached),
+            "skipped": len(self.skipped),
+        }
+
+
+class DecryptScheduler:
+    """
+    在解密预算内给联系人排序
+
+    排序信号均来自接口已有数据:
+        - count: 联系人在招投标公告中出现的次数，越多越活跃
+        - title: 来源公告标题与采购相关的程度
+        - 是否已缓存: 已缓存的直接使用，不占预算
+        - 是否与企业注册电话 phoneNumber 重复: 重复号码价值低，排到最后
+
+    预算中 (1 - explore_ratio) 分配给得分最高的联系人，
+    剩余部分均匀抽取排名靠后的联系人，避免只看 count 导致线索单一
+    """
+
+    def __init__(self,
+                 budget: Optional[int] = None,
+                 cache: Optional[DecryptCache] = None,
+                 company_phone: Optional[str] = None,
+                 relevance_terms: Iterable[str] = DEFAULT_RELEVANCE_TERMS,
+                 explore_ratio: float = 0.2):
+        """
+        Args:
+            budget: 本次运行的解密额度，None 表示不限
+            cache: 已解密号码缓存
+            company_phone: 企业注册电话，用于识别重复号码
+            relevance_terms: 标题相关度关键词
+            explore_ratio: 预算中用于探索低排名联系人的比例
+        """
+        self.budget = budget
+        self.cache = cache if cache is not None else DecryptCache()
+        self.company_phone = _digits(company_phone)
+        self.relevance_terms = tuple(relevance_terms)
+        self.explore_ratio = min(max(explore_ratio, 0.0), 1.0)
+
+    def is_company_duplicate(self, contact: Dict[str, Any]) -> bool:
+        """联系人号码是否与企业注册电话重复"""
+        if not self.company_phone:
+            return False
+        if _digits(contact.get("phone")) == self.company_phone:
+            return True
+
+        # tuoMinMobile 形如 138****5678，按前三位和后四位比对
+        masked = str(contact.get("tuoMinMobile") or "")
+        if len(self.company_phone) == 11 and len(masked) == 11:
+            return masked[:3] == self.company_phone[:3] and masked[-4:] == self.company_phone[-4:]
+        return False
+
+    def score(self, contact: Dict[str, Any]) -> float:
+        """联系人价值评分"""
+        count = int(contact.get("count") or 0)
+        title = contact.get("title") or ""
+        relevance = sum(1 for term in self.relevance_terms if term in title)
+
+        value = math.log1p(count) + 0.5 * min(relevance, 4)
+        if contact.get("linkMan"):
+            value += 0.3
+        if self.is_company_duplicate(contact):
+            value -= 10
+        return round(value, 3)
+
+    def plan(self, contacts: List[Dict[str, Any]]) -> DecryptPlan:
+        """
+        生成解密计划
+
+        Args:
+            contacts: 原始联系人列表 (contacts/list 接口的 dataList)
+
+        Returns:
+            DecryptPlan
+        """
+        plan = DecryptPlan(budget=self.budget)
+        candidates = []
+        seen_hashes = set()
+
+        for contact in contacts:
+            mobile_hash = contact.get("mobile")
+            if not mobile_hash:
+                continue
+            if mobile_hash in self.cache:
+                plan.cached.append(contact)
+                continue
+            if mobile_hash in seen_hashes:
+                # 同一哈希只解密一次，结果共享
+                continue
+            seen_hashes.add(mobile_hash)
+            candidates.append((self.score(contact), contact))
+
+        # 稳定排序: 同分时保持接口原有顺序
+        candidates.sort(key=lambda pair: -pair[0])
+
+        if self.budget is None or self.budget >= len(candidates):
+            plan.selected = [contact for _, contact in candidates]
+            return plan
+
+        budget = max(self.budget, 0)
+        explore = int(budget * self.explore_ratio)
+        exploit = budget - explore
+
+        chosen = set(range(exploit))
+        # 探索只在非重复号码里抽样；得分为 0 的联系人 (无出现次数、无标题) 同样参与
+        rest = [idx for idx in range(exploit, len(candidates))
+                if not self.is_company_duplicate(candidates[idx][1])]
+        explore = min(explore, len(rest))
+        if explore:
+            step = len(rest) / explore
+            chosen.update(rest[int((i + 0.5) * step)] for i in range(explore))
+        # 可抽样的联系人不够时，剩余的探索名额按得分顺序补给排名靠前的部分，预算用满
+        for idx in range(exploit, len(candidates)):
+            if len(chosen) >= budget:
+                break
+            chosen.add(idx)
+
+        for idx, (score, contact) in enumerate(candidates):
+            if idx in chosen:
+                plan.selected.append(contact)
+            else:
+                plan.skipped.append({
+                    "name": contact.get("linkMan"),
+                    "title": contact.get("title"),
+                    "mobile": contact.get("mobile"),
+                    "tuoMinMobile": contact.get("tuoMinMobile"),
+                    "score": score,
+                    "reason": "duplicate_company_phone" if self.is_company_duplicate(contact) else "budget_exhausted",
+                })
+        return plan
+
+    def execute(self, plan: DecryptPlan, decrypt: Callable[[str], Optional[str]],
+                fatal: Tuple[Type[BaseException], ...] = ()) -> Dict[str, str]:
+        """
+        按计划解密，并把结果写入缓存；每解出一个号码就落盘，中途崩溃不丢已付费的结果
+
+        Args:
+            plan: plan() 的返回值
+            decrypt: 解密函数，入参为 mobile 哈希，返回真实号码；接口明确答复没有号码时返回 None，
+                     请求失败 (网络错误、被拦截、接口报错) 时抛异常
+            fatal: 需要上抛的异常 (被拦截、熔断，后面的哈希也解不了)；其余异常只跳过当前哈希，
+                   记入 plan.skipped (reason=decrypt_failed)，下次运行重试
+
+        Returns:
+            mobile 哈希 -> 真实号码
+        """
+        resolved = {}
+        for contact in plan.cached:
+            resolved[contact["mobile"]] = self.cache.get(contact["mobile"])
+
+        for contact in plan.selected:
+            mobile_hash = contact["mobile"]
+            try:
+                mobile = decrypt(mobile_hash)
+            except fatal:
+                raise
+            except Exception as e:
+                plan.skipped.append({
+                    "name": contact.get("linkMan"),
+                    "title": contact.get("title"),
+                    "mobile": mobile_hash,
+                    "tuoMinMobile": contact.get("tuoMinMobile"),
+                    "reason": "decrypt_failed",
+                    "error": f"{type(e).__name__}: {e}",
+                })
+                continue
+            if mobile:
+                resolved[mobile_hash] = mobile
+                self.cache.put(mobile_hash, mobile)
+                self.cache.save()
+
+        return resolved
+
+
+def checkpointed_decrypt(decrypt: Callable[[str], Optional[str]], checkpoint, field: str = "decrypted") -> Callable[[str], Optional[str]]:
+    """
+    包装解密函数，配合断点续采 (osint_common.checkpoint) 使用
+    每次解密的结果 (包括接口答复没有号码的) 立即记入断点；续采时同一个哈希直接返回上次的结果，
+    不再重复消耗额度。联系人不变时 plan() 的结果不变，续采会沿着同一个计划继续
+
+    decrypt 抛出的异常原样上抛且不记录，该哈希下次运行 (或续采) 时重新解密
+    """
+    attempted = checkpoint.get(field)
+    if attempted is None:
+        attempted = {}
+        checkpoint.set(field, attempted)
+
+    def wrapper(mobile_hash: str) -> Optional[str]:
+        if mobile_hash in attempted:
+            return attempted[mobile_hash]
+        mobile = decrypt(mobile_hash)
+        attempted[mobile_hash] = mobile
+        checkpoint.changed()
+        return mobile
+
+    return wrapper
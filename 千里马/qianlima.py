@@ -1,11 +1,25 @@
 from typing import Optional, List, Dict, Any
-import requests
 import math
 import json
 from datetime import datetime
 from dataclasses import dataclass
 import time
 import re
+import os
+import sys
+import contextlib
+
+from decrypt_scheduler import DecryptCache, DecryptError, DecryptScheduler, checkpointed_decrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from osint_common import breaker, cassette, checkpoint, metrics, profiling, proxypool
+from osint_common.profiling import profiled
+from osint_common.sink import JsonlSink
+
+cassette.install_from_env()
+
+# 接口请求共用一个连接池；连接池负责限速，配置了代理时按出口分配
+_http = proxypool.session("qianlima")
 
 # ================= 配置区域 =================
 try:
@@ -23,6 +37,13 @@ class Config:
     _general = get_general_settings()
     REQUEST_TIMEOUT = _general.get("request_timeout", 30)
     USER_AGENT = _general.get("user_agent", "Mozilla/5.0")
+    # 联系人列表接口不扣额度，可以多翻几页；解密才扣额度，由 DECRYPT_BUDGET 控制
+    MAX_CONTACT_PAGES = _general.get("qianlima_max_contact_pages", 10)
+    DECRYPT_BUDGET = _general.get("qianlima_decrypt_budget", 60)
+    DECRYPT_CACHE_FILE = _general.get("qianlima_decrypt_cache_file", "qianlima_decrypt_cache.json")
+    OUTPUT_FILE = _general.get("qianlima_output_file", "qianlima_osint_data.jsonl")
+    # True=从断点继续 (命令行 --resume)：已翻的联系人页和已解密的哈希不再请求
+    RESUME = False
 
 # ================= 验证函数 (保持不变) =================
 def validate_company_search(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -76,20 +97,30 @@ def get_user_input(input_data) -> str:
     elif hasattr(input_data, 'text'): return getattr(input_data, 'text', '').strip()
     else: return str(input_data).strip()
 
-def make_request(url: str) -> Optional[Dict[str, Any]]:
+def make_request(url: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+    """raise_errors=True 时请求失败 (网络错误、被拦截、HTTP 错误) 直接抛出，而不是返回 None"""
+    circuit = breaker.get("qianlima")
+    # 熔断中抛出 CircuitOpen，不走下面的 "请求错误 -> None"
+    circuit.check()
     try:
-        response = requests.get(
-            url,
+        response = metrics.http_request(
+            "qianlima", _http.get, url,
             headers={'User-Agent': Config.USER_AGENT, 'x-auth-token': Config.XAuthToken},
             timeout=Config.REQUEST_TIMEOUT
         )
+        if response.status_code in (403, 429):
+            circuit.trip(f"HTTP {response.status_code}")
         response.raise_for_status()
+        circuit.record_success()
         return response.json()
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"请求错误: {e}")
         return None
 
 # ================= 业务逻辑 =================
+@profiled("search")
 def do_search(_keyword: str) -> Optional[Dict[str, Any]]:
     url = f'https://search.vip.qianlima.com/rest/enterprise/enterprise/companySearch?keyword={_keyword}&_={int(time.time() * 1000)}'
     ret_json = make_request(url)
@@ -106,35 +137,60 @@ def get_contracts(company_id: str, page_no: int = 1, page_size: int = 20) -> Opt
         return validate_contract_list(data)
     return None
 
-def get_all_contracts(company_id: str, total_contacts: int, page_size: int = 20) -> List[Dict[str, Any]]:
+@profiled("contacts")
+def get_all_contracts(company_id: str, total_contacts: int, page_size: int = 20, ckpt=None) -> List[Dict[str, Any]]:
     all_contracts = []
     total_pages = math.ceil(total_contacts / page_size)
-    max_pages_limit = 3 
+    max_pages_limit = Config.MAX_CONTACT_PAGES
     actual_pages = min(total_pages, max_pages_limit)
+    # 页码 -> dataList；只记成功的页，失败的页续采时重新请求
+    pages = ckpt.get("pages", {}) if ckpt is not None else {}
     
     for page_no in range(1, actual_pages + 1):
-        contract_list = get_contracts(company_id, page_no, page_size)
-        if contract_list and contract_list.get('dataList'):
-            all_contracts.extend(contract_list['dataList'])
+        data_list = pages.get(str(page_no))
+        if data_list is None:
+            contract_list = get_contracts(company_id, page_no, page_size)
+            data_list = contract_list.get('dataList') if contract_list else None
+            if data_list and ckpt is not None:
+                pages[str(page_no)] = data_list
+                ckpt.set("pages", pages)
+        if data_list:
+            all_contracts.extend(data_list)
     return all_contracts
 
 def get_real_phone(mobile_hash: str) -> Optional[Dict[str, Any]]:
     url = f'https://search.vip.qianlima.com/rest/enterprise/virtual/phone/bind/{mobile_hash}'
-    ret_json = make_request(url)
-    if ret_json and ret_json.get('code', 0) == 200:
-        return validate_real_phone(ret_json.get('data', {}))
+    # 解密结果会记入断点，只有接口明确答复 (code 200) 才返回，其余情况抛异常以便续采时重试
+    ret_json = make_request(url, raise_errors=True) or {}
+    if ret_json.get('code', 0) != 200:
+        raise DecryptError(f"解密接口返回 code={ret_json.get('code')}: {ret_json.get('msg', '')}")
+    return validate_real_phone(ret_json.get('data') or {})
+
+@profiled("decrypt")
+def decrypt_mobile(mobile_hash: str) -> Optional[str]:
+    real_phone = get_real_phone(mobile_hash)
+    if real_phone and real_phone.get('vmMobile'):
+        return real_phone['vmMobile']
     return None
 
-def process_company_data(company: Dict[str, Any]) -> Dict[str, Any]:
-    all_contracts = get_all_contracts(company['companyNameEncrypt'], company['companyContacts'])
+@profiled("process")
+def process_company_data(company: Dict[str, Any], ckpt=None) -> Dict[str, Any]:
+    all_contracts = get_all_contracts(company['companyNameEncrypt'], company['companyContacts'], ckpt=ckpt)
     contacts = []
+
+    # 按价值排序后在额度内解密，未解密的记录在 decrypt_skipped
+    scheduler = DecryptScheduler(
+        budget=Config.DECRYPT_BUDGET,
+        cache=DecryptCache(Config.DECRYPT_CACHE_FILE),
+        company_phone=company.get('phoneNumber')
+    )
+    plan = scheduler.plan(all_contracts)
+    decrypt = checkpointed_decrypt(decrypt_mobile, ckpt) if ckpt is not None else decrypt_mobile
+    # 单个哈希解密失败只跳过它，被拦截/熔断时上抛
+    decrypted = scheduler.execute(plan, decrypt, fatal=(breaker.CircuitOpen,))
     
     for contract in all_contracts:
-        decrypted_mobile = None
-        if contract.get('mobile'):
-            real_phone = get_real_phone(contract['mobile'])
-            if real_phone and real_phone.get('vmMobile'):
-                decrypted_mobile = real_phone['vmMobile']
+        decrypted_mobile = decrypted.get(contract.get('mobile'))
         
         contacts.append({
             'name': contract.get('linkMan', '未知'),
@@ -154,10 +210,13 @@ def process_company_data(company: Dict[str, Any]) -> Dict[str, Any]:
         # [关键修复] 将原始的统计总数透传出来
         'total_contacts_raw': company.get('companyContacts', 0),
         
-        'contacts': contacts
+        'contacts': contacts,
+        'decrypt_summary': plan.summary(),
+        'decrypt_skipped': plan.skipped
     }
 
 # ================= 格式转换 =================
+@profiled("transform")
 def transform_to_osint_json(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     转换为 OSINT 标准格式 V3
@@ -224,12 +283,15 @@ def transform_to_osint_json(data: Dict[str, Any]) -> Dict[str, Any]:
         "total_contacts_count": raw_count,
         
         "verified_reason": f"企业认证: {data.get('reg_status', '')}",
-        "details_raw": data.get('contacts', [])
+        "details_raw": data.get('contacts', []),
+        "decrypt_summary": data.get('decrypt_summary', {}),
+        "decrypt_skipped": data.get('decrypt_skipped', [])
     }
 
 # ================= 主程序 =================
 def local_main():
     print("=== 企业 OSINT 信息采集工具 V3 ===")
+    metrics.start_from_env()
     user_text = input("请输入要查询的公司名称: ").strip()
     if not user_text: return
 
@@ -241,12 +303,20 @@ def local_main():
         return
 
     print("[*] 正在解析联系人与解密手机号...")
-    processed_data = process_company_data(company)
+    # 解密会扣额度，每解密一个就落盘一次
+    with checkpoint.start("qianlima", user_text, resume=Config.RESUME, save_every=1) as ckpt:
+        processed_data = process_company_data(company, ckpt)
     
     final_json = transform_to_osint_json(processed_data)
+
+    # 追加写入 JSONL，多次查询的结果累积在同一个文件里
+    with JsonlSink(Config.OUTPUT_FILE, batch_size=1, append=True, collector="qianlima") as sink:
+        sink.write(final_json)
     
-    print("\n" + "="*20 + " 采集结果 (JSON) " + "="*20)
-    print(json.dumps(final_json, ensure_ascii=False, indent=4))
+    print("\n" + "="*20 + " 采集结果 " + "="*20)
+    print(f"企业: {final_json['nickname']}")
+    print(f"手机: {final_json['contact_mobile'] or '无'}")
+    print(f"已保存至: {Config.OUTPUT_FILE}")
     print("="*60)
 
 def handler(event):
@@ -257,11 +327,23 @@ def handler(event):
         company = do_search(keyword)
         if not company: return {"error": "未找到公司"}
         
-        processed_data = process_company_data(company)
+        if checkpoint.enabled(Config.RESUME):
+            progress = checkpoint.start("qianlima", keyword, resume=Config.RESUME, save_every=1)
+        else:
+            progress = contextlib.nullcontext()
+        with progress as ckpt:
+            processed_data = process_company_data(company, ckpt)
         return transform_to_osint_json(processed_data)
         
+    except breaker.CircuitOpen:
+        # 交给调用方 (编排器/任务队列) 换会话或稍后重试
+        raise
     except Exception as e:
         return {"error": str(e)}
 
 if __name__ == '__main__':
-    local_main()
\ No newline at end of file
+    Config.RESUME = Config.RESUME or "--resume" in sys.argv[1:]
+    try:
+        profiling.run(local_main)
+    except breaker.CircuitOpen as e:
+        print(f"[!] {e}")
\ No newline at end of file
@@ -2,6 +2,7 @@
 千里马信息收集插件
 集成千里马招标网API，收集企业招投标信息、联系人数据等
 """
+import contextlib
 import requests
 import time
 import math
@@ -13,6 +14,22 @@ import random
 from app.core.base_collector import BaseCollector
 from app.exceptions import AntiSpiderException, CollectorException, DataValidationException
 
+try:
+    from .decrypt_scheduler import DecryptCache, DecryptScheduler, DEFAULT_RELEVANCE_TERMS, checkpointed_decrypt
+except ImportError:
+    from decrypt_scheduler import DecryptCache, DecryptScheduler, DEFAULT_RELEVANCE_TERMS, checkpointed_decrypt
+
+try:
+    # 与独立脚本一起部署时接入共享指标、剖析、录制回放和断点续采；单独作为插件运行时不启用
+    from osint_common import breaker, cassette, checkpoint, metrics, proxypool
+    from osint_common.profiling import profiled
+    cassette.install_from_env()
+except ImportError:
+    breaker = cassette = checkpoint = metrics = proxypool = None
+
+    def profiled(stage):
+        return lambda fn: fn
+
 
 class QianlimaCollector(BaseCollector):
     """
@@ -30,6 +47,12 @@ class QianlimaCollector(BaseCollector):
                 - timeout: 请求超时时间 (秒)
                 - mock_mode: 是否使用Mock模式
                 - user_agent: 用户代理字符串
+                - decrypt_budget: 单次运行的手机号解密额度 (None 表示不限)
+                - decrypt_cache_file: 已解密号码缓存文件路径
+                - decrypt_explore_ratio: 解密额度中分给低排名联系人的比例
+                - relevance_terms: 判断公告标题相关度的关键词
+                - resume: 是否从上次中断的断点继续 (已翻的联系人页和已解密的哈希不再请求)
+                  不续采且没有设置 OSINT_CHECKPOINT_DIR 时不写断点
         """
         super().__init__(config)
         self.version = "1.0.0"
@@ -40,6 +63,11 @@ class QianlimaCollector(BaseCollector):
         self.timeout = self.config.get("timeout", 30)
         self.mock_mode = self.config.get("mock_mode", False)
         self.user_agent = self.config.get("user_agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        self.decrypt_budget = self.config.get("decrypt_budget")
+        self.decrypt_explore_ratio = self.config.get("decrypt_explore_ratio", 0.2)
+        self.relevance_terms = self.config.get("relevance_terms", DEFAULT_RELEVANCE_TERMS)
+        self.decrypt_cache = DecryptCache(self.config.get("decrypt_cache_file"))
+        self.resume = self.config.get("resume", False)
 
         # API基础URL
         self.base_urls = {
@@ -48,6 +76,9 @@ class QianlimaCollector(BaseCollector):
             "decrypt_phone": "https://search.vip.qianlima.com/rest/enterprise/virtual/phone/bind"
         }
 
+        # 与独立脚本共用时走带限速/代理池的连接池，单独运行时直接用 requests
+        self.http = proxypool.session("qianlima") if proxypool is not None else requests
+
         # 请求头
         self.headers = {
             "User-Agent": self.user_agent,
@@ -96,14 +127,25 @@ class QianlimaCollector(BaseCollector):
         if not company_info:
             raise CollectorException(f"未找到公司: {target_name}")
 
-        # 2. 获取联系人信息
-        contacts = self._get_all_contacts(company_info["companyNameEncrypt"], company_info["companyContacts"])
+        # 翻页和解密的进度记入断点，中途被拦截或崩溃后可以续采 (解密扣额度，每次都落盘)
+        if checkpoint is not None and checkpoint.enabled(self.resume):
+            progress = checkpoint.start("qianlima_collector", target_name, resume=self.resume, save_every=1)
+        else:
+            progress = contextlib.nullcontext()
 
-        # 3. 构建标准化的目标数据
-        target_data = self._build_target_data(company_info)
+        with progress as ckpt:
+            # 2. 获取联系人信息
+            contacts = self._get_all_contacts(company_info["companyNameEncrypt"], company_info["companyContacts"],
+                                              ckpt=ckpt)
 
-        # 4. 标准化联系人数据
-        persons_data = self._standardize_contacts(contacts)
+            # 3. 构建标准化的目标数据
+            target_data = self._build_target_data(company_info)
+
+            # 4. 在解密额度内按价值解密手机号
+            decrypted, decrypt_plan = self._decrypt_contacts(contacts, company_info.get("phoneNumber"), ckpt=ckpt)
+
+        # 5. 标准化联系人数据
+        persons_data = self._standardize_contacts(contacts, decrypted)
 
         return self.get_standard_response(
             success=True,
@@ -113,10 +155,13 @@ class QianlimaCollector(BaseCollector):
                 "data_source": "qianlima_api",
                 "collection_mode": "API",
                 "raw_company_info": company_info,
+                "decrypt_summary": decrypt_plan.summary(),
+                "decrypt_skipped": decrypt_plan.skipped,
                 "reliability": 0.9
             }
         )
 
+    @profiled("search")
     def _search_company(self, keyword: str) -> Optional[Dict[str, Any]]:
         """
         搜索公司信息
@@ -134,6 +179,9 @@ class QianlimaCollector(BaseCollector):
             if response and response.get("code") == 200:
                 return response.get("data", {})
             return None
+        except AntiSpiderException:
+            # 被拦截 (含熔断) 需要上抛，由 run() 交给编排器/队列换会话重试
+            raise
         except Exception as e:
             self.log(f"搜索公司失败: {str(e)}", level="ERROR")
             return None
@@ -161,11 +209,15 @@ class QianlimaCollector(BaseCollector):
                     data["totalCount"] = len(data.get("dataList", []))
                 return data
             return None
+        except AntiSpiderException:
+            raise
         except Exception as e:
             self.log(f"获取联系人失败: {str(e)}", level="ERROR")
             return None
 
-    def _get_all_contacts(self, company_id: str, total_contacts: int, page_size: int = 20) -> List[Dict[str, Any]]:
+    @profiled("contacts")
+    def _get_all_contacts(self, company_id: str, total_contacts: int, page_size: int = 20,
+                          ckpt=None) -> List[Dict[str, Any]]:
         """
         获取所有页的联系人信息
 
@@ -173,20 +225,31 @@ class QianlimaCollector(BaseCollector):
             company_id: 公司ID
             total_contacts: 联系人总数
             page_size: 每页大小
+            ckpt: 断点 (可选)，记录已成功获取的页
 
         Returns:
             完整的联系人列表
         """
         all_contacts = []
         total_pages = math.ceil(total_contacts / page_size)
+        pages = ckpt.get("pages", {}) if ckpt is not None else {}
 
         for page_no in range(1, total_pages + 1):
+            data_list = pages.get(str(page_no))
+            if data_list is not None:
+                all_contacts.extend(data_list)
+                continue
+
             self.log(f"正在获取第 {page_no}/{total_pages} 页联系人...")
             contacts_page = self._get_contacts(company_id, page_no, page_size)
 
             if contacts_page and contacts_page.get("dataList"):
                 all_contacts.extend(contacts_page["dataList"])
-                time.sleep(0.5)  # 避免请求过快
+                if ckpt is not None:
+                    pages[str(page_no)] = contacts_page["dataList"]
+                    ckpt.set("pages", pages)
+                if cassette is None or not cassette.replaying():
+                    time.sleep(0.5)  # 避免请求过快
 
         return all_contacts
 
@@ -198,19 +261,50 @@ class QianlimaCollector(BaseCollector):
             mobile_hash: 加密的电话号码哈希
 
         Returns:
-            解密后的电话号码或None
+            解密后的电话号码，接口答复没有号码时为 None
+
+        Raises:
+            AntiSpiderException: 遇到反爬虫
+            CollectorException: 请求失败或接口报错；结果会记入断点，不能当作没有号码
         """
         url = f"{self.base_urls['decrypt_phone']}/{mobile_hash}"
 
-        try:
-            response = self._make_request(url)
-            if response and response.get("code") == 200:
-                data = response.get("data", {})
-                return data.get("vmMobile")
-            return None
-        except Exception as e:
-            self.log(f"解密电话失败: {str(e)}", level="WARNING")
-            return None
+        response = self._make_request(url)
+        if not response or response.get("code") != 200:
+            code = response.get("code") if response else None
+            raise CollectorException(f"解密电话失败，接口返回 code={code}")
+        return (response.get("data") or {}).get("vmMobile")
+
+    @profiled("decrypt")
+    def _decrypt_contacts(self, contacts: List[Dict[str, Any]], company_phone: Optional[str] = None, ckpt=None):
+        """
+        在解密额度内按价值排序并解密联系人手机号
+
+        Args:
+            contacts: 原始联系人数据
+            company_phone: 企业注册电话，用于识别重复号码
+            ckpt: 断点 (可选)，已尝试过的哈希不再消耗额度
+
+        Returns:
+            (mobile哈希 -> 解密号码, DecryptPlan)
+        """
+        scheduler = DecryptScheduler(
+            budget=self.decrypt_budget,
+            cache=self.decrypt_cache,
+            company_phone=company_phone,
+            relevance_terms=self.relevance_terms,
+            explore_ratio=self.decrypt_explore_ratio
+        )
+        plan = scheduler.plan(contacts)
+        self.log(f"解密计划: 额度 {plan.budget}, 解密 {len(plan.selected)} 个, "
+                 f"缓存命中 {len(plan.cached)} 个, 跳过 {len(plan.skipped)} 个")
+        decrypt = checkpointed_decrypt(self._decrypt_phone, ckpt) if ckpt is not None else self._decrypt_phone
+        # 单个哈希解密失败只跳过它 (记入 plan.skipped)，被拦截时上抛
+        decrypted = scheduler.execute(plan, decrypt, fatal=(AntiSpiderException,))
+        failed = [item for item in plan.skipped if item["reason"] == "decrypt_failed"]
+        if failed:
+            self.log(f"{len(failed)} 个号码解密失败，已跳过", level="WARNING")
+        return decrypted, plan
 
     def _make_request(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -226,18 +320,30 @@ class QianlimaCollector(BaseCollector):
             AntiSpiderException: 遇到反爬虫
             CollectorException: 请求失败
         """
+        # 被拦截后冷却期内不再请求，避免继续消耗 Token 额度
+        circuit = breaker.get("qianlima") if breaker is not None else None
+        if circuit is not None and not circuit.allow():
+            raise AntiSpiderException(str(circuit.open_error()))
+
         try:
             self.log(f"请求URL: {url}")
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            if metrics is not None:
+                response = metrics.http_request("qianlima", self.http.get, url, headers=self.headers, timeout=self.timeout)
+            else:
+                response = self.http.get(url, headers=self.headers, timeout=self.timeout)
 
             # 检查反爬虫
-            if response.status_code == 403:
-                raise AntiSpiderException("访问被拒绝，可能触发反爬虫")
-            elif response.status_code == 429:
+            if response.status_code in (403, 429):
+                if circuit is not None:
+                    circuit.trip(f"HTTP {response.status_code}")
+                if response.status_code == 403:
+                    raise AntiSpiderException("访问被拒绝，可能触发反爬虫")
                 raise AntiSpiderException("请求频率过高，已被限流")
             elif response.status_code != 200:
                 raise CollectorException(f"请求失败，状态码: {response.status_code}")
 
+            if circuit is not None:
+                circuit.record_success()
             return response.json()
 
         except requests.exceptions.Timeout:
@@ -275,7 +381,8 @@ class QianlimaCollector(BaseCollector):
         target_data = self._build_target_data(mock_company_info)
 
         # 标准化联系人数据
-        persons_data = self._standardize_contacts(mock_contacts)
+        decrypted, decrypt_plan = self._decrypt_contacts(mock_contacts, mock_company_info["phoneNumber"])
+        persons_data = self._standardize_contacts(mock_contacts, decrypted)
 
         return self.get_standard_response(
             success=True,
@@ -285,6 +392,8 @@ class QianlimaCollector(BaseCollector):
                 "data_source": "mock",
                 "collection_mode": "MOCK",
                 "raw_company_info": mock_company_info,
+                "decrypt_summary": decrypt_plan.summary(),
+                "decrypt_skipped": decrypt_plan.skipped,
                 "reliability": 0.5
             }
         )
@@ -324,23 +433,25 @@ class QianlimaCollector(BaseCollector):
 
         return target_data
 
-    def _standardize_contacts(self, contacts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @profiled("standardize")
+    def _standardize_contacts(self, contacts: List[Dict[str, Any]],
+                              decrypted: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
         """
         标准化联系人数据
 
         Args:
             contacts: 原始联系人数据
+            decrypted: mobile哈希 -> 解密号码 (由 _decrypt_contacts 生成)
 
         Returns:
             标准化的联系人列表
         """
         persons = []
+        decrypted = decrypted or {}
 
         for contact in contacts:
-            # 尝试解密手机号
-            decrypted_mobile = None
-            if contact.get("mobile"):
-                decrypted_mobile = self._decrypt_phone(contact["mobile"])
+            # 未在解密计划内的联系人保持为 None
+            decrypted_mobile = decrypted.get(contact.get("mobile"))
 
             person = {
                 "name": contact.get("linkMan", "未知"),
@@ -4,6 +4,16 @@ import os
 import sys
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from osint_common import cassette, metrics, profiling, proxypool
+from osint_common.profiling import profiled
+from osint_common.sink import JsonlSink
+
+cassette.install_from_env()
+
+# 接口请求共用一个连接池；连接池负责限速，配置了代理时按出口分配
+_http = proxypool.session("tianyancha")
+
 # --- 0. 配置加载 (模拟生产环境配置) ---
 try:
     # 尝试从你的项目中导入配置，如果不存在则使用默认值
@@ -17,6 +27,7 @@ except ImportError:
 
 # --- 1. 全局辅助函数 ---
 
+@profiled("api_request")
 def fetch_api_data(url, params, headers, timeout=30):
     """
     发起API请求的通用封装。
@@ -25,7 +36,7 @@ def fetch_api_data(url, params, headers, timeout=30):
         # 简单打印日志，实际生产中建议使用 logging 模块
         print(f"  [API请求] {url} | 参数: {params.get('pageNum', 1)}")
         
-        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+        response = metrics.http_request("tianyancha", _http.get, url, params=params, headers=headers, timeout=timeout)
         response.raise_for_status()
         
         data = response.json()
@@ -120,7 +131,7 @@ def handler(args):
             if page_data.get("error_code") == 0 and page_data.get("result"):
                 new_items = page_data["result"].get("pageBean", {}).get("result", [])
                 all_suppliers.extend(new_items)
-            time.sleep(0.5) # 礼貌性延时，防止触发风控
+            cassette.sleep(0.5) # 礼貌性延时，防止触发风控
 
         first_page["result"]["pageBean"]["result"] = all_suppliers
         first_page["result"]["pageBean"]["fetched_count"] = len(all_suppliers)
@@ -156,6 +167,7 @@ if __name__ == "__main__":
     # 请替换为你真实的天眼查 Token，否则接口会报错 
     # (注意：这是示例Token，实际不可用)
     MY_TOKEN = "284a8d48-f624-48e2-9a76-362d8d7331b9" 
+    metrics.start_from_env()
     
     # 检查命令行参数
     if len(sys.argv) < 2:
@@ -178,7 +190,7 @@ if __name__ == "__main__":
     # 执行核心逻辑
     try:
         args = MockArgs(MY_TOKEN, target_company)
-        result_data = handler(args)
+        result_data = profiling.run(lambda: handler(args))
         
         # --- 文件保存逻辑 ---
         
@@ -187,16 +199,16 @@ if __name__ == "__main__":
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             
-        # 2. 生成文件名 (公司名_时间戳.json)
+        # 2. 生成文件名 (公司名_时间戳.jsonl)
         # 清理文件名中的非法字符 (Windows下常见问题)
         safe_name = target_company.replace('"', '').replace("'", "").replace(" ", "_")
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        file_name = f"{output_dir}/{safe_name}_{timestamp}.json"
+        file_name = f"{output_dir}/{safe_name}_{timestamp}.jsonl"
         
-        # 3. 写入文件
+        # 3. 写入文件 (与其他采集脚本统一为 JSONL)
         print(f"\n[*] 正在保存数据到本地...")
-        with open(file_name, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, ensure_ascii=False, indent=2)
+        with JsonlSink(file_name, fsync=True, collector="tianyancha") as sink:
+            sink.write(result_data)
             
         abs_path = os.path.abspath(file_name)
         print(f"[SUCCESS] 任务完成！")
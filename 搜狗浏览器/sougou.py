@@ -1,21 +1,32 @@
 import asyncio
-import json
 import re
 import random
 import os
+import sys
+from urllib.parse import urljoin
 from playwright.async_api import async_playwright
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from osint_common import breaker, cassette, checkpoint, metrics, profiling, proxypool, ratelimit
+from osint_common.profiling import profiled
+from osint_common.sink import JsonlSink
+
+cassette.install_from_env()
+
 # ================= 配置区域 =================
 KEYWORD = "哈尔滨电气集团 联系方式"
 TARGET_COUNT = 10
-FILENAME = "sogou_sda_source_trace.json" # 文件名改一下，代表带溯源
+FILENAME = "sogou_sda_source_trace.jsonl" # 文件名改一下，代表带溯源 (每行一篇文章)
 HEADLESS = True  
+SEARCH_URL = "https://weixin.sogou.com/weixin"  # 离线基准测试时指向本地 fixture 服务
+RESUME = False  # True=从断点继续 (命令行 --resume)，跳过已解析过的文章
 # ===========================================
 
 def clean_text(text):
     if not text: return ""
     return re.sub(r'\s+', ' ', text).strip()
 
+@profiled("regex_extract")
 def extract_structured_data_with_source(full_text):
     lines = full_text.split('\n')
     
@@ -125,71 +136,131 @@ def extract_structured_data_with_source(full_text):
 
     return unique_results
 
-async def run():
-    print(f"[*] 启动溯源采集器...")
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=HEADLESS, args=['--disable-blink-features=AutomationControlled'])
-        context = await browser.new_context(viewport={'width': 1920, 'height': 1080}, user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        page = await context.new_page()
-        print(f"[*] 正在搜索: {KEYWORD}")
-        await page.goto(f"https://weixin.sogou.com/weixin?type=2&query={KEYWORD}&ie=utf8", wait_until="domcontentloaded")
-        
-        if "antispider" in page.url or "验证码" in await page.content():
-            print("⚠️  触发验证码。")
-            await browser.close()
-            return
+async def crawl_articles(context, keyword, target_count, filename, circuit, ckpt):
+    """搜索并逐篇解析文章，结果逐条写入 filename；返回是否中途触发验证码，搜索结果为空时返回 None"""
+    page = await context.new_page()
+    print(f"[*] 正在搜索: {keyword}")
+    search_url = f"{SEARCH_URL}?type=2&query={keyword}&ie=utf8"
+    await ratelimit.acquire_async(search_url, via=proxypool.via(page))
+    with metrics.timer("playwright", collector="sogou", op="goto"), profiling.span("page_load"):
+        await page.goto(search_url, wait_until="domcontentloaded")
+    
+    if "antispider" in page.url or "验证码" in await page.content():
+        print("⚠️  触发验证码。")
+        metrics.inc("captchas_total", collector="sogou")
+        circuit.trip("antispider")
+        raise circuit.open_error()
+    circuit.record_success()
 
-        data_list = []
-        try: await page.wait_for_selector(".news-list li", timeout=5000)
-        except: return
+    try:
+        with metrics.timer("playwright", collector="sogou", op="wait_for_selector"), profiling.span("page_load"):
+            await page.wait_for_selector(".news-list li", timeout=5000)
+    except Exception:
+        # 没有搜索结果；结果文件还没打开，浏览器由 run() 关闭
+        print("[-] 未找到相关文章")
+        return None
 
+    # 每篇文章解析完立即写入，不在内存里攒全部结果；续采时追加到上次的结果文件
+    with JsonlSink(filename, batch_size=1, collector="sogou", append=ckpt.resumed) as sink:
         search_results = await page.query_selector_all(".news-list li")
+        tripped = False
         print(f"[*] 找到 {len(search_results)} 篇文章...")
+        if ckpt.resumed:
+            print(f"[*] 断点: 已解析到第 {ckpt.get('index', 0)} 篇，跳过已写出的 {len(ckpt.marked('done'))} 篇")
 
         for i, item in enumerate(search_results):
-            if i >= TARGET_COUNT: break
+            if i >= target_count: break
             try:
                 title_el = await item.query_selector("h3 a")
                 title = await title_el.inner_text()
                 account_el = await item.query_selector(".s-p")
                 account = await account_el.inner_text() if account_el else "未知"
-                
-                print(f"\n[{i+1}/{TARGET_COUNT}] 解析文章: {title[:20]}...")
+                # 结果顺序可能变化，按标题 + 公众号识别已解析的文章
+                article_key = f"{account}|{title}"
+                if ckpt.is_marked("done", article_key):
+                    continue
+            
+                print(f"\n[{i+1}/{target_count}] 解析文章: {title[:20]}...")
+                # 搜狗结果链接先跳转到 weixin.sogou.com/link，再到 mp.weixin.qq.com
+                await ratelimit.acquire_async(urljoin(page.url, await title_el.get_attribute("href") or ""), via=proxypool.via(page))
                 async with context.expect_page() as new_page_info: await title_el.click()
                 article_page = await new_page_info.value
-                try: await article_page.wait_for_selector("#js_content", timeout=8000)
+                if "antispider" in article_page.url:
+                    print("⚠️  文章跳转触发验证码，停止本次采集。")
+                    metrics.inc("captchas_total", collector="sogou")
+                    circuit.trip("antispider")
+                    tripped = True
+                    break
+                try:
+                    with metrics.timer("playwright", collector="sogou", op="wait_for_selector"), profiling.span("page_load"):
+                        await article_page.wait_for_selector("#js_content", timeout=8000)
                 except: continue
-                
+            
                 content_element = await article_page.query_selector("#js_content")
                 if not content_element: content_element = await article_page.query_selector("body")
-                full_text = await content_element.inner_text()
-                
+                with profiling.span("text_extract"):
+                    full_text = await content_element.inner_text()
+            
                 # 🔥 调用分块提取函数
                 contacts = extract_structured_data_with_source(full_text)
-                
+            
                 if contacts:
                     print(f"    ✅ 提取到 {len(contacts)} 条数据")
                     # 打印第一条数据看看 origin_data 效果
                     if len(contacts) > 0:
                         print(f"       示例溯源:\n{contacts[0]['origin_data'][:100]}...") # 打印前100字
-                
-                data_list.append({
+            
+                sink.write({
                     "title": title,
                     "account": account,
                     "url": article_page.url,
                     "extracted_data": contacts
                 })
+                ckpt.mark("done", article_key)
+                ckpt.set("index", i + 1)
 
                 await article_page.close()
-                await asyncio.sleep(random.uniform(2, 4))
+                await cassette.async_sleep(random.uniform(2, 4))
             except Exception as e: continue
 
-        with open(FILENAME, 'w', encoding='utf-8') as f:
-            json.dump(data_list, f, ensure_ascii=False, indent=4)
-        print(f"\n[*] 溯源数据已保存至: {FILENAME}")
-        await browser.close()
+    print(f"\n[*] 溯源数据已保存至: {filename}")
+    return tripped
+
+async def run(keyword=KEYWORD, target_count=TARGET_COUNT, filename=FILENAME):
+    print(f"[*] 启动溯源采集器...")
+    # 熔断中直接返回，不启动浏览器
+    circuit = breaker.get("sogou")
+    circuit.check()
+    # 每篇文章都要打开一个页面，解析完一篇就落盘一次
+    ckpt = checkpoint.start("sogou", keyword, resume=RESUME, save_every=1)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=HEADLESS, args=['--disable-blink-features=AutomationControlled'], **proxypool.launch_options())
+        try:
+            proxy = proxypool.assign("sogou")
+            context = await browser.new_context(viewport={'width': 1920, 'height': 1080}, user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36', **proxypool.context_options(proxy))
+            try:
+                await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+                await cassette.attach_har(context, "sogou")
+                proxypool.track(context, proxy)
+                tripped = await crawl_articles(context, keyword, target_count, filename, circuit, ckpt)
+            finally:
+                # route_from_har(update=True) 录制的 HAR 只在 context 关闭时写出，须先于浏览器关闭
+                await context.close()
+        finally:
+            await browser.close()
+
+    if tripped is None:
+        return
+    # 已写出的文章保留，但本次结果不完整，交给调用方决定是否换会话重跑 (可加 --resume 续采)
+    if tripped:
+        ckpt.save()
+        raise circuit.open_error()
+    ckpt.finish()
 
 if __name__ == "__main__":
-    asyncio.run(run())
\ No newline at end of file
+    RESUME = RESUME or "--resume" in sys.argv[1:]
+    metrics.start_from_env()
+    try:
+        profiling.run(lambda: asyncio.run(run()))
+    except breaker.CircuitOpen as e:
+        print(f"[!] {e}")
\ No newline at end of file